@@ -5,7 +5,8 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from .. import schemas, models
 from ..core import security
-from .deps import get_db
+from ..core.auth_cache import user_cache
+from .deps import get_db, get_current_admin_user
 
 router = APIRouter()
 
@@ -24,7 +25,15 @@ async def login_for_access_token(
     
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.username, "role": user.role.value}, # Include role in token
+        # Identity claims let read-only endpoints skip the user lookup (deps.get_token_user)
+        data={"sub": user.username, "role": user.role.value, "uid": user.id, "dept": user.department_id, "name": user.full_name},
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
+
+@router.get("/auth/cache", response_model=schemas.UserCacheStats)
+def read_user_cache_stats(
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """登录用户缓存命中统计"""
+    return user_cache.stats()
@@ -0,0 +1,77 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .. import schemas, models
+from .deps import get_db, get_current_admin_user, get_current_user
+
+router = APIRouter()
+
+def _check_bounds(min_count: int, max_count: Optional[int]):
+    if max_count is not None and max_count < min_count:
+        raise HTTPException(status_code=400, detail="max_count must not be less than min_count")
+
+@router.get("/coverage-requirements/", response_model=List[schemas.CoverageRequirementSchema])
+def read_coverage_requirements(
+    shift_type_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """获取班次人数需求"""
+    query = db.query(models.CoverageRequirement)
+    if shift_type_id:
+        query = query.filter(models.CoverageRequirement.shift_type_id == shift_type_id)
+    if department_id:
+        query = query.filter(models.CoverageRequirement.department_id == department_id)
+    return query.all()
+
+@router.post("/coverage-requirements/", response_model=schemas.CoverageRequirementSchema)
+def create_coverage_requirement(
+    requirement: schemas.CoverageRequirementCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """创建班次人数需求（按星期/日期，可选资质）"""
+    _check_bounds(requirement.min_count, requirement.max_count)
+    if not db.query(models.ShiftType).filter(models.ShiftType.id == requirement.shift_type_id).first():
+        raise HTTPException(status_code=404, detail="Shift type not found")
+    db_requirement = models.CoverageRequirement(**requirement.model_dump())
+    db.add(db_requirement)
+    db.commit()
+    db.refresh(db_requirement)
+    return db_requirement
+
+@router.put("/coverage-requirements/{requirement_id}", response_model=schemas.CoverageRequirementSchema)
+def update_coverage_requirement(
+    requirement_id: int,
+    requirement: schemas.CoverageRequirementUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """更新班次人数需求"""
+    db_requirement = db.query(models.CoverageRequirement).filter(models.CoverageRequirement.id == requirement_id).first()
+    if not db_requirement:
+        raise HTTPException(status_code=404, detail="Coverage requirement not found")
+
+    update_data = requirement.model_dump(exclude_unset=True)
+    for key, value in update_data.items():
+        setattr(db_requirement, key, value)
+    _check_bounds(db_requirement.min_count, db_requirement.max_count)
+
+    db.commit()
+    db.refresh(db_requirement)
+    return db_requirement
+
+@router.delete("/coverage-requirements/{requirement_id}")
+def delete_coverage_requirement(
+    requirement_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """删除班次人数需求"""
+    db_requirement = db.query(models.CoverageRequirement).filter(models.CoverageRequirement.id == requirement_id).first()
+    if not db_requirement:
+        raise HTTPException(status_code=404, detail="Coverage requirement not found")
+    db.delete(db_requirement)
+    db.commit()
+    return {"message": "Coverage requirement deleted successfully"}
@@ -2,6 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import schemas, models
+from ..core.auth_cache import user_cache
 from .deps import get_db, get_current_admin_user
 
 router = APIRouter()
@@ -65,4 +66,5 @@ def delete_department(
     
     db.delete(db_dept)
     db.commit()
+    user_cache.invalidate()  # members' department_id was cleared
     return {"message": "Department deleted successfully"}
@@ -1,3 +1,4 @@
+from types import SimpleNamespace
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -7,28 +8,66 @@ from ..database import get_db
 from ..models import User, RoleEnum
 from ..schemas import TokenData
 from ..core.security import SECRET_KEY, ALGORITHM
+from ..core.auth_cache import user_cache, snapshot_user
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.username == token_data.username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def _lookup_user(db: Session, username: str):
+    """User snapshot (see core/auth_cache.py) from the cache, or one users-table query."""
+    token_data = TokenData(username=username)
+    user = user_cache.get(token_data.username)
+    if user is not None:
+        return user
+    version = user_cache.version()
+    row = db.query(User).filter(User.username == token_data.username).first()
+    if row is None:
+        raise _credentials_exception()
+    return user_cache.put(token_data.username, snapshot_user(row), version)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    The token's user as a snapshot (id, username, full_name, role, department_id, title),
+    checked against the users table at most every USER_CACHE_TTL seconds.
+    """
+    return _lookup_user(db, _decode_token(token)["sub"])
+
+def get_token_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    For read-only endpoints: the identity from the signed uid / role / dept / name claims,
+    without any lookup. Tokens issued before those claims existed fall back to get_current_user.
+    """
+    payload = _decode_token(token)
+    if "uid" not in payload or "role" not in payload:
+        return _lookup_user(db, payload["sub"])
+    try:
+        role = RoleEnum(payload["role"])
+    except ValueError:
+        raise _credentials_exception()
+    user_cache.count_claims()
+    return SimpleNamespace(
+        id=payload["uid"],
+        username=payload["sub"],
+        full_name=payload.get("name"),
+        role=role,
+        department_id=payload.get("dept"),
+        title=None,
+    )
 
 def get_current_active_user(current_user: User = Depends(get_current_user)):
     # In future we can add active check
@@ -0,0 +1,101 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from sqlalchemy import extract
+from sqlalchemy.orm import Session
+from .. import schemas, models
+from ..core.holidays import calendar_cache, parse_csv, parse_ics, import_holidays
+from .deps import get_db, get_current_admin_user, get_token_user
+from .audit import log_action
+
+router = APIRouter()
+
+@router.get("/holidays/", response_model=List[schemas.HolidaySchema])
+def get_holidays(
+    year: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_token_user)
+):
+    """获取节假日 / 调休上班日，可按年份筛选"""
+    query = db.query(models.Holiday)
+    if year:
+        query = query.filter(extract("year", models.Holiday.date) == year)
+    return query.order_by(models.Holiday.date).all()
+
+@router.post("/holidays/", response_model=schemas.HolidaySchema)
+def create_holiday(
+    holiday: schemas.HolidayCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """创建节假日 - 仅管理员"""
+    if db.query(models.Holiday).filter(models.Holiday.date == holiday.date).first():
+        raise HTTPException(status_code=400, detail="A holiday already exists on this date")
+    
+    db_holiday = models.Holiday(**holiday.model_dump())
+    db.add(db_holiday)
+    db.commit()
+    db.refresh(db_holiday)
+    calendar_cache.invalidate()
+    return db_holiday
+
+@router.post("/holidays/import", response_model=schemas.HolidayImportResult)
+def import_holiday_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ics)$", description="Defaults to the file extension"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """批量导入节假日 (CSV: date,name[,kind] 或 ICS 日历) - 仅管理员，按日期覆盖"""
+    fmt = format or ("ics" if (file.filename or "").lower().endswith(".ics") else "csv")
+    try:
+        text = file.file.read().decode("utf-8-sig")
+        entries = parse_ics(text) if fmt == "ics" else parse_csv(text)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid {fmt.upper()} file: {e}")
+    if not entries:
+        raise HTTPException(status_code=400, detail="No holidays found in file")
+    
+    result = import_holidays(db, entries)
+    log_action(db, current_user.id, "IMPORT", "holiday", details=f"Imported {len(entries)} calendar days from {file.filename}")
+    return result
+
+@router.put("/holidays/{holiday_id}", response_model=schemas.HolidaySchema)
+def update_holiday(
+    holiday_id: int,
+    holiday: schemas.HolidayUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """更新节假日 - 仅管理员"""
+    db_holiday = db.query(models.Holiday).filter(models.Holiday.id == holiday_id).first()
+    if not db_holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+    
+    update_data = holiday.model_dump(exclude_unset=True)
+    if "date" in update_data and db.query(models.Holiday).filter(
+        models.Holiday.date == update_data["date"], models.Holiday.id != holiday_id
+    ).first():
+        raise HTTPException(status_code=400, detail="A holiday already exists on this date")
+    for key, value in update_data.items():
+        setattr(db_holiday, key, value)
+    
+    db.commit()
+    db.refresh(db_holiday)
+    calendar_cache.invalidate()
+    return db_holiday
+
+@router.delete("/holidays/{holiday_id}")
+def delete_holiday(
+    holiday_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """删除节假日 - 仅管理员"""
+    db_holiday = db.query(models.Holiday).filter(models.Holiday.id == holiday_id).first()
+    if not db_holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+    
+    db.delete(db_holiday)
+    db.commit()
+    calendar_cache.invalidate()
+    return {"message": "Holiday deleted successfully"}
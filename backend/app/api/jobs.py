@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from .. import schemas, models
+from ..core.generation import load_generation_inputs, attach_warm_start
+from ..core.feasibility import check_feasibility
+from ..core.jobs import job_manager, reap_stale_jobs_throttled, ACTIVE_STATUSES
+from ..core.rolling import plan_rolling
+from .deps import get_db, get_current_admin_user
+from .audit import log_action
+
+router = APIRouter()
+
+def _get_job(db: Session, job_id: str) -> models.GenerationJob:
+    job = db.query(models.GenerationJob).filter(models.GenerationJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/schedules/jobs", response_model=schemas.GenerateJobResponse, status_code=202)
+def create_generation_job(
+    request: schemas.GenerateJobCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """提交后台排班任务，立即返回任务ID"""
+    try:
+        rolling = plan_rolling(request.days, request.window_days, request.commit_days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    payload = load_generation_inputs(db, request.start_date, request.days, request.department_id)
+    if not payload["doctors"]:
+        raise HTTPException(status_code=400, detail="No doctors found for scheduling")
+    if request.warm_start:
+        attach_warm_start(db, payload, request.keep_published)
+    if rolling:
+        payload["rolling"] = rolling
+    payload["engine"] = request.engine
+    # Same counting checks as /schedules/generate: fail fast instead of queueing a hopeless solve
+    issues = check_feasibility(payload)
+    if issues:
+        raise HTTPException(status_code=400, detail=jsonable_encoder({"message": "Infeasible schedule", "issues": issues}))
+
+    solver_params = request.model_dump(include={"time_limit", "num_workers", "relative_gap", "random_seed"}, exclude_none=True)
+    job = job_manager.submit(db, payload, request.model_dump(mode="json"), solver_params, user_id=current_user.id)
+
+    log_action(db, current_user.id, "GENERATE", "schedule_job", job.id, f"Queued generation from {request.start_date} ({request.days} days)")
+    return job
+
+@router.get("/schedules/jobs/{job_id}", response_model=schemas.GenerateJobResponse)
+def read_generation_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """查询任务状态与求解进度（目标值随时间变化）"""
+    job = _get_job(db, job_id)
+    # Clients poll every second or so: only active jobs can be orphaned, and the reaper is throttled
+    if job.status in ACTIVE_STATUSES and reap_stale_jobs_throttled(db):
+        db.refresh(job)
+    return job
+
+@router.post("/schedules/jobs/{job_id}/cancel", response_model=schemas.GenerateJobResponse)
+def cancel_generation_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """取消排队中或运行中的任务"""
+    job = _get_job(db, job_id)
+    if job.status not in (models.JobStatus.QUEUED, models.JobStatus.RUNNING):
+        raise HTTPException(status_code=400, detail=f"Job is already {job.status}")
+    job_manager.request_cancel(db, job)
+    log_action(db, current_user.id, "CANCEL", "schedule_job", job.id, f"Cancelled generation job {job.id}")
+    db.refresh(job)
+    return job
+
+@router.get("/schedules/jobs/{job_id}/result", response_model=schemas.GenerateResponse)
+def read_generation_job_result(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """获取已完成任务生成的排班"""
+    job = _get_job(db, job_id)
+    if job.status != models.JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    result = dict(job.result)
+    schedule_ids = result.pop("schedule_ids", [])
+    schedules = db.query(models.Schedule).filter(models.Schedule.id.in_(schedule_ids)).order_by(models.Schedule.date).all() if schedule_ids else []
+    return {"schedules": schedules, **result}
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from .. import models, schemas
-from .deps import get_db, get_current_user
+from .deps import get_db, get_current_user, get_token_user
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -11,7 +11,7 @@ def read_notifications(
     skip: int = 0, 
     limit: int = 50, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_token_user)
 ):
     """Get my notifications"""
     return db.query(models.Notification)\
@@ -38,7 +38,7 @@ def mark_read(
 @router.get("/unread-count")
 def get_unread_count(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_token_user)
 ):
     count = db.query(models.Notification)\
               .filter(models.Notification.user_id == current_user.id, models.Notification.is_read == False)\
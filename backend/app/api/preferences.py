@@ -2,7 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from .deps import get_db, get_current_user, get_current_admin_user
+from .deps import get_db, get_current_user, get_current_admin_user, get_token_user
 
 router = APIRouter()
 
@@ -27,7 +27,7 @@ def create_preference(
 @router.get("/preferences/me", response_model=List[schemas.PreferenceResponse])
 def get_my_preferences(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_token_user)
 ):
     return db.query(models.Preference).filter(models.Preference.user_id == current_user.id).order_by(models.Preference.date).all()
 
@@ -2,14 +2,14 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from .deps import get_db, get_current_user, get_current_admin_user
+from .deps import get_db, get_current_admin_user, get_token_user
 
 router = APIRouter()
 
 @router.get("/rooms/", response_model=List[schemas.RoomResponse])
 def get_rooms(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_token_user)
 ):
     """获取所有诊室"""
     return db.query(models.Room).all()
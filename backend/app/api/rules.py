@@ -0,0 +1,83 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .. import schemas, models
+from ..core.rules import RULES, build_rule
+from .deps import get_db, get_current_admin_user, get_current_user
+
+router = APIRouter()
+
+def _check_rule(rule: str, params: dict):
+    try:
+        build_rule(rule, params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/department-rules/available", response_model=List[schemas.RuleInfo])
+def read_available_rules(
+    current_user: models.User = Depends(get_current_user)
+):
+    """可用的排班规则"""
+    return [{"name": name, "description": cls.description} for name, cls in RULES.items()]
+
+@router.get("/department-rules/", response_model=List[schemas.DepartmentRuleSchema])
+def read_department_rules(
+    department_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """获取科室排班规则"""
+    query = db.query(models.DepartmentRule)
+    if department_id:
+        query = query.filter(models.DepartmentRule.department_id == department_id)
+    return query.all()
+
+@router.post("/department-rules/", response_model=schemas.DepartmentRuleSchema)
+def create_department_rule(
+    rule: schemas.DepartmentRuleCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """为科室启用排班规则（department_id 为空则全院生效）"""
+    _check_rule(rule.rule, rule.params)
+    db_rule = models.DepartmentRule(**rule.model_dump())
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+@router.put("/department-rules/{rule_id}", response_model=schemas.DepartmentRuleSchema)
+def update_department_rule(
+    rule_id: int,
+    rule: schemas.DepartmentRuleUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """更新排班规则参数或启用状态"""
+    db_rule = db.query(models.DepartmentRule).filter(models.DepartmentRule.id == rule_id).first()
+    if not db_rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+
+    update_data = rule.model_dump(exclude_unset=True)
+    if "params" in update_data:
+        _check_rule(db_rule.rule, update_data["params"])
+    for key, value in update_data.items():
+        setattr(db_rule, key, value)
+
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+@router.delete("/department-rules/{rule_id}")
+def delete_department_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """删除排班规则"""
+    db_rule = db.query(models.DepartmentRule).filter(models.DepartmentRule.id == rule_id).first()
+    if not db_rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    db.delete(db_rule)
+    db.commit()
+    return {"message": "Rule deleted successfully"}
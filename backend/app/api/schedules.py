@@ -1,80 +1,304 @@
+import time
+import hashlib
 from typing import List, Optional
 from datetime import date, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from ..core.scheduler import SchedulingEngine
-from .deps import get_db, get_current_user, get_current_admin_user
+from ..core.scheduler import DEFAULT_TIME_LIMIT, DEFAULT_NUM_WORKERS
+from ..core.generation import load_generation_inputs, attach_warm_start, run_generation_cached, save_generated_schedules
+from ..core.cache import generation_cache
+from ..core.rolling import plan_rolling, ROLLING_AUTO_DAYS, ROLLING_WINDOW_DAYS
+from ..core.conflicts import find_conflicts, validate_changes
+from ..core.pagination import encode_cursor, after_cursor, stream_rows, STREAM_BATCH_SIZE
+from ..core.feasibility import check_feasibility, explain_infeasibility, analyze_feasibility
+from ..core.decomposition import load_department_payloads, solve_departments
+from ..core.repair import load_repair_inputs, run_repair, apply_repair, traded_rows_dropped
+from ..core.workload import refresh_workload
+from .deps import get_db, get_current_admin_user, get_token_user
 from .audit import log_action
 
 router = APIRouter()
 
-@router.post("/schedules/generate", response_model=List[schemas.ScheduleSchema])
+SCHEDULE_FIELDS = tuple(schemas.ScheduleSchema.model_fields)  # projectable with ?fields=
+MAX_PAGE_SIZE = 10000
+MAX_CALENDAR_DAYS = 366
+
+@router.post("/schedules/generate", response_model=schemas.GenerateResponse)
 def generate_schedule(
     start_date: date,
     days: int = 30,
     department_id: Optional[int] = None,
+    time_limit: float = Query(DEFAULT_TIME_LIMIT, gt=0, le=300, description="Wall-clock solve budget in seconds"),
+    num_workers: int = Query(DEFAULT_NUM_WORKERS, ge=1, le=64),
+    relative_gap: Optional[float] = Query(None, ge=0, le=1, description="Stop once within this relative optimality gap"),
+    random_seed: Optional[int] = None,
+    split_by_department: bool = Query(False, description="Solve each department of the subtree (whole hospital if no department_id) independently and in parallel"),
+    warm_start: bool = Query(True, description="Seed the solver from existing drafts / the previous period and replace stale drafts"),
+    keep_published: bool = Query(True, description="With warm_start, keep already published assignments fixed"),
+    window_days: Optional[int] = Query(None, ge=7, le=120, description=f"Rolling horizon: solve overlapping windows of this length (default for horizons over {ROLLING_AUTO_DAYS} days: {ROLLING_WINDOW_DAYS})"),
+    commit_days: Optional[int] = Query(None, ge=1, le=120, description="Rolling horizon: days committed per window; time_limit applies per window"),
+    engine: str = Query("cpsat", pattern="^(cpsat|heuristic)$", description="cpsat: optimal CP-SAT solve; heuristic: sub-second greedy + local search preview"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_admin_user)
 ):
+    try:
+        rolling = plan_rolling(days, window_days, commit_days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    solver_params = {
+        "time_limit": time_limit,
+        "num_workers": num_workers,
+        "relative_gap": relative_gap,
+        "random_seed": random_seed,
+    }
+    if split_by_department:
+        return _generate_by_department(db, current_user, start_date, days, department_id, solver_params, warm_start, keep_published, rolling, engine)
+
     # 1. Fetch Resources
-    query = db.query(models.User).filter(models.User.role == models.RoleEnum.DOCTOR)
-    if department_id:
-        query = query.filter(models.User.department_id == department_id)
-    doctors = query.all()
-    
-    if not doctors:
+    payload = load_generation_inputs(db, start_date, days, department_id)
+    if not payload["doctors"]:
         raise HTTPException(status_code=400, detail="No doctors found for scheduling")
+    if warm_start:
+        attach_warm_start(db, payload, keep_published)
+    if rolling:
+        payload["rolling"] = rolling
+    payload["engine"] = engine
+    
+    # 2. Cheap counting checks: name the over-constrained day/shift without a full proof
+    issues = check_feasibility(payload)
+    if issues:
+        raise HTTPException(status_code=400, detail=jsonable_encoder({"message": "Infeasible schedule", "issues": issues}))
 
-    shift_types = db.query(models.ShiftType).all()
-    if not shift_types:
-        day_shift = models.ShiftType(name="Day Shift", start_time="08:00", end_time="17:00")
-        night_shift = models.ShiftType(name="Night Shift", start_time="17:00", end_time="08:00")
-        db.add(day_shift)
-        db.add(night_shift)
-        db.commit()
-        shift_types = [day_shift, night_shift]
+    # 3. Run Engine (identical inputs are answered from the result cache)
+    outcome = run_generation_cached(payload, solver_params)
+    stats = outcome["stats"]
     
-    # 2. Run Engine
-    engine = SchedulingEngine(doctors, shift_types, start_date, days)
-    engine.build_model()
-    results = engine.solve()
+    if outcome["results"] is None:
+        if stats["status"] == "UNKNOWN":
+            if engine == "heuristic":
+                raise HTTPException(status_code=400, detail="Heuristic engine could not complete the roster, retry with engine=cpsat")
+            raise HTTPException(status_code=400, detail=f"No feasible schedule found within {time_limit}s")
+        core = explain_infeasibility(payload)
+        raise HTTPException(status_code=400, detail=jsonable_encoder({"message": "Infeasible schedule. Too many constraints?", "core": core}))
     
-    if not results:
-        raise HTTPException(status_code=400, detail="Infeasible schedule. Too many constraints?")
+    # 4. Save to DB (Draft status)
+    t0 = time.perf_counter()
+    saved_schedules = save_generated_schedules(db, outcome["results"], replace_drafts_for=payload if warm_start else None)
+    persist_ms = (time.perf_counter() - t0) * 1000
     
-    # 3. Save to DB (Draft status)
-    saved_schedules = []
-    for item in results:
-        existing = db.query(models.Schedule).filter(
-            models.Schedule.date == item['date'],
-            models.Schedule.shift_type_id == item['shift_type_id'],
-            models.Schedule.doctor_id == item['doctor_id']
-        ).first()
-        
-        if existing:
-            continue
-            
-        new_sched = models.Schedule(
-            date=item['date'],
-            doctor_id=item['doctor_id'],
-            shift_type_id=item['shift_type_id'],
-            status="draft"
-        )
-        db.add(new_sched)
-        saved_schedules.append(new_sched)
+    log_action(db, current_user.id, "GENERATE", "schedule", details=f"Generated {len(saved_schedules)} shifts from {start_date} ({stats['status']})")
     
-    db.commit()
+    return {"schedules": saved_schedules, **stats, "persist_ms": persist_ms}
+
+def _generate_by_department(db, current_user, start_date, days, department_id, solver_params, warm_start, keep_published, rolling=None, engine="cpsat"):
+    units = load_department_payloads(db, start_date, days, department_id)
+    if not units:
+        raise HTTPException(status_code=400, detail="No doctors found for scheduling")
+    for unit in units:
+        if warm_start:
+            attach_warm_start(db, unit, keep_published)
+        if rolling:
+            unit["rolling"] = rolling
+        unit["engine"] = engine
+
+    outcome = solve_departments(units, solver_params)
+    reports = outcome["departments"]
+    failed = [r for r in reports if r["status"] not in ("OPTIMAL", "FEASIBLE")]
+    if len(failed) == len(reports):
+        raise HTTPException(status_code=400, detail={"message": "Infeasible schedule for every department", "departments": reports})
+
+    replace_scope = None
+    if warm_start:
+        solved = [u for u, r in zip(units, reports) if r["status"] in ("OPTIMAL", "FEASIBLE")]
+        replace_scope = {"doctors": [d for u in solved for d in u["doctors"]], "start_date": start_date, "days": days}
+    t0 = time.perf_counter()
+    saved_schedules = save_generated_schedules(db, outcome["results"], replace_drafts_for=replace_scope)
+    persist_ms = (time.perf_counter() - t0) * 1000
+    status = "PARTIAL" if failed else ("OPTIMAL" if all(r["status"] == "OPTIMAL" for r in reports) else "FEASIBLE")
     
-    log_action(db, current_user.id, "GENERATE", "schedule", details=f"Generated {len(saved_schedules)} shifts from {start_date}")
+    log_action(db, current_user.id, "GENERATE", "schedule", details=f"Generated {len(saved_schedules)} shifts from {start_date} for {len(reports)} departments ({status})")
     
-    return saved_schedules
+    objectives = [r["objective"] for r in reports if r["objective"] is not None]
+    return {
+        "schedules": saved_schedules,
+        "status": status,
+        "objective": sum(objectives) if objectives else None,
+        "wall_time": outcome["wall_time"],
+        "persist_ms": persist_ms,
+        "departments": reports,
+    }
+
+@router.get("/schedules/feasibility", response_model=schemas.FeasibilityReport)
+def read_schedule_feasibility(
+    start_date: date,
+    days: int = 30,
+    department_id: Optional[int] = None,
+    warm_start: bool = True,
+    keep_published: bool = True,
+    core: bool = Query(False, description="When the counting checks pass, also search for a minimal unsat core (up to a few seconds)"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """排班前可行性分析：指出人手不足的日期/班次，可选求最小冲突约束集"""
+    payload = load_generation_inputs(db, start_date, days, department_id)
+    if not payload["doctors"]:
+        raise HTTPException(status_code=400, detail="No doctors found for scheduling")
+    if warm_start:
+        attach_warm_start(db, payload, keep_published)
+    return analyze_feasibility(payload, with_core=core)
+
+@router.get("/schedules/calendar", response_model=schemas.CalendarResponse)
+def read_schedule_calendar(
+    start_date: date,
+    end_date: date,
+    response: Response,
+    department_id: Optional[int] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_token_user)
+):
+    """日历视图：日期 × 班次网格，含医生姓名、诊室与班次时间；未变化时返回 304"""
+    if end_date < start_date or (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"end_date must be within {MAX_CALENDAR_DAYS} days after start_date")
+
+    def scoped(query):
+        query = query.filter(models.Schedule.date >= start_date, models.Schedule.date <= end_date)
+        if current_user.role != models.RoleEnum.ADMIN:
+            query = query.filter(models.Schedule.status == "published")
+        if department_id:
+            query = query.filter(models.User.department_id == department_id)
+        return query
+
+    # Every shift type is a column so the grid keeps its shape when a shift is empty
+    columns = [
+        {"id": s.id, "name": s.name, "start_time": s.start_time, "end_time": s.end_time, "shift_category": s.shift_category}
+        for s in db.query(models.ShiftType).order_by(models.ShiftType.start_time, models.ShiftType.id)
+    ]
+
+    # ETag: newest change to the rows, their doctors and rooms (names are rendered), plus row
+    # count (deletions lower the count) for this view and its columns
+    last_change, last_doctor_change, last_room_change, count = scoped(
+        db.query(
+            func.max(models.Schedule.updated_at), func.max(models.User.updated_at),
+            func.max(models.Room.updated_at), func.count(models.Schedule.id),
+        )
+        .join(models.User, models.User.id == models.Schedule.doctor_id)
+        .outerjoin(models.Room, models.Room.id == models.Schedule.room_id)
+    ).one()
+    view = (f"{start_date}|{end_date}|{department_id}|{current_user.role == models.RoleEnum.ADMIN}|"
+            f"{last_change}|{last_doctor_change}|{last_room_change}|{count}|{columns}")
+    etag = f'W/"{hashlib.sha1(view.encode()).hexdigest()}"'
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    rows = scoped(
+        db.query(
+            models.Schedule.id, models.Schedule.date, models.Schedule.status, models.Schedule.room_id,
+            models.Schedule.shift_type_id, models.User.id.label("doctor_id"), models.User.full_name,
+            models.User.username, models.Room.name.label("room_name"),
+        )
+        .join(models.User, models.User.id == models.Schedule.doctor_id)
+        .outerjoin(models.Room, models.Room.id == models.Schedule.room_id)
+    ).order_by(models.Schedule.date, models.User.full_name, models.Schedule.id).all()
+
+    column_of = {s["id"]: k for k, s in enumerate(columns)}
+    n_days = (end_date - start_date).days + 1
+    grid = [[[] for _ in columns] for _ in range(n_days)]
+    for r in rows:
+        if r.shift_type_id not in column_of:
+            continue  # orphaned row whose shift type was deleted
+        grid[(r.date - start_date).days][column_of[r.shift_type_id]].append({
+            "schedule_id": r.id, "doctor_id": r.doctor_id, "doctor_name": r.full_name or r.username,
+            "room_id": r.room_id, "room_name": r.room_name, "status": r.status,
+        })
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"  # always revalidate, 304 when unchanged
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "shift_types": columns,
+        "days": [{"date": start_date + timedelta(days=d), "cells": grid[d]} for d in range(n_days)],
+    }
+
+@router.get("/schedules/conflicts", response_model=List[schemas.RosterConflict])
+def read_schedule_conflicts(
+    start_date: date,
+    end_date: date,
+    department_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """排班冲突检测：连续夜班、夜班后接班、资质不符及科室规则冲突"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    return find_conflicts(db, start_date, end_date, department_id)
+
+@router.get("/schedules/generate/cache", response_model=schemas.GenerationCacheStats)
+def read_generation_cache_stats(
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """排班结果缓存命中统计"""
+    return generation_cache.stats()
+
+@router.post("/schedules/repair", response_model=schemas.RepairResponse)
+def repair_schedule(
+    request: schemas.RepairRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """医生临时缺勤：仅重排受影响的班次及其邻近天数，返回最小改动"""
+    if request.end_date < request.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if request.hospital_wide and request.department_id:
+        raise HTTPException(status_code=400, detail="Pass either department_id or hospital_wide, not both")
+    try:
+        payload = load_repair_inputs(
+            db, request.doctor_id, request.start_date, request.end_date,
+            request.neighbourhood_days, request.department_id, request.hospital_wide
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    solver_params = {"time_limit": request.time_limit} if request.time_limit else None
+    outcome = run_repair(payload, solver_params)
+    stats = outcome["stats"]
+    if outcome["results"] is None:
+        raise HTTPException(status_code=400, detail=f"Cannot repair schedule around the absence ({stats['status']})")
+
+    removed = [schemas.RepairAssignment.model_validate(row) for row in outcome["removed"]]
+    added = outcome["added"]
+    if request.apply and (removed or added):
+        # force only overrides roster rules; a traded row can be handed over but never deleted
+        if traded_rows_dropped(db, outcome["removed"], added):
+            raise HTTPException(status_code=409, detail="Repair would delete shifts referenced by trades; resolve those trades first")
+        if not request.force:
+            conflicts = validate_changes(db, outcome["removed"], added)
+            if conflicts:
+                raise HTTPException(status_code=409, detail=jsonable_encoder({"message": "Repair would create roster conflicts", "conflicts": conflicts}))
+        added = apply_repair(db, outcome["removed"], added)
+        log_action(db, current_user.id, "REPAIR", "schedule", details=f"Repaired absence of doctor {request.doctor_id} {request.start_date}~{request.end_date}: -{len(removed)} +{len(added)}")
+
+    return {
+        "status": stats["status"],
+        "wall_time": stats["wall_time"],
+        "applied": request.apply,
+        "removed": removed,
+        "added": added,
+    }
 
 @router.post("/schedules/publish")
 def publish_schedules(
     start_date: date,
     end_date: date,
     department_id: Optional[int] = None,
+    force: bool = Query(False, description="Publish even if the drafts have roster conflicts"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_admin_user)
 ):
@@ -84,10 +308,19 @@ def publish_schedules(
         models.Schedule.status == 'draft'
     )
     
+    doctor_ids = None
     if department_id:
         query = query.join(models.User).filter(models.User.department_id == department_id)
+        doctor_ids = select(models.User.id).where(models.User.department_id == department_id)
+
+    if not force:
+        draft_ids = {schedule_id for (schedule_id,) in query.with_entities(models.Schedule.id)}
+        conflicts = [c for c in find_conflicts(db, start_date, end_date, department_id) if draft_ids.intersection(c["schedule_ids"])]
+        if conflicts:
+            raise HTTPException(status_code=409, detail=jsonable_encoder({"message": "Drafts to publish have roster conflicts", "conflicts": conflicts}))
         
     count = query.update({models.Schedule.status: 'published'}, synchronize_session=False)
+    refresh_workload(db, start_date, end_date, doctor_ids)
     db.commit()
     
     log_action(db, current_user.id, "PUBLISH", "schedule", details=f"Published {count} schedules from {start_date} to {end_date}")
@@ -99,10 +332,20 @@ def read_schedules(
     end_date: Optional[date] = None,
     doctor_id: Optional[int] = None,
     department_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; the next page's cursor is returned in the X-Next-Cursor header"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields, e.g. date,doctor_id,shift_type_id"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json: one array; ndjson: one object per line"),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_token_user)
 ):
-    query = db.query(models.Schedule)
+    """排班列表：按 (date, id) 游标分页，可选字段投影，JSON / NDJSON 流式输出"""
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(SCHEDULE_FIELDS)
+    unknown = [f for f in selected if f not in SCHEDULE_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}; available: {', '.join(SCHEDULE_FIELDS)}")
+    # date and id are always read: they order the rows and build the cursor
+    query = db.query(*(getattr(models.Schedule, f) for f in dict.fromkeys(["date", "id", *selected])))
     
     # Non-admins can only see published schedules
     if current_user.role != models.RoleEnum.ADMIN:
@@ -116,10 +359,34 @@ def read_schedules(
         query = query.filter(models.Schedule.doctor_id == doctor_id)
         
     if department_id:
-        query = query.join(models.User).filter(models.User.department_id == department_id)
-        
-    schedules = query.all()
-    return schedules
+        query = query.join(models.User, models.User.id == models.Schedule.doctor_id).filter(models.User.department_id == department_id)
+    if cursor:
+        try:
+            query = query.filter(after_cursor(models.Schedule.date, models.Schedule.id, cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    query = query.order_by(models.Schedule.date, models.Schedule.id)
+
+    headers, stream_db = {}, None
+    if limit:
+        rows = query.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1].date, rows[-1].id)
+    else:
+        # Fetched batch by batch while streaming; the body outlives the request's session
+        stream_db = Session(bind=db.get_bind())
+        rows = query.with_session(stream_db).yield_per(STREAM_BATCH_SIZE)
+
+    def body():
+        try:
+            yield from stream_rows(rows, selected, ndjson=format == "ndjson")
+        finally:
+            if stream_db is not None:
+                stream_db.close()
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "application/json"
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
 
 @router.delete("/schedules/{schedule_id}")
 def delete_schedule(
@@ -132,6 +399,7 @@ def delete_schedule(
         raise HTTPException(status_code=404, detail="Schedule not found")
     
     db.delete(schedule)
+    refresh_workload(db, schedule.date, schedule.date, [schedule.doctor_id])
     db.commit()
     
     log_action(db, current_user.id, "DELETE", "schedule", str(schedule_id), f"Deleted schedule {schedule_id}")
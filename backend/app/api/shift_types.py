@@ -2,14 +2,15 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import schemas, models
-from .deps import get_db, get_current_admin_user, get_current_user
+from ..core.workload import refresh_workload
+from .deps import get_db, get_current_admin_user, get_token_user
 
 router = APIRouter()
 
 @router.get("/shift-types/", response_model=List[schemas.ShiftTypeSchema])
 def read_shift_types(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_token_user)
 ):
     """获取所有班次类型"""
     return db.query(models.ShiftType).all()
@@ -43,6 +44,9 @@ def update_shift_type(
     for key, value in update_data.items():
         setattr(db_shift_type, key, value)
     
+    # Category, weight and times are baked into the workload rollup
+    if update_data.keys() & {"name", "start_time", "end_time", "weight", "shift_category"}:
+        refresh_workload(db)
     db.commit()
     db.refresh(db_shift_type)
     return db_shift_type
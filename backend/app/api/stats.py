@@ -1,13 +1,68 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, and_, case
 from typing import List, Optional, Dict, Any
 from datetime import date
-from .. import models
+from .. import models, schemas
+from ..core.workload import day_of_week
+from ..core.holidays import calendar_cache, calendar_between
+from ..core.settlement import settle_period, load_rates, rate_for, ShiftCost, SETTLEMENT_FIELDS
+from ..core.export import stream_csv, stream_xlsx
 from .deps import get_db, get_current_user, get_current_admin_user, get_current_manager_user
+from .audit import log_action
 
 router = APIRouter()
 
+def workload_stats(db: Session, start_date: date, end_date: date, department_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Per-doctor shift counts from the daily rollup (core/workload.py) in one GROUP BY query:
+    O(doctor-days) rows instead of every shift. Every user in scope gets a row, so the
+    rollup is outer-joined with the date range in the ON clause. Holidays and weekends
+    (minus make-up workdays) come from the holiday calendar (core/holidays.py).
+    """
+    rollup = models.WorkloadDaily
+    holidays, workdays = calendar_between(calendar_cache.get(db), start_date, end_date)
+    weekend = and_(day_of_week(rollup.date, db.get_bind().dialect.name).in_([0, 6]), rollup.date.notin_(workdays))
+    holiday = rollup.date.in_(holidays)
+
+    def summed(column):
+        return func.coalesce(func.sum(column), 0)
+
+    query = db.query(
+        models.User.id,
+        models.User.full_name,
+        models.User.department_id,
+        summed(rollup.total_shifts),
+        summed(rollup.night_shifts),
+        summed(case((weekend, rollup.total_shifts), else_=0)),
+        summed(case((holiday, rollup.total_shifts), else_=0)),
+        summed(rollup.weighted_score),
+        summed(rollup.hours),
+    ).outerjoin(rollup, and_(
+        rollup.doctor_id == models.User.id,
+        rollup.date >= start_date,
+        rollup.date <= end_date,
+    ))
+    if department_id:
+        query = query.filter(models.User.department_id == department_id)
+    query = query.group_by(models.User.id, models.User.full_name, models.User.department_id).order_by(models.User.id)
+
+    return [
+        {
+            "doctor_id": doctor_id,
+            "doctor_name": full_name,
+            "department_id": user_department_id,
+            "total_shifts": total,
+            "night_shifts": nights,
+            "weekend_shifts": weekends,
+            "holiday_shifts": holidays_worked,
+            "weighted_score": score,
+            "hours": float(hours),
+        }
+        for doctor_id, full_name, user_department_id, total, nights, weekends, holidays_worked, score, hours in query
+    ]
+
 @router.get("/stats/workload")
 def get_workload_stats(
     start_date: date,
@@ -25,77 +80,73 @@ def get_workload_stats(
          if department_id and department_id != current_user.department_id:
              raise HTTPException(status_code=403, detail="Managers can only view their own department stats")
          department_id = current_user.department_id
-    
-    # 1. Fetch data
-    query = db.query(
-        models.Schedule,
-        models.User,
-        models.ShiftType
-    ).join(models.User, models.Schedule.doctor_id == models.User.id)\
-     .join(models.ShiftType, models.Schedule.shift_type_id == models.ShiftType.id)\
-     .filter(
-        models.Schedule.date >= start_date,
-        models.Schedule.date <= end_date
-    )
-    
-    if department_id:
-        query = query.filter(models.User.department_id == department_id)
-        
-    results = query.all()
-    
-    # 2. Process Statistics
-    stats_map = {} # doctor_id -> { stats }
-    
-    user_query = db.query(models.User)
-    if department_id:
-        user_query = user_query.filter(models.User.department_id == department_id)
-    all_users = user_query.all()
-    
-    for user in all_users:
-        stats_map[user.id] = {
-            "doctor_id": user.id,
-            "doctor_name": user.full_name,
-            "department_id": user.department_id,
-            "total_shifts": 0,
-            "night_shifts": 0,
-            "weekend_shifts": 0,
-            "holiday_shifts": 0
-        }
-        
-    # Helper for holidays (MVP: Hardcoded for demo)
-    def is_holiday(d: date) -> bool:
-        # Month, Day tuples
-        holidays = [
-            (1, 1), # New Year
-            (5, 1), (5, 2), (5, 3), # Labor Day
-            (10, 1), (10, 2), (10, 3) # National Day
-        ]
-        # In real app, this should query a Calendar/Holiday table
-        return (d.month, d.day) in holidays
 
-    for schedule, user, shift_type in results:
-        if user.id not in stats_map:
-            continue 
-            
-        entry = stats_map[user.id]
-        entry["total_shifts"] += 1
-        
-        # Night Shift Logic
-        is_night = False
-        if shift_type.shift_category == "night":
-            is_night = True
-        elif shift_type.name and ("夜" in shift_type.name or "Night" in shift_type.name):
-            is_night = True
-            
-        if is_night:
-            entry["night_shifts"] += 1
-            
-        # Weekend Logic
-        if schedule.date.weekday() >= 5:
-            entry["weekend_shifts"] += 1
-            
-        # Holiday Logic
-        if is_holiday(schedule.date):
-            entry["holiday_shifts"] += 1
-            
-    return list(stats_map.values())
+    return workload_stats(db, start_date, end_date, department_id)
+
+@router.get("/stats/duty-rates", response_model=List[schemas.DutyRateSchema])
+def get_duty_rates(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_manager_user)
+):
+    """值班费费率表：每个班次类别一行，未配置的类别返回默认值"""
+    rates = load_rates(db)
+    categories = {ShiftCost(s).category for s in db.query(models.ShiftType)} | set(rates)
+    return [rate_for(rates, category) for category in sorted(categories)]
+
+@router.put("/stats/duty-rates/{shift_category}", response_model=schemas.DutyRateSchema)
+def set_duty_rate(
+    shift_category: str,
+    rate: schemas.DutyRateBase,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_admin_user)
+):
+    """设置班次类别的值班费费率 - 仅管理员"""
+    db_rate = db.query(models.DutyRate).filter(models.DutyRate.shift_category == shift_category).first()
+    if not db_rate:
+        db_rate = models.DutyRate(shift_category=shift_category)
+        db.add(db_rate)
+    for key, value in rate.model_dump().items():
+        setattr(db_rate, key, value)
+    db.commit()
+    db.refresh(db_rate)
+    log_action(db, current_user.id, "UPDATE", "duty_rate", shift_category, f"Duty rate for {shift_category}: {rate.model_dump()}")
+    return db_rate
+
+@router.get("/stats/settlement", response_model=List[schemas.SettlementRow])
+def get_settlement(
+    start_date: date,
+    end_date: date,
+    department_id: Optional[int] = None,
+    include_drafts: bool = Query(False, description="Also settle draft (unpublished) schedules"),
+    format: str = Query("json", pattern="^(json|csv|xlsx)$"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_manager_user)
+):
+    """值班费结算：按班次权重、时长与节假日倍率计算每位医生的值班费，支持 CSV / Excel 流式导出"""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if current_user.role == models.RoleEnum.DEPARTMENT_MANAGER:
+        if department_id and department_id != current_user.department_id:
+            raise HTTPException(status_code=403, detail="Managers can only view their own department stats")
+        department_id = current_user.department_id
+
+    if format == "json":
+        return list(settle_period(db, start_date, end_date, department_id, include_drafts))
+
+    # Rows are fetched while the body streams; the body outlives the request's session
+    stream_db = Session(bind=db.get_bind())
+    rows = settle_period(stream_db, start_date, end_date, department_id, include_drafts)
+    filename = f"settlement_{start_date.isoformat()}_{end_date.isoformat()}.{format}"
+    if format == "csv":
+        chunks, media_type = stream_csv(rows, SETTLEMENT_FIELDS), "text/csv; charset=utf-8"
+    else:
+        chunks = stream_xlsx(rows, SETTLEMENT_FIELDS, sheet_name="settlement")
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def body():
+        try:
+            yield from chunks
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(body(), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
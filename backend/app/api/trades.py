@@ -1,12 +1,39 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from .. import schemas, models
+from ..core.conflicts import validate_reassignment
+from ..core.workload import refresh_workload
 from .deps import get_db, get_current_user, get_current_admin_user
 from .audit import log_action
 
 router = APIRouter()
 
+def _check_trade_conflicts(db: Session, schedule: models.Schedule, doctor_id: int):
+    """409 with the new conflicts if handing `schedule` to doctor_id breaks a roster rule."""
+    conflicts = validate_reassignment(db, schedule, doctor_id)
+    if conflicts:
+        raise HTTPException(status_code=409, detail=jsonable_encoder({"message": "Trade would create roster conflicts", "conflicts": conflicts}))
+
+def _reassign(db: Session, schedule: models.Schedule, doctor_id: int):
+    """
+    Hand `schedule` to doctor_id and update both doctors' workload rollup for that day.
+    409 if doctor_id already holds that shift on that day: force only overrides roster
+    rules, never the one-row-per-doctor-shift-day index.
+    """
+    duplicate = db.query(models.Schedule.id).filter(
+        models.Schedule.date == schedule.date,
+        models.Schedule.shift_type_id == schedule.shift_type_id,
+        models.Schedule.doctor_id == doctor_id,
+        models.Schedule.id != schedule.id
+    ).first()
+    if duplicate is not None:
+        raise HTTPException(status_code=409, detail="Target doctor already holds this shift on that day")
+    previous = schedule.doctor_id
+    schedule.doctor_id = doctor_id
+    refresh_workload(db, schedule.date, schedule.date, [previous, doctor_id])
+
 @router.get("/trades/", response_model=List[schemas.TradeResponse])
 def get_all_trades(
     db: Session = Depends(get_db),
@@ -91,8 +118,9 @@ def respond_to_trade(
         
         if schedule and schedule.status == 'draft':
             # Auto Approve and Execute
+            _check_trade_conflicts(db, schedule, trade.target_doctor_id)
             trade.status = models.TradeStatus.APPROVED
-            schedule.doctor_id = trade.target_doctor_id
+            _reassign(db, schedule, trade.target_doctor_id)
             
             # Notify Both
             requester = db.query(models.User).get(trade.requester_id)
@@ -140,6 +168,7 @@ def respond_to_trade(
 @router.post("/trades/{trade_id}/approve", response_model=schemas.TradeResponse)
 def admin_approve_trade(
     trade_id: int,
+    force: bool = Query(False, description="Approve even if the trade creates roster conflicts"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_admin_user)
 ):
@@ -156,8 +185,11 @@ def admin_approve_trade(
     if not schedule:
         raise HTTPException(status_code=404, detail="Referenced schedule not found")
         
+    if not force:
+        _check_trade_conflicts(db, schedule, trade.target_doctor_id)
+
     # 将排班的医生改为目标医生
-    schedule.doctor_id = trade.target_doctor_id
+    _reassign(db, schedule, trade.target_doctor_id)
     
     trade.status = models.TradeStatus.APPROVED
     
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from .. import schemas, models
 from ..core import security
+from ..core.auth_cache import user_cache
 from .deps import get_db, get_current_admin_user, get_current_user
 
 router = APIRouter()
@@ -37,8 +38,12 @@ def create_user(
     return db_user
 
 @router.get("/users/me", response_model=schemas.User)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
-    return current_user
+def read_users_me(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    # current_user is a cached identity snapshot; tags and contact details come from the row
+    user = db.query(models.User).filter(models.User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.get("/users/", response_model=List[schemas.User])
 def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
@@ -65,6 +70,7 @@ def update_user(
     
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate(db_user.username)
     return db_user
 
 @router.delete("/users/{user_id}")
@@ -77,6 +83,8 @@ def delete_user(
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
+    db.query(models.WorkloadDaily).filter(models.WorkloadDaily.doctor_id == user_id).delete(synchronize_session=False)
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate(db_user.username)
     return {"message": "User deleted successfully"}
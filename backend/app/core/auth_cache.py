@@ -0,0 +1,109 @@
+"""
+In-process cache of authenticated users, so resolving the bearer token does not cost a
+users-table query on every request.
+
+Entries are identity snapshots (USER_FIELDS, no relationships) keyed by username. They
+expire after USER_CACHE_TTL seconds and the cache holds at most USER_CACHE_SIZE users
+(LRU). update_user / delete_user invalidate the user at once in this process; other
+worker processes see the change when their entry expires.
+
+Read-only endpoints can go further with deps.get_token_user: the token already carries
+uid / role / dept / name claims (signed at login), so no lookup is needed at all until
+it expires (ACCESS_TOKEN_EXPIRE_MINUTES). Anything that writes re-checks the account
+through get_current_user.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, Any, Optional
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_FIELDS = ("id", "username", "full_name", "role", "department_id", "title")
+
+def snapshot_user(user) -> SimpleNamespace:
+    return SimpleNamespace(**{f: getattr(user, f) for f in USER_FIELDS})
+
+class UserCache:
+    """Size-bounded LRU of user snapshots with a TTL and hit/miss counters."""
+    def __init__(self, max_size: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # username -> (loaded_at, snapshot)
+        self._lock = threading.Lock()
+        self._version = 0  # bumped by invalidations; guards puts of rows loaded before one
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.claim_hits = 0  # requests resolved from token claims alone (get_token_user)
+
+    def get(self, username: str) -> Optional[SimpleNamespace]:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl:
+                del self._entries[username]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[1]
+
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    def put(self, username: str, user: SimpleNamespace, version: Optional[int] = None) -> SimpleNamespace:
+        """Store a snapshot, unless an invalidation happened since `version` was read."""
+        if self.max_size <= 0:
+            return user
+        with self._lock:
+            if version is not None and version != self._version:
+                return user
+            self._entries[username] = (time.monotonic(), user)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return user
+
+    def count_claims(self):
+        with self._lock:
+            self.claim_hits += 1
+
+    def invalidate(self, username: Optional[str] = None):
+        """Drop one user (after an update / delete), or everyone."""
+        with self._lock:
+            self._version += 1
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version += 1
+            self.hits = self.misses = self.evictions = self.expirations = self.claim_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "claim_hits": self.claim_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+user_cache = UserCache()
@@ -0,0 +1,99 @@
+"""
+Content-addressed cache of generation results.
+
+The key is a SHA-256 over everything the engine sees (doctors and their qualifications,
+shift type definitions, coverage rules, preferences, balances, hard warm-start state,
+horizon and solver parameters), so any change to the underlying rows produces a new key
+and stale entries simply age out of the LRU. The cache is per process.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from types import SimpleNamespace
+from typing import Dict, Any, Optional
+
+GENERATION_CACHE_SIZE = int(os.getenv("SCHEDULER_CACHE_SIZE", "32"))
+
+# Soft warm-start inputs: they only steer the search, a cached roster stays valid
+SOFT_WARM_START_KEYS = ("hints", "keep")
+
+def _canonical(obj):
+    if isinstance(obj, SimpleNamespace):
+        return _canonical(vars(obj))
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (set, frozenset)):
+        return sorted(_canonical(v) for v in obj)
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return obj
+
+def input_key(payload: Dict[str, Any], solver_params: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of a generation payload (see core/generation.py) plus solver parameters."""
+    data = {k: v for k, v in payload.items() if k != "warm_start"}
+    warm_start = payload.get("warm_start") or {}
+    data["warm_start"] = {k: v for k, v in warm_start.items() if k not in SOFT_WARM_START_KEYS}
+    data["solver_params"] = {k: v for k, v in (solver_params or {}).items() if v is not None}
+    encoded = json.dumps(_canonical(data), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+class GenerationCache:
+    """Size-bounded LRU of {"results", "stats"} outcomes with hit/miss counters."""
+    def __init__(self, max_size: int = GENERATION_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def discard(self, key: str):
+        """Drop an entry found to be stale; the lookup is re-counted as a miss."""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.hits -= 1
+                self.misses += 1
+
+    def put(self, key: str, outcome: Dict[str, Any]):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = outcome
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+generation_cache = GenerationCache()
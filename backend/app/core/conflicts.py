@@ -0,0 +1,202 @@
+"""
+Roster conflict detection (PRD 3.1.2 live conflict highlighting).
+
+RosterIndex holds saved Schedule rows in memory, indexed by (doctor, date) and by
+(date, shift type), and checks every rule in one pass over the cells it is asked
+about: double bookings, night rest (a night followed by any shift the next day),
+shift qualifications and the enabled department rules (core/rules.py conflicts()).
+
+Every check only looks at the neighbourhood of a cell (the next / previous day, the
+consecutive run, the ISO week, the shift's crew), so validating a change costs
+O(changes): validate_reassignment() (trades) and validate_changes() (repairs) load just
+the doctors and dates involved and compare conflicts before and after the change. Rows
+are loaded as far around a range as the enabled rules reach (see Rule.reach).
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from .. import models
+from .generation import snapshot_doctors, load_shift_types, load_rules
+from .rules import build_rule, rule_reach
+from .scheduler import is_night_shift
+from .decomposition import department_subtree
+
+class RosterIndex:
+    def __init__(self, rows: Iterable[Any], shift_types: List[Any], doctors: List[Any], rules: Dict[Optional[int], list]):
+        self.shift_types = {s.id: s for s in shift_types}
+        self.doctors = {d.id: d for d in doctors}
+        self.rules = rules  # department_id -> core.rules.Rule instances
+        self.cells = {}  # (doctor_id, date) -> rows
+        self.slots = {}  # (date, shift_type_id) -> rows
+        for row in rows:
+            self.add(row)
+
+    def add(self, row):
+        self.cells.setdefault((row.doctor_id, row.date), []).append(row)
+        self.slots.setdefault((row.date, row.shift_type_id), []).append(row)
+
+    def remove(self, row):
+        self.cells[(row.doctor_id, row.date)].remove(row)
+        self.slots[(row.date, row.shift_type_id)].remove(row)
+
+    def move(self, row, doctor_id: int):
+        """Reassign a row to another doctor (a trade)."""
+        self.remove(row)
+        row.doctor_id = doctor_id
+        self.add(row)
+
+    # Lookups used by the checks and by Rule.conflicts()
+    def shifts(self, doctor_id: int, day: date) -> list:
+        return self.cells.get((doctor_id, day), [])
+
+    def works(self, doctor_id: int, day: date) -> bool:
+        return bool(self.cells.get((doctor_id, day)))
+
+    def slot(self, day: date, shift_type_id: int) -> list:
+        return self.slots.get((day, shift_type_id), [])
+
+    def is_night(self, row) -> bool:
+        shift = self.shift_types.get(row.shift_type_id)
+        return shift is not None and is_night_shift(shift)
+
+    def department_of(self, doctor_id: int) -> Optional[int]:
+        doctor = self.doctors.get(doctor_id)
+        return doctor.department_id if doctor is not None else None
+
+    def qualifications(self, doctor_id: int):
+        doctor = self.doctors.get(doctor_id)
+        return getattr(doctor, "qualifications", ()) if doctor is not None else ()
+
+    def conflict(self, kind: str, doctor_id: Optional[int], day: date, message: str, shift_type_id: Optional[int] = None, rows=()) -> Dict[str, Any]:
+        return {
+            "kind": kind,
+            "doctor_id": doctor_id,
+            "date": day,
+            "shift_type_id": shift_type_id,
+            "schedule_ids": sorted(r.id for r in rows if r.id is not None),
+            "message": message,
+        }
+
+    def check(self, cells: Optional[Iterable[Tuple[int, date]]] = None) -> List[Dict[str, Any]]:
+        """Conflicts involving the given (doctor_id, date) cells (every indexed cell by default)."""
+        found = {}
+
+        def report(c):
+            found.setdefault((c["kind"], c["doctor_id"], c["date"], c["shift_type_id"]), c)
+
+        for doctor_id, day in (list(self.cells) if cells is None else cells):
+            rows = self.shifts(doctor_id, day)
+            if len(rows) > 1:
+                report(self.conflict("double_booking", doctor_id, day, f"{len(rows)} shifts on the same day", rows=rows))
+            for night_day in (day - timedelta(days=1), day):
+                nights = [r for r in self.shifts(doctor_id, night_day) if self.is_night(r)]
+                following = self.shifts(doctor_id, night_day + timedelta(days=1))
+                if nights and following:
+                    report(self.conflict("night_rest", doctor_id, night_day, "Shift on the day after a night shift", rows=nights + following))
+            for row in rows:
+                shift = self.shift_types.get(row.shift_type_id)
+                required = getattr(shift, "required_qualification", None)
+                if required and required not in self.qualifications(doctor_id):
+                    report(self.conflict("qualification", doctor_id, day, f"{shift.name} requires {required}", shift_type_id=row.shift_type_id, rows=[row]))
+            for rule in self.rules.get(self.department_of(doctor_id), ()):
+                for c in rule.conflicts(self, doctor_id, day):
+                    report(c)
+        return sorted(found.values(), key=lambda c: (c["date"], c["kind"], c["doctor_id"] or 0))
+
+def conflict_margin(db: Session) -> int:
+    """Days loaded around a range: the night-rest day, or as far as any enabled rule reaches (runs, weeks)."""
+    rows = db.query(models.DepartmentRule.rule, models.DepartmentRule.params).filter(models.DepartmentRule.enabled == True).all()
+    return max(1, rule_reach({"rule": rule, "params": params or {}} for rule, params in rows))
+
+def _row(schedule) -> SimpleNamespace:
+    return SimpleNamespace(id=schedule.id, doctor_id=schedule.doctor_id, date=schedule.date, shift_type_id=schedule.shift_type_id)
+
+def load_roster(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    doctor_ids: Optional[List[int]] = None,
+    crew_dates: Iterable[date] = (),
+) -> RosterIndex:
+    """
+    Index the rows of [start_date, end_date] plus conflict_margin() days on each side,
+    optionally only for doctor_ids (plus everyone on crew_dates, for crew-level rules).
+    """
+    margin = conflict_margin(db)
+    query = db.query(models.Schedule).filter(
+        models.Schedule.date >= start_date - timedelta(days=margin),
+        models.Schedule.date <= end_date + timedelta(days=margin),
+    )
+    if doctor_ids is not None:
+        crew_dates = list(crew_dates)
+        scope = models.Schedule.doctor_id.in_(doctor_ids)
+        query = query.filter(or_(scope, models.Schedule.date.in_(crew_dates)) if crew_dates else scope)
+    rows = [_row(s) for s in query]
+
+    ids = {r.doctor_id for r in rows} | set(doctor_ids or ())
+    doctors = snapshot_doctors(db, db.query(models.User).filter(models.User.id.in_(ids)).all()) if ids else []
+    rules = {}
+    for department_id in {d.department_id for d in doctors}:
+        rules[department_id] = [build_rule(r["rule"], r["params"]) for r in load_rules(db, department_id)]
+    return RosterIndex(rows, load_shift_types(db), doctors, rules)
+
+def find_conflicts(db: Session, start_date: date, end_date: date, department_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """All conflicts dated within [start_date, end_date], optionally for a department subtree."""
+    roster = load_roster(db, start_date, end_date)
+    conflicts = [c for c in roster.check() if start_date <= c["date"] <= end_date]
+    if department_id is not None:
+        departments = set(department_subtree(db.query(models.Department).all(), department_id))
+        conflicts = [
+            c for c in conflicts
+            if any(roster.department_of(d) in departments for d in _doctors_of(roster, c))
+        ]
+    return conflicts
+
+def _doctors_of(roster: RosterIndex, conflict: Dict[str, Any]) -> List[int]:
+    if conflict["doctor_id"] is not None:
+        return [conflict["doctor_id"]]
+    return [r.doctor_id for r in roster.slot(conflict["date"], conflict["shift_type_id"])]
+
+def _introduced(roster: RosterIndex, cells: List[Tuple[int, date]], change) -> List[Dict[str, Any]]:
+    """Conflicts around `cells` after change() that were not there before it."""
+    def key(c):
+        return (c["kind"], c["doctor_id"], c["date"], c["shift_type_id"])
+    before = {key(c) for c in roster.check(cells)}
+    change()
+    return [c for c in roster.check(cells) if key(c) not in before]
+
+def validate_reassignment(db: Session, schedule: models.Schedule, doctor_id: int) -> List[Dict[str, Any]]:
+    """
+    Conflicts that moving `schedule` to `doctor_id` would introduce (pre-existing ones are
+    ignored). Only the two doctors around the date and that day's crews are loaded.
+    """
+    day = schedule.date
+    roster = load_roster(db, day, day, doctor_ids=[schedule.doctor_id, doctor_id], crew_dates=[day])
+    row = next((r for r in roster.shifts(schedule.doctor_id, day) if r.id == schedule.id), None)
+    if row is None:
+        return []
+    return _introduced(roster, [(schedule.doctor_id, day), (doctor_id, day)], lambda: roster.move(row, doctor_id))
+
+def validate_changes(db: Session, removed: List[Any], added: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Conflicts that deleting the `removed` Schedule rows and inserting the `added`
+    {"doctor_id", "date", "shift_type_id"} assignments would introduce (e.g. a repair diff).
+    """
+    cells = list(dict.fromkeys(
+        [(row.doctor_id, row.date) for row in removed] + [(item["doctor_id"], item["date"]) for item in added]
+    ))
+    if not cells:
+        return []
+    dates = sorted({day for _, day in cells})
+    roster = load_roster(db, dates[0], dates[-1], doctor_ids=list({doctor_id for doctor_id, _ in cells}), crew_dates=dates)
+
+    def change():
+        removed_ids = {row.id for row in removed}
+        for doctor_id, day in cells:
+            for row in [r for r in roster.shifts(doctor_id, day) if r.id in removed_ids]:
+                roster.remove(row)
+        for item in added:
+            roster.add(SimpleNamespace(id=None, doctor_id=item["doctor_id"], date=item["date"], shift_type_id=item["shift_type_id"]))
+    return _introduced(roster, cells, change)
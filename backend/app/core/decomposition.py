@@ -0,0 +1,148 @@
+"""
+Hospital-wide generation by department decomposition.
+
+Departments do not share doctors, so a hospital (or any department subtree) splits into
+independent sub-problems: one per department that has doctors of its own, each covering
+every shift type. The sub-models are solved concurrently in a process pool and the
+results merged into one roster with a per-department status report.
+"""
+import os
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import List, Dict, Any, Optional
+from sqlalchemy.orm import Session
+from .. import models
+from .generation import snapshot_doctors, run_generation, lookup_cached, store_cached, load_shift_types, load_coverage, load_rules, load_preferences, load_balances
+from .feasibility import check_feasibility
+from .scheduler import DEFAULT_NUM_WORKERS
+from .holidays import load_calendar
+
+DECOMPOSE_WORKERS = int(os.getenv("SCHEDULER_DECOMPOSE_WORKERS", str(os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=DECOMPOSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def department_subtree(departments: List[models.Department], root_id: Optional[int]) -> List[int]:
+    """Ids of root_id and all its descendants (every department when root_id is None)."""
+    if root_id is None:
+        return [d.id for d in departments]
+    children = {}
+    for d in departments:
+        children.setdefault(d.parent_id, []).append(d.id)
+    subtree, stack = [], [root_id]
+    while stack:
+        dept_id = stack.pop()
+        subtree.append(dept_id)
+        stack.extend(children.get(dept_id, []))
+    return subtree
+
+def load_department_payloads(
+    db: Session,
+    start_date: date,
+    days: int,
+    department_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """One generation payload per department (in the subtree) that has doctors."""
+    departments = db.query(models.Department).all()
+    names = {d.id: d.name for d in departments}
+    dept_ids = department_subtree(departments, department_id)
+
+    query = db.query(models.User).filter(models.User.role == models.RoleEnum.DOCTOR)
+    if department_id is not None:
+        query = query.filter(models.User.department_id.in_(dept_ids))
+
+    by_department = {}
+    for doc in snapshot_doctors(db, query.all()):
+        by_department.setdefault(doc.department_id, []).append(doc)
+
+    shift_types = load_shift_types(db)
+    doctor_ids = [doc.id for doctors in by_department.values() for doc in doctors]
+    preferences = {}
+    for pref in load_preferences(db, doctor_ids, start_date, days):
+        preferences.setdefault(pref[0], []).append(pref)
+    balances = load_balances(db, doctor_ids, shift_types, start_date)
+    calendar = load_calendar(db, start_date, days)
+    units = []
+    for dept_id, doctors in sorted(by_department.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+        units.append({
+            "doctors": doctors,
+            "shift_types": shift_types,
+            "coverage": load_coverage(db, dept_id),
+            "rules": load_rules(db, dept_id),
+            "preferences": [p for doc in doctors for p in preferences.get(doc.id, ())],
+            "balances": {doc.id: balances[doc.id] for doc in doctors if doc.id in balances},
+            "calendar": calendar,
+            "start_date": start_date,
+            "days": days,
+            "department_id": dept_id,
+            "department_name": names.get(dept_id),
+        })
+    return units
+
+def solve_departments(units: List[Dict[str, Any]], solver_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Solve every department payload, in parallel when there is more than one. Units that
+    fail the counting checks (see core/feasibility.py) are reported INFEASIBLE unsolved.
+    Returns {"results": merged assignments, "departments": per-unit reports, "wall_time": s}.
+    """
+    t0 = time.perf_counter()
+    outcomes, keys, pending = [], [], []
+    for idx, unit in enumerate(units):
+        issues = check_feasibility(unit)
+        if issues:
+            keys.append(None)
+            outcomes.append({"results": None, "stats": {"status": "INFEASIBLE", "error": "; ".join(i["message"] for i in issues), "wall_time": 0.0}})
+            continue
+        key, cached = lookup_cached(unit, solver_params)
+        keys.append(key)
+        outcomes.append(cached)
+        if cached is None:
+            pending.append(idx)
+
+    unit_params = dict(solver_params or {})
+    if len(pending) > 1:
+        # Share the host's cores between concurrent sub-solves
+        total_workers = unit_params.get("num_workers") or DEFAULT_NUM_WORKERS
+        parallel = min(len(pending), DECOMPOSE_WORKERS)
+        unit_params["num_workers"] = max(1, total_workers // parallel)
+        pool = _get_pool()
+        futures = {idx: pool.submit(run_generation, units[idx], unit_params) for idx in pending}
+        for idx, future in futures.items():
+            try:
+                outcomes[idx] = future.result()
+            except Exception as e:
+                outcomes[idx] = {"results": None, "stats": {"status": "ERROR", "error": str(e), "wall_time": 0.0}}
+    else:
+        for idx in pending:
+            outcomes[idx] = run_generation(units[idx], unit_params)
+    for idx in pending:
+        store_cached(keys[idx], units[idx], outcomes[idx])
+
+    merged, reports = [], []
+    for unit, outcome in zip(units, outcomes):
+        stats = outcome["stats"]
+        results = outcome["results"]
+        if results:
+            merged.extend(results)
+        reports.append({
+            "department_id": unit["department_id"],
+            "department_name": unit["department_name"],
+            "doctors": len(unit["doctors"]),
+            "status": stats["status"],
+            "objective": stats.get("objective"),
+            "wall_time": stats.get("wall_time", 0.0),
+            "assignments": len(results) if results else 0,
+            "error": stats.get("error"),
+            "cache_hit": stats.get("cache_hit", False),
+        })
+    return {"results": merged, "departments": reports, "wall_time": time.perf_counter() - t0}
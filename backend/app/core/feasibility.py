@@ -0,0 +1,183 @@
+"""
+Pre-solve feasibility analysis.
+
+check_feasibility() runs cheap counting checks on a generation payload before CP-SAT
+sees it: per (day, shift) headcount vs. doctors who may work that cell, per-day totals
+vs. doctors available that day (one shift per day), night rest (tonight's night shifts
+and tomorrow's shifts need distinct doctors) and qualification rules. Any violation is
+a proof of infeasibility and names the day/shift responsible.
+
+When the counts pass but the solver still proves infeasibility, explain_infeasibility()
+rebuilds the model with every rule group behind a CP-SAT assumption literal and shrinks
+the solver's sufficient assumptions into a minimal unsat core.
+"""
+import time
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
+from ortools.sat.python import cp_model
+from .generation import configure_engine
+from .scheduler import is_night_shift
+
+CORE_TIME_LIMIT = 5.0  # seconds for core extraction + minimisation
+
+def _issue(kind: str, message: str, day=None, shift=None, **counts) -> Dict[str, Any]:
+    return {
+        "kind": kind,
+        "date": day,
+        "shift_type_id": shift.id if shift is not None else None,
+        "shift": shift.name if shift is not None else None,
+        "message": message,
+        **counts,
+    }
+
+def check_feasibility(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Counting checks; returns the over-constrained days/shifts (empty if none found)."""
+    engine = configure_engine(payload)
+    shift_types = engine.shift_types
+    n_docs, n_days, n_shifts = len(engine.doctors), engine.num_days, len(shift_types)
+    lo, hi, qualified = engine.demand()
+    eligible, blocked_days, blocked_cells = engine.masks()
+
+    night_idx = [k for k, s in enumerate(shift_types) if is_night_shift(s)]
+    night_ids = {shift_types[k].id for k in night_idx}
+    after_night = {engine.doc_index[doc_id] for doc_id, st in engine.previous_day if st in night_ids and doc_id in engine.doc_index}
+    before_shift = {engine.doc_index[doc_id] for doc_id, _ in engine.next_day if doc_id in engine.doc_index}
+    fixed = {}
+    for doc_id, d, st in engine.fixed:
+        if doc_id in engine.doc_index and st in engine.shift_index and 0 <= d < n_days:
+            fixed.setdefault((d, engine.shift_index[st]), set()).add(engine.doc_index[doc_id])
+
+    def can_work(i, d, k):
+        if i in fixed.get((d, k), ()):
+            return True
+        if not eligible[i][k] or (i, d) in blocked_days or (i, d, k) in blocked_cells:
+            return False
+        if d == 0 and i in after_night:
+            return False
+        return not (d == n_days - 1 and k in night_idx and i in before_shift)
+
+    # who[d][k]: doctors who may take shift k on day d
+    who = [[{i for i in range(n_docs) if can_work(i, d, k)} for k in range(n_shifts)] for d in range(n_days)]
+    issues = []
+    for d in range(n_days):
+        day = engine.start_date + timedelta(days=d)
+        for k, shift in enumerate(shift_types):
+            if lo[d][k] > len(who[d][k]):
+                issues.append(_issue(
+                    "shift_understaffed",
+                    f"{day} {shift.name}: needs {lo[d][k]} doctors, only {len(who[d][k])} can work it",
+                    day, shift, required=lo[d][k], available=len(who[d][k]),
+                ))
+            if len(fixed.get((d, k), ())) > hi[d][k]:
+                issues.append(_issue(
+                    "fixed_over_max",
+                    f"{day} {shift.name}: {len(fixed[(d, k)])} fixed assignments exceed the maximum of {hi[d][k]}",
+                    day, shift, required=hi[d][k], available=len(fixed[(d, k)]),
+                ))
+        available = set().union(*who[d]) if n_shifts else set()
+        required = sum(lo[d])
+        if required > len(available):
+            issues.append(_issue(
+                "day_understaffed",
+                f"{day}: {required} shifts to staff but only {len(available)} doctors available (one shift per day)",
+                day, required=required, available=len(available),
+            ))
+        if night_idx and d + 1 < n_days:
+            # Doctors on tonight's nights cannot work tomorrow, so the two sets are disjoint
+            nights_required = sum(lo[d][k] for k in night_idx)
+            pool = set().union(*(who[d][k] for k in night_idx), *who[d + 1])
+            required = nights_required + sum(lo[d + 1])
+            if nights_required and required > len(pool):
+                issues.append(_issue(
+                    "night_rest",
+                    f"{day} night + {day + timedelta(days=1)}: {required} doctors needed after night rest, only {len(pool)} available",
+                    day, required=required, available=len(pool),
+                ))
+
+    holders = {}
+    for d, k, qualification, min_count, _ in qualified:
+        if qualification not in holders:
+            holders[qualification] = {i for i, doc in enumerate(engine.doctors) if qualification in getattr(doc, "qualifications", ())}
+        available = len(who[d][k] & holders[qualification])
+        if min_count > available:
+            day = engine.start_date + timedelta(days=d)
+            issues.append(_issue(
+                "qualification",
+                f"{day} {shift_types[k].name}: needs {min_count} doctors with {qualification}, only {available} available",
+                day, shift_types[k], required=min_count, available=available, qualification=qualification,
+            ))
+    return issues
+
+def _describe(engine, label) -> Dict[str, Any]:
+    kind = label[0]
+    if kind == "coverage":
+        _, d, k = label
+        return {"rule": kind, "date": engine.start_date + timedelta(days=d), "shift_type_id": engine.shift_types[k].id, "shift": engine.shift_types[k].name}
+    if kind == "qualification":
+        _, d, k, qualification = label
+        return {"rule": kind, "date": engine.start_date + timedelta(days=d), "shift_type_id": engine.shift_types[k].id, "shift": engine.shift_types[k].name, "qualification": qualification}
+    if kind == "fixed":
+        _, doctor_id, d, shift_type_id = label
+        return {"rule": kind, "doctor_id": doctor_id, "date": engine.start_date + timedelta(days=d), "shift_type_id": shift_type_id}
+    if kind == "rule":
+        return {"rule": label[1]}  # a department rule from core/rules.py
+    return {"rule": kind, "doctor_id": label[1]}  # night_rest / previous_night / next_shift
+
+def explain_infeasibility(payload: Dict[str, Any], time_limit: float = CORE_TIME_LIMIT) -> Optional[List[Dict[str, Any]]]:
+    """
+    Minimal set of rule groups that cannot hold together, or None if the model is not
+    proven infeasible within time_limit. Objectives are dropped; one shift per doctor-day
+    and the availability masks stay hard.
+    """
+    deadline = time.perf_counter() + time_limit
+    engine = configure_engine({**payload, "engine": "cpsat"})  # cores need the CP model
+    engine.explain = True
+    engine.fairness_weights = {}
+    engine.build_model()
+    model = engine.model
+    model.ClearObjective()
+    model.ClearHints()
+    labels = {lit.Index(): label for label, lit in engine.assumptions.items()}
+
+    def infeasible_under(lits):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = remaining
+        solver.parameters.num_search_workers = 1  # core extraction needs a single worker
+        model.ClearAssumptions()
+        model.AddAssumptions(lits)
+        status = solver.Solve(model)
+        if status == cp_model.INFEASIBLE:
+            return solver
+        return False if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None
+
+    solver = infeasible_under(list(engine.assumptions.values()))
+    if not solver:
+        return None
+    core = [engine.assumptions[labels[i]] for i in solver.SufficientAssumptionsForInfeasibility()]
+
+    # Deletion-based minimisation: drop every literal the contradiction does not need
+    for lit in list(core):
+        trial = [c for c in core if c is not lit]
+        result = infeasible_under(trial)
+        if result is None:
+            break  # out of time: the core is valid, just not minimal
+        if result:
+            core = trial
+    return [_describe(engine, labels[lit.Index()]) for lit in core]
+
+def analyze_feasibility(payload: Dict[str, Any], with_core: bool = False) -> Dict[str, Any]:
+    """Counting checks, plus the unsat core when they pass and with_core is set."""
+    t0 = time.perf_counter()
+    issues = check_feasibility(payload)
+    core = None
+    if not issues and with_core:
+        core = explain_infeasibility(payload)
+    return {
+        "feasible": False if issues or core else None,
+        "issues": issues,
+        "core": core,
+        "analysis_ms": (time.perf_counter() - t0) * 1000,
+    }
@@ -0,0 +1,404 @@
+"""
+Schedule generation pipeline: load inputs from the DB, run the engine, save drafts.
+
+Inputs are snapshotted into plain SimpleNamespace objects so the same payload can be
+solved in the request thread or shipped to a worker process (see core/jobs.py).
+"""
+import os
+from types import SimpleNamespace
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Callable
+from sqlalchemy import insert, delete, exists, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from .. import models
+from .scheduler import SchedulingEngine, is_night_shift
+from .heuristic import HeuristicEngine
+from .cache import generation_cache, input_key
+from .rolling import run_rolling
+from .rules import build_rule, rule_reach
+from .workload import refresh_workload
+from .holidays import calendar_cache, load_calendar, is_rest_day
+
+DOCTOR_FIELDS = ("id", "full_name", "department_id", "title")
+SHIFT_TYPE_FIELDS = ("id", "name", "start_time", "end_time", "weight", "required_qualification", "shift_category")
+COVERAGE_FIELDS = ("shift_type_id", "department_id", "weekday", "date", "min_count", "max_count", "qualification")
+
+BULK_BATCH_SIZE = 1000  # rows per executemany / IN (...) batch
+CACHEABLE_STATUSES = ("OPTIMAL", "FEASIBLE", "INFEASIBLE")  # UNKNOWN depends on machine load
+BALANCE_LOOKBACK_DAYS = int(os.getenv("SCHEDULER_BALANCE_LOOKBACK_DAYS", "56"))  # carry-over window
+ENGINES = {"cpsat": SchedulingEngine, "heuristic": HeuristicEngine}  # payload["engine"], default cpsat
+
+def snapshot(obj, fields) -> SimpleNamespace:
+    return SimpleNamespace(**{f: getattr(obj, f) for f in fields})
+
+def snapshot_doctors(db: Session, doctors: List[models.User]) -> List[SimpleNamespace]:
+    """
+    Doctor snapshots carrying `qualifications`: tag names plus the title (e.g. 主治医师).
+    Tags for all doctors come from a single user_tags join instead of one lazy load each.
+    """
+    ids = [d.id for d in doctors]
+    tags = {}
+    for i in range(0, len(ids), BULK_BATCH_SIZE):
+        rows = db.query(models.user_tags.c.user_id, models.Tag.name).join(
+            models.Tag, models.Tag.id == models.user_tags.c.tag_id
+        ).filter(models.user_tags.c.user_id.in_(ids[i:i + BULK_BATCH_SIZE]))
+        for user_id, name in rows:
+            tags.setdefault(user_id, set()).add(name)
+
+    snapshots = []
+    for doc in doctors:
+        snap = snapshot(doc, DOCTOR_FIELDS)
+        qualifications = set(tags.get(doc.id, ()))
+        if doc.title:
+            qualifications.add(doc.title)
+        snap.qualifications = frozenset(qualifications)
+        snapshots.append(snap)
+    return snapshots
+
+def load_coverage(db: Session, department_id: Optional[int] = None) -> List[SimpleNamespace]:
+    """Global coverage rules plus the department's own ones."""
+    query = db.query(models.CoverageRequirement)
+    if department_id:
+        query = query.filter(or_(
+            models.CoverageRequirement.department_id == None,
+            models.CoverageRequirement.department_id == department_id
+        ))
+    else:
+        query = query.filter(models.CoverageRequirement.department_id == None)
+    return [snapshot(r, COVERAGE_FIELDS) for r in query.all()]
+
+def load_rules(db: Session, department_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Enabled rules for a department as {"rule", "params"} dicts: hospital-wide rows, replaced
+    (or disabled) by the department's own row for the same rule.
+    """
+    query = db.query(models.DepartmentRule)
+    if department_id:
+        query = query.filter(or_(
+            models.DepartmentRule.department_id == None,
+            models.DepartmentRule.department_id == department_id
+        ))
+    else:
+        query = query.filter(models.DepartmentRule.department_id == None)
+    chosen = {}
+    for row in sorted(query.all(), key=lambda r: (r.department_id is not None, r.id)):
+        chosen[row.rule] = row
+    return [{"rule": row.rule, "params": dict(row.params or {})} for row in chosen.values() if row.enabled]
+
+def load_shift_types(db: Session) -> List[SimpleNamespace]:
+    """All shift types, creating a default Day/Night pair on an empty database."""
+    shift_types = db.query(models.ShiftType).all()
+    if not shift_types:
+        day_shift = models.ShiftType(name="Day Shift", start_time="08:00", end_time="17:00")
+        night_shift = models.ShiftType(name="Night Shift", start_time="17:00", end_time="08:00", shift_category="night")
+        db.add(day_shift)
+        db.add(night_shift)
+        db.commit()
+        shift_types = [day_shift, night_shift]
+    return [snapshot(s, SHIFT_TYPE_FIELDS) for s in shift_types]
+
+def load_preferences(db: Session, doctor_ids: List[int], start_date: date, days: int) -> List[tuple]:
+    """
+    All preferences of the given doctors inside the horizon in one range query, as
+    (doctor_id, day_index, "desire"/"avoid", shift_type_id or None) tuples.
+    """
+    if not doctor_ids:
+        return []
+    rows = db.query(
+        models.Preference.user_id,
+        models.Preference.date,
+        models.Preference.type,
+        models.Preference.shift_type_id
+    ).filter(
+        models.Preference.user_id.in_(doctor_ids),
+        models.Preference.date >= start_date,
+        models.Preference.date < start_date + timedelta(days=days)
+    ).all()
+    return [
+        (user_id, (pref_date - start_date).days, getattr(pref_type, "value", pref_type), shift_type_id)
+        for user_id, pref_date, pref_type, shift_type_id in rows
+    ]
+
+def load_balances(
+    db: Session,
+    doctor_ids: List[int],
+    shift_types: List[SimpleNamespace],
+    start_date: date,
+    lookback_days: int = BALANCE_LOOKBACK_DAYS,
+) -> Dict[int, tuple]:
+    """
+    Carry-over fairness balances from the `lookback_days` before start_date, in one range
+    query: {doctor_id: (weighted load, nights, weekend shifts)}, each counter shifted so
+    the least-loaded doctor starts at 0.
+    """
+    if not doctor_ids or lookback_days <= 0:
+        return {}
+    shifts = {s.id: (s.weight or 1, is_night_shift(s)) for s in shift_types}
+    calendar = calendar_cache.get(db)
+    rows = db.query(models.Schedule.doctor_id, models.Schedule.date, models.Schedule.shift_type_id).filter(
+        models.Schedule.doctor_id.in_(doctor_ids),
+        models.Schedule.date >= start_date - timedelta(days=lookback_days),
+        models.Schedule.date < start_date
+    ).all()
+
+    totals = {doctor_id: [0, 0, 0] for doctor_id in doctor_ids}
+    for doctor_id, day, shift_type_id in rows:
+        if shift_type_id not in shifts:
+            continue
+        weight, night = shifts[shift_type_id]
+        counters = totals[doctor_id]
+        counters[0] += weight
+        counters[1] += night
+        counters[2] += is_rest_day(day, calendar)
+    floors = [min(c[n] for c in totals.values()) for n in range(3)]
+    return {
+        doctor_id: tuple(c[n] - floors[n] for n in range(3))
+        for doctor_id, c in totals.items()
+        if any(c[n] - floors[n] for n in range(3))
+    }
+
+def load_generation_inputs(
+    db: Session,
+    start_date: date,
+    days: int,
+    department_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    query = db.query(models.User).filter(models.User.role == models.RoleEnum.DOCTOR)
+    if department_id:
+        query = query.filter(models.User.department_id == department_id)
+    doctors = snapshot_doctors(db, query.all())
+    doctor_ids = [d.id for d in doctors]
+    shift_types = load_shift_types(db)
+
+    return {
+        "doctors": doctors,
+        "shift_types": shift_types,
+        "coverage": load_coverage(db, department_id),
+        "rules": load_rules(db, department_id),
+        "preferences": load_preferences(db, doctor_ids, start_date, days),
+        "balances": load_balances(db, doctor_ids, shift_types, start_date),
+        "calendar": load_calendar(db, start_date, days),
+        "start_date": start_date,
+        "days": days,
+    }
+
+def _has_trade():
+    """Whether a shift trade references the schedule row (such rows must not be deleted)."""
+    return exists().where(models.ShiftTrade.request_shift_id == models.Schedule.id)
+
+def attach_warm_start(db: Session, payload: Dict[str, Any], keep_published: bool = True) -> Dict[str, Any]:
+    """
+    Load existing assignments around the horizon into payload["warm_start"] in one range query:
+    - rows inside the horizon: drafts become hints (and "keep" targets), published rows are
+      fixed when keep_published, otherwise hinted; drafts a shift trade references are
+      always fixed, since save_generated_schedules will not delete them;
+    - the previous period of the same length hints cells not covered by the current period;
+    - rows on start_date - 1 carry the night-rest rule across the boundary, and the days the
+      enabled rules look back at (consecutive duty runs, nights earlier in the week) become
+      the history.
+    """
+    start, days = payload["start_date"], payload["days"]
+    reach = rule_reach(payload.get("rules"))
+    doctor_ids = [d.id for d in payload["doctors"]]
+    rows = db.query(
+        models.Schedule.doctor_id,
+        models.Schedule.date,
+        models.Schedule.shift_type_id,
+        models.Schedule.status,
+        _has_trade()
+    ).filter(
+        models.Schedule.doctor_id.in_(doctor_ids),
+        models.Schedule.date >= start - timedelta(days=max(days, reach)),
+        models.Schedule.date < start + timedelta(days=days)
+    ).all()
+
+    hints, keep, fixed, previous_day, previous_period, history = [], [], [], [], [], []
+    covered = set()  # (day, shift_type_id) seeded from the current period
+    for doctor_id, day, shift_type_id, status, traded in rows:
+        offset = (day - start).days
+        if offset >= 0:
+            if (status != "draft" and keep_published) or traded:
+                fixed.append((doctor_id, offset, shift_type_id))
+            else:
+                hints.append((doctor_id, offset, shift_type_id))
+                keep.append((doctor_id, offset, shift_type_id))
+            covered.add((offset, shift_type_id))
+        else:
+            if offset == -1:
+                previous_day.append((doctor_id, shift_type_id))
+            if offset >= -reach:
+                history.append((doctor_id, offset, shift_type_id))
+            if offset >= -days:
+                previous_period.append((doctor_id, offset + days, shift_type_id))
+    hints.extend(a for a in previous_period if (a[1], a[2]) not in covered)
+
+    payload["warm_start"] = {"hints": hints, "keep": keep, "fixed": fixed, "previous_day": previous_day, "history": history}
+    return payload
+
+def configure_engine(payload: Dict[str, Any]) -> SchedulingEngine:
+    """An engine (payload["engine"], CP-SAT by default) with every payload input applied (model not built yet)."""
+    engine = ENGINES[payload.get("engine") or "cpsat"](payload["doctors"], payload["shift_types"], payload["start_date"], payload["days"])
+    if payload.get("warm_start"):
+        engine.set_warm_start(**payload["warm_start"])
+    if payload.get("unavailable"):
+        engine.set_unavailable(payload["unavailable"])
+    if payload.get("coverage"):
+        engine.set_coverage(payload["coverage"])
+    if payload.get("preferences"):
+        engine.set_preferences(payload["preferences"])
+    if payload.get("balances"):
+        engine.set_balances(payload["balances"])
+    if payload.get("calendar"):
+        engine.set_calendar(**payload["calendar"])
+    if "fairness_weights" in payload:
+        engine.fairness_weights = dict(payload["fairness_weights"])
+    if payload.get("rules"):
+        engine.set_rules(build_rule(r["rule"], r["params"]) for r in payload["rules"])
+    return engine
+
+def run_generation(
+    payload: Dict[str, Any],
+    solver_params: Optional[Dict[str, Any]] = None,
+    on_solution: Optional[Callable[[float, float], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Build and solve one roster. Returns {"results": [...] or None, "stats": {...}}.
+    Payloads with "rolling" settings are solved window by window (see core/rolling.py).
+    """
+    if payload.get("rolling"):
+        return run_rolling(payload, run_generation, solver_params, on_solution, should_stop)
+    engine = configure_engine(payload)
+    engine.build_model()
+    results = engine.solve(on_solution=on_solution, should_stop=should_stop, **(solver_params or {}))
+    return {"results": results, "stats": engine.stats}
+
+def lookup_cached(payload: Dict[str, Any], solver_params: Optional[Dict[str, Any]] = None):
+    """
+    Returns (key, outcome or None). A cached roster is only reused while the current
+    drafts (warm-start "keep") are either absent or exactly that roster, so manual
+    edits since it was saved force a re-solve.
+    """
+    key = input_key(payload, solver_params)
+    entry = generation_cache.get(key)
+    if entry is None:
+        return key, None
+    keep = set((payload.get("warm_start") or {}).get("keep", ()))
+    if keep and keep != entry["cells"]:
+        generation_cache.discard(key)
+        return key, None
+    return key, {"results": entry["results"], "stats": {**entry["stats"], "cache_hit": True}}
+
+def store_cached(key: str, payload: Dict[str, Any], outcome: Dict[str, Any]):
+    if outcome["stats"].get("status") not in CACHEABLE_STATUSES:
+        return
+    start = payload["start_date"]
+    fixed = set((payload.get("warm_start") or {}).get("fixed", ()))
+    cells = {
+        (r["doctor_id"], (r["date"] - start).days, r["shift_type_id"]) for r in outcome["results"] or ()
+    } - fixed
+    generation_cache.put(key, {"results": outcome["results"], "stats": dict(outcome["stats"]), "cells": cells})
+
+def run_generation_cached(payload: Dict[str, Any], solver_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """run_generation() behind the content-addressed result cache (see core/cache.py)."""
+    key, outcome = lookup_cached(payload, solver_params)
+    if outcome is None:
+        outcome = run_generation(payload, solver_params)
+        store_cached(key, payload, outcome)
+        outcome = {**outcome, "stats": {**outcome["stats"], "cache_hit": False}}
+    return outcome
+
+def _insert_ignoring_conflicts(db: Session):
+    """INSERT ... ON CONFLICT DO NOTHING where the dialect supports it (SQLite / PostgreSQL)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(models.Schedule).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(models.Schedule).on_conflict_do_nothing()
+    return insert(models.Schedule)
+
+def save_generated_schedules(
+    db: Session,
+    results: List[Dict[str, Any]],
+    replace_drafts_for: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """
+    Persist solver output as draft schedules, skipping rows that already exist.
+    With replace_drafts_for (a generation payload), drafts of its doctors inside its horizon
+    that are no longer part of the result are deleted, so a warm-started regeneration
+    replaces the previous draft instead of piling up next to it. Drafts a shift trade
+    references are never deleted (attach_warm_start fixes them, so they stay in the result).
+
+    Set-based: one range query loads the stored (date, shift_type_id, doctor_id) keys,
+    stale drafts are deleted and new rows inserted in executemany batches backed by the
+    unique index on those columns. Returns the inserted rows (id, date, doctor_id, ...).
+    """
+    doctor_ids = {r["doctor_id"] for r in results}
+    dates = [r["date"] for r in results]
+    lo, hi = (min(dates), max(dates)) if dates else (None, None)
+    replace_ids, replace_start, replace_end = set(), None, None
+    if replace_drafts_for is not None:
+        replace_ids = {d.id for d in replace_drafts_for["doctors"]}
+        replace_start = replace_drafts_for["start_date"]
+        replace_end = replace_start + timedelta(days=replace_drafts_for["days"] - 1)
+        doctor_ids |= replace_ids
+        lo = min(lo, replace_start) if lo else replace_start
+        hi = max(hi, replace_end) if hi else replace_end
+    if not doctor_ids or lo is None:
+        return []
+
+    # 1. One range query for every stored row in scope
+    new_keys = {(r["date"], r["shift_type_id"], r["doctor_id"]) for r in results}
+    existing, stale_ids = set(), []
+    rows = db.query(
+        models.Schedule.id,
+        models.Schedule.date,
+        models.Schedule.shift_type_id,
+        models.Schedule.doctor_id,
+        models.Schedule.status,
+        _has_trade()
+    ).filter(
+        models.Schedule.doctor_id.in_(doctor_ids),
+        models.Schedule.date >= lo,
+        models.Schedule.date <= hi
+    )
+    for schedule_id, day, shift_type_id, doctor_id, status, traded in rows:
+        key = (day, shift_type_id, doctor_id)
+        if (
+            status == "draft" and not traded and key not in new_keys and doctor_id in replace_ids
+            and replace_start <= day <= replace_end
+        ):
+            stale_ids.append(schedule_id)
+        else:
+            existing.add(key)
+
+    # 2. Drop stale drafts
+    for i in range(0, len(stale_ids), BULK_BATCH_SIZE):
+        db.execute(
+            delete(models.Schedule).where(models.Schedule.id.in_(stale_ids[i:i + BULK_BATCH_SIZE])),
+            execution_options={"synchronize_session": False}
+        )
+
+    # 3. Insert the missing rows in batches
+    to_insert = [
+        {"date": r["date"], "doctor_id": r["doctor_id"], "shift_type_id": r["shift_type_id"], "status": "draft"}
+        for r in results
+        if (r["date"], r["shift_type_id"], r["doctor_id"]) not in existing
+    ]
+    stmt = _insert_ignoring_conflicts(db).returning(
+        models.Schedule.id,
+        models.Schedule.date,
+        models.Schedule.doctor_id,
+        models.Schedule.shift_type_id,
+        models.Schedule.room_id,
+        models.Schedule.status
+    )
+    saved_schedules = []
+    for i in range(0, len(to_insert), BULK_BATCH_SIZE):
+        saved_schedules.extend(db.execute(stmt, to_insert[i:i + BULK_BATCH_SIZE]).all())
+
+    # 4. Re-aggregate the workload rollup over the same scope
+    refresh_workload(db, lo, hi, doctor_ids)
+    db.commit()
+    return saved_schedules
@@ -0,0 +1,366 @@
+"""
+Heuristic fast-path engine for interactive previews.
+
+HeuristicEngine has the same contract as SchedulingEngine (same setters, build_model(),
+solve() returning assignment dicts and filling self.stats) but no CP-SAT model: the
+roster is a compact NumPy matrix assign[doctor, day] = shift index or -1, built by a
+greedy pass (scarcest shifts first, least-loaded eligible doctor wins) and improved by
+simulated annealing over reassign / swap moves with incremental evaluation.
+
+Hard rules (coverage minimums and qualification mixes, one shift per day, night rest
+and its boundaries, availability masks, fixed cells, department rules) are never broken
+by a move; the objective is the CP-SAT one (fairness spreads, desires, stability), so
+stats["objective"] is directly comparable. It cannot prove optimality or infeasibility:
+a roster it cannot complete is reported as UNKNOWN.
+"""
+import math
+import random
+import time
+from datetime import timedelta
+from typing import Optional, Callable
+import numpy as np
+from .scheduler import SchedulingEngine, STABILITY_WEIGHT, DESIRE_WEIGHT, is_night_shift
+
+HEURISTIC_TIME_LIMIT = 0.15  # seconds of local search (capped by the caller's time_limit)
+HINT_BONUS = 0.5  # greedy tie-break towards warm-start hints
+
+class HeuristicEngine(SchedulingEngine):
+    def build_model(self):
+        """Compile masks, demand and objective data into arrays (no CP model is built)."""
+        t0 = time.perf_counter()
+        n, D, K = len(self.doctors), self.num_days, len(self.shift_types)
+        eligible, blocked_days, blocked_cells = self.masks()
+
+        allowed = np.zeros((n, D, K), dtype=bool)
+        for i in range(n):
+            allowed[i, :, :] = eligible[i]
+        for i, d in blocked_days:
+            if 0 <= d < D:
+                allowed[i, d, :] = False
+        for i, d, k in blocked_cells:
+            if 0 <= d < D:
+                allowed[i, d, k] = False
+
+        self.is_night = np.array([is_night_shift(s) for s in self.shift_types] + [False])  # [-1] = off
+        night_ids = {s.id for s in self.shift_types if is_night_shift(s)}
+        for doctor_id, shift_type_id in self.previous_day:
+            if doctor_id in self.doc_index and shift_type_id in night_ids:
+                allowed[self.doc_index[doctor_id], 0, :] = False
+        for doctor_id, _ in self.next_day:
+            if doctor_id in self.doc_index:
+                allowed[self.doc_index[doctor_id], D - 1, self.is_night[:K]] = False
+
+        self.fixed_cells = set()
+        for doctor_id, d, shift_type_id in self.fixed:
+            i, k = self.doc_index.get(doctor_id), self.shift_index.get(shift_type_id)
+            if i is not None and k is not None and 0 <= d < D:
+                allowed[i, d, k] = True
+                self.fixed_cells.add((i, d))
+
+        lo, hi, qualified = self.demand()
+        self.lo, self.hi = np.array(lo, dtype=int).reshape(D, K), np.array(hi, dtype=int).reshape(D, K)
+        # (day, shift) -> [(holder mask, min, max)]
+        self.qualified = {}
+        for d, k, qualification, min_count, max_count in qualified:
+            mask = np.array([qualification in getattr(doc, "qualifications", ()) for doc in self.doctors], dtype=bool)
+            self.qualified.setdefault((d, k), []).append((mask, min_count, max_count if max_count is not None else n))
+
+        # Objective data
+        self.weights = np.array([getattr(s, "weight", None) or 1 for s in self.shift_types] + [0])
+        self.weekend = np.zeros(D, dtype=bool)
+        self.weekend[self.rest_days()] = True
+        self.carry = np.array([self.balances.get(doc.id, (0, 0, 0)) for doc in self.doctors], dtype=float).reshape(n, 3)
+        self.desire = np.zeros((n, D, K), dtype=int)
+        for doctor_id, d, pref_type, shift_type_id in self.preferences:
+            i = self.doc_index.get(doctor_id)
+            if i is None or pref_type != "desire" or not 0 <= d < D:
+                continue
+            if shift_type_id is None:
+                self.desire[i, d, :] += 1
+            elif shift_type_id in self.shift_index:
+                self.desire[i, d, self.shift_index[shift_type_id]] += 1
+        self.keep_matrix = np.full((n, D), -2, dtype=int)
+        self.hint_matrix = np.full((n, D), -2, dtype=int)
+        for target, cells in ((self.keep_matrix, self.keep), (self.hint_matrix, list(self.hints) + list(self.fixed))):
+            for doctor_id, d, shift_type_id in cells:
+                i, k = self.doc_index.get(doctor_id), self.shift_index.get(shift_type_id)
+                if i is not None and k is not None and 0 <= d < D:
+                    target[i, d] = k
+        rows, days = np.nonzero(self.keep_matrix >= 0)
+        self.n_keep = int(allowed[rows, days, self.keep_matrix[rows, days]].sum())  # kept cells that have a variable in CP-SAT
+        self.fair_weights = np.array([self.fairness_weights.get(m, 0) for m in ("load", "nights", "weekends")], dtype=float)
+
+        for rule in self.rules:
+            rule.prepare(self)
+        self.allowed = allowed
+        self.rule_stats = [{"rule": "heuristic_compile", "build_ms": (time.perf_counter() - t0) * 1000, "variables": 0, "constraints": 0}]
+
+    # --- evaluation helpers -------------------------------------------------
+
+    def _counters(self, assign):
+        """(n, 3) array of load / nights / weekend shifts incl. carry-over."""
+        worked = assign >= 0
+        counters = self.carry.copy()
+        counters[:, 0] += self.weights[assign].sum(axis=1)
+        counters[:, 1] += self.is_night[assign].sum(axis=1)
+        counters[:, 2] += (worked & self.weekend).sum(axis=1)
+        return counters
+
+    def _spread(self, counters):
+        if len(counters) < 2:
+            return 0.0
+        return float((self.fair_weights * (counters.max(axis=0) - counters.min(axis=0))).sum())
+
+    def _objective(self, assign, counters):
+        rows, days = np.nonzero(assign >= 0)
+        granted = int(self.desire[rows, days, assign[rows, days]].sum())
+        kept = int((assign == self.keep_matrix).sum())
+        return self._spread(counters) + STABILITY_WEIGHT * (self.n_keep - kept) - DESIRE_WEIGHT * granted
+
+    def _cell_value(self, i, d, k):
+        """Desire / stability contribution of doctor i working shift k (or -1) on day d."""
+        if k < 0:
+            return 0
+        return -DESIRE_WEIGHT * self.desire[i, d, k] - STABILITY_WEIGHT * (self.keep_matrix[i, d] == k)
+
+    def _rule_violations(self, assign, rows, days):
+        return sum(rule.violations(self, assign, rows, days) for rule in self.rules)
+
+    def _can_take(self, assign, i, d, k):
+        """Doctor i is off on d and may take shift k without breaking night rest."""
+        if assign[i, d] != -1 or not self.allowed[i, d, k]:
+            return False
+        if d > 0 and self.is_night[assign[i, d - 1]]:
+            return False
+        return not (self.is_night[k] and d + 1 < self.num_days and assign[i, d + 1] != -1)
+
+    def _qualified_ok(self, assign, d, k, leaving, joining, check_min=True):
+        for mask, min_count, max_count in self.qualified.get((d, k), ()):
+            if not check_min:
+                min_count = 0  # the shift is still being filled
+            count = int(mask[assign[:, d] == k].sum())
+            if leaving is not None:
+                count -= mask[leaving]
+            if joining is not None:
+                count += mask[joining]
+            if not min_count <= count <= max_count:
+                return False
+        return True
+
+    # --- construction -------------------------------------------------------
+
+    def _construct(self, rng):
+        n, D, K = len(self.doctors), self.num_days, len(self.shift_types)
+        assign = np.full((n, D), -1, dtype=np.int16)
+        for doctor_id, d, shift_type_id in self.fixed:
+            i, k = self.doc_index.get(doctor_id), self.shift_index.get(shift_type_id)
+            if i is not None and k is not None and 0 <= d < D:
+                assign[i, d] = k
+        counters = self._counters(assign)
+        noise = np.random.default_rng(rng.randrange(2 ** 32))
+        shortage = 0
+
+        for d in range(D):
+            rested = ~self.is_night[assign[:, d - 1]] if d > 0 else np.ones(n, dtype=bool)
+            free_tomorrow = assign[:, d + 1] == -1 if d + 1 < D else np.ones(n, dtype=bool)
+            # Scarcest shifts first: fewest allowed doctors per required seat
+            order = sorted(range(K), key=lambda k: (not self.is_night[k], self.allowed[:, d, k].sum() / max(1, self.lo[d, k])))
+            for k in order:
+                seats = []
+                for mask, min_count, _ in self.qualified.get((d, k), ()):
+                    have = int(mask[assign[:, d] == k].sum())
+                    seats.extend([mask] * max(0, min_count - have))
+                filled = int((assign[:, d] == k).sum()) + len(seats)
+                seats.extend([None] * max(0, self.lo[d, k] - filled))
+                if not seats:
+                    continue
+                # Least loaded first; desires, kept drafts and hints pull a doctor forward
+                score = (
+                    self.fair_weights[0] * counters[:, 0]
+                    + self.fair_weights[1] * self.is_night[k] * counters[:, 1]
+                    + self.fair_weights[2] * self.weekend[d] * counters[:, 2]
+                    - DESIRE_WEIGHT * self.desire[:, d, k]
+                    - STABILITY_WEIGHT * (self.keep_matrix[:, d] == k)
+                    - HINT_BONUS * (self.hint_matrix[:, d] == k)
+                    + 0.1 * noise.random(n)
+                )
+                ranking = np.argsort(score, kind="stable")
+
+                for mask in seats:
+                    open_ = (assign[:, d] == -1) & self.allowed[:, d, k] & rested
+                    if self.is_night[k]:
+                        open_ &= free_tomorrow
+                    if mask is not None:
+                        open_ &= mask
+                    for q_mask, _, max_count in self.qualified.get((d, k), ()):
+                        if q_mask[assign[:, d] == k].sum() >= max_count:
+                            open_ &= ~q_mask
+                    for i in ranking[open_[ranking]]:
+                        before = self._rule_violations(assign, [i], [d]) if self.rules else 0
+                        assign[i, d] = k
+                        if self.rules and self._rule_violations(assign, [i], [d]) > before:
+                            assign[i, d] = -1
+                            continue
+                        counters[i] += (self.weights[k], self.is_night[k], self.weekend[d])
+                        break
+                    else:
+                        shortage += 1
+        return assign, shortage
+
+    def _grant_desires(self, assign):
+        """Staff desired cells above the minimum (up to max_count) when that lowers the objective."""
+        counters = self._counters(assign)
+        spread = self._spread(counters)
+        for i, d, k in zip(*np.nonzero(self.desire > 0)):
+            if not self._can_take(assign, i, d, k) or (assign[:, d] == k).sum() >= self.hi[d, k]:
+                continue
+            if not self._qualified_ok(assign, d, k, None, i, check_min=False):
+                continue
+            change = np.array((self.weights[k], self.is_night[k], self.weekend[d]), dtype=float)
+            counters[i] += change
+            assign[i, d] = k
+            new_spread = self._spread(counters)
+            if self._cell_value(i, d, k) + new_spread - spread >= 0 or (self.rules and self._rule_violations(assign, [i], [d])):
+                assign[i, d] = -1
+                counters[i] -= change
+                continue
+            spread = new_spread
+        return assign
+
+    # --- local search -------------------------------------------------------
+
+    def _improve(self, assign, rng, deadline, should_stop):
+        n, D = assign.shape
+        if n < 2:
+            return assign, self._objective(assign, self._counters(assign))
+        counters = self._counters(assign)
+        current = self._objective(assign, counters)
+        last_spread = self._spread(counters)
+        best, best_assign = current, assign.copy()
+        wishes = [tuple(c) for c in np.argwhere(self.desire > 0)]
+        metrics = [m for m in range(3) if self.fair_weights[m]]
+        active = self.allowed.any(axis=(1, 2))
+        temperature, iterations = 2.0, 0
+
+        while True:
+            iterations += 1
+            if iterations % 64 == 0:
+                if time.perf_counter() >= deadline or (should_stop is not None and should_stop()):
+                    break
+                temperature *= 0.95
+                if temperature < 0.05:
+                    # Frozen: reheat from the best roster found so far
+                    temperature = 2.0
+                    assign[:] = best_assign
+                    counters = self._counters(assign)
+                    current, last_spread = best, self._spread(counters)
+
+            # Pick a move (i gives up its shift k on day d to j): towards an ungranted
+            # wish, from the most to the least loaded doctor on a fairness metric, or random
+            roll = rng.random()
+            if wishes and roll < 0.3:
+                j, d, k = wishes[rng.randrange(len(wishes))]
+                if assign[j, d] == k:
+                    continue
+                holders = np.flatnonzero(assign[:, d] == k)
+                if not len(holders):
+                    continue
+                i = int(holders[rng.randrange(len(holders))])
+            else:
+                if metrics and roll < 0.7:
+                    m = metrics[rng.randrange(len(metrics))]
+                    column = counters[:, m]
+                    tops = np.flatnonzero(column == column.max())
+                    # Doctors who cannot take anything (e.g. absent all period) never receive
+                    low = column[active].min() if active.any() else column.min()
+                    bottoms = np.flatnonzero((column == low) & active)
+                    i, j = int(tops[rng.randrange(len(tops))]), int(bottoms[rng.randrange(len(bottoms))])
+                    days = np.flatnonzero(self.is_night[assign[i]] if m == 1 else (assign[i] >= 0) & (self.weekend if m == 2 else True))
+                else:
+                    i, j = rng.randrange(n), rng.randrange(n)
+                    days = np.flatnonzero(assign[i] >= 0)
+                if not len(days):
+                    continue
+                d = int(days[rng.randrange(len(days))])
+            k = int(assign[i, d])
+            if j == i or (i, d) in self.fixed_cells or (j, d) in self.fixed_cells:
+                continue
+            k2 = int(assign[j, d])
+
+            # Move: i hands shift k to j (j off) or i and j swap their shifts on d
+            if k2 == -1:
+                if not self._can_take(assign, j, d, k) or not self._qualified_ok(assign, d, k, i, j):
+                    continue
+            else:
+                if k2 == k or not (self.allowed[j, d, k] and self.allowed[i, d, k2]):
+                    continue
+                if not (self._qualified_ok(assign, d, k, i, j) and self._qualified_ok(assign, d, k2, j, i)):
+                    continue
+                # Both already work on d, so only the night before tomorrow can break
+                if d + 1 < D and ((self.is_night[k2] and assign[i, d + 1] != -1) or (self.is_night[k] and assign[j, d + 1] != -1)):
+                    continue
+
+            rules_before = self._rule_violations(assign, [i, j], [d]) if self.rules else 0
+            delta_cells = self._cell_value(j, d, k) + self._cell_value(i, d, k2) - self._cell_value(i, d, k) - self._cell_value(j, d, k2)
+            old_i, old_j = counters[i].copy(), counters[j].copy()
+            change_k = np.array((self.weights[k], self.is_night[k], self.weekend[d]), dtype=float)
+            change_k2 = np.array((self.weights[k2], self.is_night[k2], self.weekend[d] and k2 >= 0), dtype=float)
+            counters[i] += change_k2 - change_k
+            counters[j] += change_k - change_k2
+            assign[i, d], assign[j, d] = k2, k
+            accept = False
+            if not self.rules or self._rule_violations(assign, [i, j], [d]) <= rules_before:
+                spread = self._spread(counters)
+                delta = delta_cells + spread - last_spread
+                accept = delta <= 0 or rng.random() < math.exp(-delta / temperature)
+            if not accept:
+                assign[i, d], assign[j, d] = k, k2
+                counters[i], counters[j] = old_i, old_j
+                continue
+
+            current += delta
+            last_spread = spread
+            if current < best - 1e-9:
+                best, best_assign = current, assign.copy()
+        self.stats["iterations"] = iterations
+        return best_assign, best
+
+    def solve(
+        self,
+        time_limit: Optional[float] = None,
+        num_workers: Optional[int] = None,
+        relative_gap: Optional[float] = None,
+        random_seed: Optional[int] = None,
+        on_solution: Optional[Callable[[float, float], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ):
+        """Greedy construction + simulated annealing within min(time_limit, HEURISTIC_TIME_LIMIT)."""
+        t0 = time.perf_counter()
+        budget = min(time_limit, HEURISTIC_TIME_LIMIT) if time_limit is not None else HEURISTIC_TIME_LIMIT
+        rng = random.Random(random_seed if random_seed is not None else 0)
+        self.stats = {"status": "UNKNOWN", "objective": None, "best_bound": None, "gap": None, "rules": self.rule_stats}
+
+        assign, shortage = self._construct(rng)
+        if shortage or (self.rules and self._rule_violations(assign, range(len(self.doctors)), self.all_days)):
+            self.stats["wall_time"] = time.perf_counter() - t0
+            return None
+        assign = self._grant_desires(assign)
+        if on_solution is not None:
+            on_solution(time.perf_counter() - t0, self._objective(assign, self._counters(assign)))
+
+        assign, objective = self._improve(assign, rng, t0 + budget, should_stop)
+        if on_solution is not None:
+            on_solution(time.perf_counter() - t0, objective)
+        self.assign = assign
+        self.stats.update({"status": "FEASIBLE", "objective": float(objective), "wall_time": time.perf_counter() - t0})
+
+        results = []
+        for d in self.all_days:
+            current_date = self.start_date + timedelta(days=d)
+            for i in np.nonzero(assign[:, d] >= 0)[0]:
+                results.append({
+                    "date": current_date,
+                    "doctor_id": self.doctors[i].id,
+                    "shift_type_id": self.shift_types[assign[i, d]].id,
+                })
+        return results
@@ -0,0 +1,148 @@
+"""
+Holiday calendar (models.Holiday): public holidays and make-up workdays (调休上班).
+
+A day is a rest day when it is a holiday, or a Saturday / Sunday that is not a make-up
+workday. Workload stats and the engines' weekend fairness counters both use this.
+
+calendar_cache keeps the whole table as {date: kind} in process memory (a few dozen rows
+per year); the holidays API invalidates it after every committed change. Each process
+has its own copy, so entries also expire after HOLIDAY_CACHE_TTL seconds for changes
+made through another worker.
+
+Bulk import accepts CSV (date,name[,kind]) and iCalendar (all-day VEVENTs; multi-day
+events expand to one row per day, summaries containing 班 / workday mark make-up days).
+"""
+import csv
+import io
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from sqlalchemy.orm import Session
+from .. import models
+
+HOLIDAY = "holiday"
+WORKDAY = "workday"
+HOLIDAY_KINDS = (HOLIDAY, WORKDAY)
+WORKDAY_MARKERS = ("补班", "上班", "(班)", "（班）", "workday", "working day")
+HOLIDAY_CACHE_TTL = float(os.getenv("HOLIDAY_CACHE_TTL", "300"))
+
+class CalendarCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._days = None
+        self._loaded_at = 0.0
+        self._version = 0
+
+    def get(self, db: Session) -> Dict[date, str]:
+        with self._lock:
+            days, version = self._days, self._version
+            if days is not None and time.monotonic() - self._loaded_at < HOLIDAY_CACHE_TTL:
+                return days
+        days = {day: kind for day, kind in db.query(models.Holiday.date, models.Holiday.kind)}
+        with self._lock:
+            if self._version == version:  # not invalidated while loading
+                self._days, self._loaded_at = days, time.monotonic()
+        return days
+
+    def invalidate(self):
+        with self._lock:
+            self._days = None
+            self._version += 1
+
+calendar_cache = CalendarCache()
+
+def is_rest_day(day: date, calendar: Dict[date, str]) -> bool:
+    kind = calendar.get(day)
+    if kind is not None:
+        return kind == HOLIDAY
+    return day.weekday() >= 5
+
+def calendar_between(calendar: Dict[date, str], start_date: date, end_date: date) -> Tuple[List[date], List[date]]:
+    """(holidays, make-up workdays) within [start_date, end_date], sorted."""
+    days = sorted(d for d in calendar if start_date <= d <= end_date)
+    return [d for d in days if calendar[d] == HOLIDAY], [d for d in days if calendar[d] == WORKDAY]
+
+def load_calendar(db: Session, start_date: date, days: int) -> Dict[str, List[date]]:
+    """The payload["calendar"] entry for a generation horizon (see SchedulingEngine.set_calendar)."""
+    holidays, workdays = calendar_between(calendar_cache.get(db), start_date, start_date + timedelta(days=days - 1))
+    return {"holidays": holidays, "workdays": workdays}
+
+def _kind_of(text: str, default: str = HOLIDAY) -> str:
+    lowered = text.lower()
+    return WORKDAY if any(marker in lowered for marker in WORKDAY_MARKERS) else default
+
+def parse_csv(text: str) -> List[Dict[str, str]]:
+    """
+    Rows of date (YYYY-MM-DD), name and optional kind (holiday/workday); a header row is
+    optional. ValueError names the first bad line.
+    """
+    entries = []
+    for line_no, row in enumerate(csv.reader(io.StringIO(text)), start=1):
+        if not row or not row[0].strip() or row[0].strip().startswith("#"):
+            continue
+        if line_no == 1 and row[0].strip().lower() == "date":
+            continue
+        try:
+            day = date.fromisoformat(row[0].strip())
+        except ValueError:
+            raise ValueError(f"Line {line_no}: invalid date {row[0].strip()!r}")
+        name = row[1].strip() if len(row) > 1 else ""
+        kind = row[2].strip().lower() if len(row) > 2 and row[2].strip() else _kind_of(name)
+        if kind not in HOLIDAY_KINDS:
+            raise ValueError(f"Line {line_no}: kind must be holiday or workday, got {kind!r}")
+        entries.append({"date": day, "name": name or kind, "kind": kind})
+    return entries
+
+def _ics_date(value: str) -> date:
+    return datetime.strptime(value[:8], "%Y%m%d").date()
+
+def parse_ics(text: str) -> List[Dict[str, str]]:
+    """All-day VEVENTs (DTSTART[;VALUE=DATE], exclusive DTEND, SUMMARY), one entry per day."""
+    lines = []
+    for raw in text.splitlines():
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]  # RFC 5545 line folding
+        else:
+            lines.append(raw.strip())
+
+    entries, event = [], None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            event = {}
+        elif line == "END:VEVENT" and event is not None:
+            if "DTSTART" not in event:
+                raise ValueError("VEVENT without DTSTART")
+            start = _ics_date(event["DTSTART"])
+            end = _ics_date(event["DTEND"]) if "DTEND" in event else start + timedelta(days=1)
+            summary = event.get("SUMMARY", "")
+            kind = _kind_of(summary + " " + event.get("CATEGORIES", ""))
+            day = start
+            while day < max(end, start + timedelta(days=1)):
+                entries.append({"date": day, "name": summary or kind, "kind": kind})
+                day += timedelta(days=1)
+            event = None
+        elif event is not None and ":" in line:
+            key, value = line.split(":", 1)
+            key = key.split(";", 1)[0].upper()
+            event[key] = value.replace("\\,", ",").replace("\\;", ";").replace("\\n", " ").strip()
+    return entries
+
+def import_holidays(db: Session, entries: List[Dict[str, str]]) -> Dict[str, int]:
+    """Upsert entries by date (the last entry for a date wins) and commit."""
+    by_date = {e["date"]: e for e in entries}
+    existing = {h.date: h for h in db.query(models.Holiday).filter(models.Holiday.date.in_(list(by_date)))} if by_date else {}
+    created = updated = 0
+    for day, entry in by_date.items():
+        row = existing.get(day)
+        if row is None:
+            db.add(models.Holiday(date=day, name=entry["name"], kind=entry["kind"]))
+            created += 1
+        else:
+            row.name, row.kind = entry["name"], entry["kind"]
+            updated += 1
+    db.commit()
+    calendar_cache.invalidate()
+    kinds = [e["kind"] for e in by_date.values()]
+    return {"created": created, "updated": updated, "holidays": kinds.count(HOLIDAY), "workdays": kinds.count(WORKDAY)}
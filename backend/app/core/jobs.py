@@ -0,0 +1,209 @@
+"""
+Background schedule-generation jobs.
+
+Jobs are rows in the generation_jobs table, so any API worker can report status or
+request cancellation. The solve itself runs in a spawn-based process pool owned by the
+worker that accepted the job; a monitor thread in that worker streams solver progress
+into the row, forwards cancellation and saves the final roster as drafts.
+
+Inputs answered by the worker's result cache (core/cache.py) complete at once without
+touching the pool. The monitor refreshes heartbeat_at while the job is queued or
+running; if the worker dies, reap_stale_jobs() (at every worker's startup and, at most
+once per HEARTBEAT_INTERVAL per process, on status reads of active jobs) marks the job
+failed once its heartbeat is JOB_STALE_SECONDS old.
+"""
+import os
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Callable
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from .. import models
+from .generation import run_generation, save_generated_schedules, lookup_cached, store_cached
+
+JOB_WORKERS = int(os.getenv("SCHEDULER_JOB_WORKERS", "2"))
+PROGRESS_FLUSH_INTERVAL = 0.5  # seconds between progress writes / cancel checks
+HEARTBEAT_INTERVAL = 10.0  # seconds between heartbeat_at writes
+JOB_STALE_SECONDS = float(os.getenv("SCHEDULER_JOB_STALE_SECONDS", "120"))
+ACTIVE_STATUSES = (models.JobStatus.QUEUED, models.JobStatus.RUNNING)
+
+def _run_job(payload: Dict[str, Any], solver_params: Dict[str, Any], progress_q, cancel_event) -> Dict[str, Any]:
+    """Entry point inside the worker process."""
+    progress_q.put(("started", None))
+    return run_generation(
+        payload,
+        solver_params,
+        on_solution=lambda wall_time, objective: progress_q.put(("solution", {"wall_time": wall_time, "objective": objective})),
+        should_stop=cancel_event.is_set,
+    )
+
+class JobManager:
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._mp_manager = None
+
+    def _ensure_pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that already runs OR-Tools / DB threads
+                ctx = multiprocessing.get_context("spawn")
+                self._mp_manager = ctx.Manager()
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._executor
+
+    def submit(
+        self,
+        db: Session,
+        payload: Dict[str, Any],
+        params: Dict[str, Any],
+        solver_params: Dict[str, Any],
+        user_id: Optional[int] = None,
+    ) -> models.GenerationJob:
+        now = datetime.utcnow()
+        job = models.GenerationJob(
+            id=uuid.uuid4().hex,
+            status=models.JobStatus.QUEUED,
+            params=params,
+            progress=[],
+            created_by=user_id,
+            heartbeat_at=now,
+        )
+        db.add(job)
+        key, cached = lookup_cached(payload, solver_params)
+        if cached is not None:
+            job.started_at = job.finished_at = now
+            self._record(db, job, payload, cached)
+        db.commit()
+        db.refresh(job)
+        if cached is not None:
+            return job
+
+        executor = self._ensure_pool()
+        progress_q = self._mp_manager.Queue()
+        cancel_event = self._mp_manager.Event()
+        future = executor.submit(_run_job, payload, solver_params, progress_q, cancel_event)
+
+        session_factory = lambda: Session(bind=db.get_bind())
+        threading.Thread(
+            target=self._monitor,
+            args=(session_factory, job.id, payload, key, future, progress_q, cancel_event),
+            daemon=True,
+        ).start()
+        return job
+
+    def _monitor(self, session_factory: Callable[[], Session], job_id: str, payload: Dict[str, Any], key: str, future, progress_q, cancel_event):
+        db = session_factory()
+        try:
+            progress = []
+            started_at = None
+            last_heartbeat = time.monotonic()
+            while True:
+                done = wait([future], timeout=PROGRESS_FLUSH_INTERVAL).done
+                while not progress_q.empty():
+                    kind, data = progress_q.get()
+                    if kind == "started":
+                        started_at = datetime.utcnow()
+                    else:
+                        progress.append(data)
+
+                job = db.query(models.GenerationJob).filter(models.GenerationJob.id == job_id).first()
+                if job is None:
+                    cancel_event.set()
+                    return
+                if job.cancel_requested and not cancel_event.is_set():
+                    cancel_event.set()
+                    future.cancel()  # only succeeds while still queued
+                if started_at and job.started_at is None:
+                    job.started_at = started_at
+                    job.status = models.JobStatus.RUNNING
+                job.progress = list(progress)
+                if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                    job.heartbeat_at = datetime.utcnow()
+                    last_heartbeat = time.monotonic()
+                db.commit()
+
+                if done:
+                    break
+
+            self._finish(db, job, payload, key, future)
+        finally:
+            db.close()
+
+    def _finish(self, db: Session, job: models.GenerationJob, payload: Dict[str, Any], key: str, future):
+        job.finished_at = datetime.utcnow()
+        if job.cancel_requested:
+            job.status = models.JobStatus.CANCELLED
+        else:
+            try:
+                outcome = future.result()
+            except Exception as e:
+                job.status = models.JobStatus.FAILED
+                job.error = str(e)
+            else:
+                store_cached(key, payload, outcome)
+                self._record(db, job, payload, {**outcome, "stats": {**outcome["stats"], "cache_hit": False}})
+        db.commit()
+
+    def _record(self, db: Session, job: models.GenerationJob, payload: Dict[str, Any], outcome: Dict[str, Any]):
+        """Store a solver outcome on the job, saving the roster as drafts if there is one."""
+        stats = outcome["stats"]
+        if outcome["results"] is None:
+            job.status = models.JobStatus.FAILED
+            job.error = f"No feasible schedule ({stats['status']})"
+            job.result = stats
+            return
+        t0 = time.perf_counter()
+        saved = save_generated_schedules(db, outcome["results"], replace_drafts_for=payload if payload.get("warm_start") else None)
+        persist_ms = (time.perf_counter() - t0) * 1000
+        job.status = models.JobStatus.COMPLETED
+        job.result = {**stats, "persist_ms": persist_ms, "schedule_ids": [s.id for s in saved]}
+
+    def request_cancel(self, db: Session, job: models.GenerationJob):
+        if job.status in ACTIVE_STATUSES:
+            job.cancel_requested = True
+            db.commit()
+
+job_manager = JobManager()
+
+def reap_stale_jobs(db: Session, stale_seconds: float = JOB_STALE_SECONDS) -> int:
+    """Fail queued / running jobs whose worker stopped sending heartbeats; returns how many."""
+    job = models.GenerationJob
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    count = db.query(job).filter(
+        job.status.in_(ACTIVE_STATUSES),
+        or_(job.heartbeat_at < cutoff, (job.heartbeat_at == None) & (job.created_at < cutoff)),
+    ).update({
+        job.status: models.JobStatus.FAILED,
+        job.error: "Worker stopped before the job finished",
+        job.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    return count
+
+_reap_lock = threading.Lock()
+_last_reap = 0.0
+
+def reap_stale_jobs_throttled(db: Session, interval: float = HEARTBEAT_INTERVAL) -> int:
+    """reap_stale_jobs() unless this process already ran it within `interval` seconds."""
+    global _last_reap
+    with _reap_lock:
+        if time.monotonic() - _last_reap < interval:
+            return 0
+        _last_reap = time.monotonic()
+    return reap_stale_jobs(db)
+
+def wait_for_job(db: Session, job_id: str, timeout: float = 60.0) -> models.GenerationJob:
+    """Poll until the job leaves queued/running (used by scripts and tests)."""
+    deadline = time.time() + timeout
+    while True:
+        db.expire_all()
+        job = db.query(models.GenerationJob).filter(models.GenerationJob.id == job_id).first()
+        if job.status not in ACTIVE_STATUSES or time.time() > deadline:
+            return job
+        time.sleep(0.2)
@@ -0,0 +1,55 @@
+"""
+Keyset pagination and streaming serialization for large listings.
+
+Pages are ordered by (date, id) and continued with an opaque cursor holding the last
+row's key, so each page is one index range scan no matter how deep the client pages
+(no OFFSET). Rows are fetched in batches with yield_per and serialized batch by batch,
+so memory stays flat even when a whole year is streamed in one response.
+"""
+import base64
+import json
+from datetime import date
+from typing import Iterable, Iterator, Tuple, List
+from sqlalchemy import and_, or_
+
+STREAM_BATCH_SIZE = 1000  # rows fetched and serialized per chunk
+
+def encode_cursor(day: date, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{day.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """ValueError for cursors this module did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, row_id = raw.split("|")
+        return date.fromisoformat(day), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def after_cursor(date_column, id_column, cursor: str):
+    """WHERE clause for rows after the cursor in (date, id) order (portable, no row values)."""
+    day, row_id = decode_cursor(cursor)
+    return or_(date_column > day, and_(date_column == day, id_column > row_id))
+
+def _encode(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+def stream_rows(rows: Iterable, fields: List[str], ndjson: bool = False) -> Iterator[str]:
+    """Serialize result rows as a JSON array or NDJSON, one chunk per STREAM_BATCH_SIZE rows."""
+    if not ndjson:
+        yield "["
+    chunk, first = [], True
+    for row in rows:
+        item = json.dumps({f: _encode(getattr(row, f)) for f in fields}, ensure_ascii=False, separators=(",", ":"))
+        if ndjson:
+            chunk.append(item + "\n")
+        else:
+            chunk.append(item if first else "," + item)
+            first = False
+        if len(chunk) >= STREAM_BATCH_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+    if not ndjson:
+        yield "]"
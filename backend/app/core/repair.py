@@ -0,0 +1,226 @@
+"""
+Incremental roster repair.
+
+When a doctor becomes unavailable, only a small window around the absence is re-solved:
+the absent doctor's cells plus every assignment within `neighbourhood_days` of them are
+freed (except rows a shift trade references, which stay fixed), everything else stays as it is (the window edges see the neighbouring days as
+boundary state), and the objective keeps as many of the freed assignments as possible.
+Fairness terms are switched off, so a lopsided roster is never rebalanced by a repair.
+The result is a minimal-change diff against the current roster.
+
+The repair must see the same doctors, coverage and rules the roster was generated with.
+Schedule rows do not record that scope, so callers pass department_id or hospital_wide;
+otherwise repair_scope() reads it off the doctors rostered in the window.
+"""
+from datetime import date, timedelta
+from typing import Dict, Any, Optional, List
+from sqlalchemy.orm import Session
+from .. import models
+from .generation import snapshot_doctors, load_shift_types, load_coverage, load_rules, load_preferences, run_generation
+from .rules import rule_reach
+from .workload import refresh_workload
+
+REPAIR_TIME_LIMIT = 2.0
+
+def repair_scope(db: Session, absent: models.User, window_start: date, window_end: date) -> Optional[int]:
+    """
+    The department to re-solve with (None = hospital-wide), inferred from the window: a
+    doctor without a department is only ever rostered hospital-wide, and a window where
+    every rostered doctor shares the absent doctor's department is that department's roster.
+    A window mixing departments is ambiguous (one hospital-wide roster or several
+    department ones look the same), so it raises ValueError.
+    """
+    if absent.department_id is None:
+        return None
+    departments = {department_id for (department_id,) in db.query(models.User.department_id).join(
+        models.Schedule, models.Schedule.doctor_id == models.User.id
+    ).filter(
+        models.Schedule.date >= window_start,
+        models.Schedule.date <= window_end
+    ).distinct()}
+    if departments <= {absent.department_id}:
+        return absent.department_id
+    raise ValueError("The roster around the absence spans several departments; pass department_id or hospital_wide")
+
+def _traded_ids(db: Session, rows: List[models.Schedule]) -> set:
+    if not rows:
+        return set()
+    return {shift_id for (shift_id,) in db.query(models.ShiftTrade.request_shift_id).filter(
+        models.ShiftTrade.request_shift_id.in_([row.id for row in rows])
+    )}
+
+def load_repair_inputs(
+    db: Session,
+    doctor_id: int,
+    start_date: date,
+    end_date: date,
+    neighbourhood_days: int = 2,
+    department_id: Optional[int] = None,
+    hospital_wide: bool = False,
+) -> Dict[str, Any]:
+    """
+    Engine payload for the window around the absence. LookupError if the doctor does not
+    exist, ValueError if the scope is neither given nor inferable (see repair_scope).
+    """
+    absent = db.query(models.User).filter(models.User.id == doctor_id).first()
+    if absent is None:
+        raise LookupError("Doctor not found")
+
+    window_start = start_date - timedelta(days=neighbourhood_days)
+    window_end = end_date + timedelta(days=neighbourhood_days)
+    days = (window_end - window_start).days + 1
+    if hospital_wide:
+        department_id = None
+    elif department_id is None:
+        department_id = repair_scope(db, absent, window_start, window_end)
+
+    query = db.query(models.User).filter(models.User.role == models.RoleEnum.DOCTOR)
+    if department_id:
+        query = query.filter(models.User.department_id == department_id)
+    doctors = snapshot_doctors(db, query.all())
+    doctor_ids = [d.id for d in doctors]
+    shift_types = load_shift_types(db)
+    shift_type_ids = [s.id for s in shift_types]
+    rules = load_rules(db, department_id)
+    reach = max(rule_reach(rules), 1)
+
+    # One range query: the window, the history the rules look back at and the day after
+    rows = db.query(models.Schedule).filter(
+        models.Schedule.doctor_id.in_(doctor_ids),
+        models.Schedule.shift_type_id.in_(shift_type_ids),
+        models.Schedule.date >= window_start - timedelta(days=reach),
+        models.Schedule.date <= window_end + timedelta(days=1)
+    ).all()
+
+    # Other doctors' traded rows stay put: a trade must keep pointing at the shift it names
+    traded = _traded_ids(db, rows)
+
+    current, keep, fixed, previous_day, next_day, history = [], [], [], [], [], []
+    for row in rows:
+        offset = (row.date - window_start).days
+        if offset < 0:
+            history.append((row.doctor_id, offset, row.shift_type_id))
+            if offset == -1:
+                previous_day.append((row.doctor_id, row.shift_type_id))
+        elif offset >= days:
+            next_day.append((row.doctor_id, row.shift_type_id))
+        else:
+            current.append(row)
+            if row.doctor_id == doctor_id and start_date <= row.date <= end_date:
+                continue
+            if row.id in traded:
+                fixed.append((row.doctor_id, offset, row.shift_type_id))
+            else:
+                keep.append((row.doctor_id, offset, row.shift_type_id))
+
+    absent_days = range((start_date - window_start).days, (end_date - window_start).days + 1)
+    return {
+        "doctors": doctors,
+        "shift_types": shift_types,
+        "coverage": load_coverage(db, department_id),
+        "rules": rules,
+        "preferences": load_preferences(db, doctor_ids, window_start, days),
+        "start_date": window_start,
+        "days": days,
+        "warm_start": {
+            "hints": keep,
+            "keep": keep,
+            "fixed": fixed,
+            "previous_day": previous_day,
+            "next_day": next_day,
+            "history": history,
+        },
+        "unavailable": [(doctor_id, d) for d in absent_days],
+        # Fairness spreads would outbid STABILITY_WEIGHT and reshuffle kept cells; a repair only fills the gap
+        "fairness_weights": {},
+        "current": current,  # Schedule rows inside the window (not sent to the engine)
+    }
+
+def run_repair(payload: Dict[str, Any], solver_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Re-solve the window and diff it against the current rows.
+    Returns {"results", "stats", "removed": [Schedule], "added": [assignment dicts]}.
+    """
+    params = {"time_limit": REPAIR_TIME_LIMIT, **(solver_params or {})}
+    engine_payload = {k: v for k, v in payload.items() if k != "current"}
+    outcome = run_generation(engine_payload, params)
+    if outcome["results"] is None:
+        return {**outcome, "removed": [], "added": []}
+
+    new_keys = {(r["date"], r["shift_type_id"], r["doctor_id"]) for r in outcome["results"]}
+    old_keys = {(row.date, row.shift_type_id, row.doctor_id) for row in payload["current"]}
+    removed = [row for row in payload["current"] if (row.date, row.shift_type_id, row.doctor_id) not in new_keys]
+    added = [r for r in outcome["results"] if (r["date"], r["shift_type_id"], r["doctor_id"]) not in old_keys]
+    return {**outcome, "removed": removed, "added": added}
+
+def _pair_replacements(removed: List[models.Schedule], added: List[Dict[str, Any]]):
+    """Match removed rows with added assignments for the same (date, shift type)."""
+    open_cells = {}
+    for item in added:
+        open_cells.setdefault((item["date"], item["shift_type_id"]), []).append(item)
+    pairs, dropped = [], []
+    for row in removed:
+        candidates = open_cells.get((row.date, row.shift_type_id))
+        if candidates:
+            pairs.append((row, candidates.pop()))
+        else:
+            dropped.append(row)
+    paired = {id(item) for _, item in pairs}
+    return pairs, dropped, [item for item in added if id(item) not in paired]
+
+def traded_rows_dropped(db: Session, removed: List[models.Schedule], added: List[Dict[str, Any]]) -> List[models.Schedule]:
+    """Removed rows referenced by a shift trade that have no replacement to be handed over to."""
+    traded = _traded_ids(db, removed)
+    _, dropped, _ = _pair_replacements([row for row in removed if row.id in traded], added)
+    return dropped
+
+def apply_repair(db: Session, removed: List[models.Schedule], added: List[Dict[str, Any]]) -> List[models.Schedule]:
+    """
+    Apply a repair diff. A replacement inherits the status of the row it replaces for the
+    same (date, shift type), so repairing a published roster keeps it published. A removed
+    row that a shift trade references is handed to its replacement's doctor in place
+    instead, so the trade keeps pointing at the shift; open trades on it are cancelled, as
+    the requester no longer holds it (callers refuse diffs that would delete a traded row,
+    see traded_rows_dropped).
+    """
+    traded = _traded_ids(db, removed)
+    pairs, _, added = _pair_replacements([row for row in removed if row.id in traded], added)
+    handed_over = [row for row, _ in pairs]
+    replaced_status = {(row.date, row.shift_type_id): row.status for row in removed}
+    touched = [(row.doctor_id, row.date) for row in removed] + [(item["doctor_id"], item["date"]) for item in added]
+    touched += [(item["doctor_id"], item["date"]) for _, item in pairs]
+    for row in removed:
+        if row.id not in traded:
+            db.delete(row)
+    db.flush()
+
+    if handed_over:
+        open_trades = db.query(models.ShiftTrade).filter(
+            models.ShiftTrade.request_shift_id.in_([row.id for row in handed_over]),
+            models.ShiftTrade.status.in_([models.TradeStatus.PENDING, models.TradeStatus.ACCEPTED])
+        ).all()
+        for trade in open_trades:
+            trade.status = models.TradeStatus.CANCELLED
+            db.add(models.Notification(
+                user_id=trade.requester_id,
+                content="您的换班请求因排班调整已取消",
+                type=models.NotificationType.TRADE_RESULT
+            ))
+    for row, item in pairs:
+        row.doctor_id = item["doctor_id"]
+
+    new_rows = []
+    for item in added:
+        new_sched = models.Schedule(
+            date=item["date"],
+            doctor_id=item["doctor_id"],
+            shift_type_id=item["shift_type_id"],
+            status=replaced_status.get((item["date"], item["shift_type_id"]), "draft")
+        )
+        db.add(new_sched)
+        new_rows.append(new_sched)
+    if touched:
+        dates = [day for _, day in touched]
+        refresh_workload(db, min(dates), max(dates), {doctor_id for doctor_id, _ in touched})
+    db.commit()
+    return handed_over + new_rows
@@ -0,0 +1,148 @@
+"""
+Rolling-horizon generation for long periods (quarters, years).
+
+Instead of one model over the whole horizon, overlapping windows are solved in order
+(by default 35-day windows of which the first 28 days are committed). Each window sees
+the committed roster as boundary state: the last committed day drives the night-rest
+rule, the committed days the department rules look back at (duty runs, nights earlier
+in the week) become the window's history and the cumulative load / night / weekend
+counters are carried into the fairness balances. Solve time therefore grows linearly with the horizon and only one window
+model is alive at a time.
+"""
+import time
+from datetime import timedelta
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from .scheduler import is_night_shift
+from .rules import rule_reach
+from .holidays import is_rest_day, HOLIDAY, WORKDAY
+
+ROLLING_WINDOW_DAYS = 35
+ROLLING_COMMIT_DAYS = 28
+ROLLING_AUTO_DAYS = 62  # longer horizons are generated window by window by default
+
+def plan_rolling(days: int, window_days: Optional[int] = None, commit_days: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """payload["rolling"] settings for a horizon, or None when a single model is used."""
+    if window_days is None and days <= ROLLING_AUTO_DAYS:
+        if commit_days is not None:
+            raise ValueError(f"commit_days requires window_days for periods of up to {ROLLING_AUTO_DAYS} days")
+        return None
+    window_days = window_days or ROLLING_WINDOW_DAYS
+    commit_days = commit_days or min(ROLLING_COMMIT_DAYS, window_days)
+    if not 0 < commit_days <= window_days:
+        raise ValueError("commit_days must be between 1 and window_days")
+    if days <= window_days:
+        return None
+    return {"window_days": window_days, "commit_days": commit_days}
+
+def plan_windows(days: int, window_days: int, commit_days: int) -> List[Tuple[int, int, int]]:
+    """(offset, window length, committed days) for each window; the last one commits everything."""
+    windows, offset = [], 0
+    while offset < days:
+        length = min(window_days, days - offset)
+        if offset + length >= days:
+            windows.append((offset, length, length))
+            break
+        windows.append((offset, length, commit_days))
+        offset += commit_days
+    return windows
+
+def _shift(cells, offset: int, length: int):
+    """Re-base (doctor_id, day, ...) tuples to a window, dropping those outside it."""
+    return [(c[0], c[1] - offset) + tuple(c[2:]) for c in cells if offset <= c[1] < offset + length]
+
+def window_payload(
+    payload: Dict[str, Any],
+    offset: int,
+    length: int,
+    previous_day: List[tuple],
+    balances: Dict[int, tuple],
+    history: List[tuple] = (),
+) -> Dict[str, Any]:
+    window = {k: v for k, v in payload.items() if k not in ("rolling", "warm_start", "preferences", "unavailable", "balances")}
+    window["start_date"] = payload["start_date"] + timedelta(days=offset)
+    window["days"] = length
+    window["balances"] = balances
+    if payload.get("preferences"):
+        window["preferences"] = _shift(payload["preferences"], offset, length)
+    if payload.get("unavailable"):
+        window["unavailable"] = _shift(payload["unavailable"], offset, length)
+    warm_start = payload.get("warm_start") or {}
+    window["warm_start"] = {
+        "hints": _shift(warm_start.get("hints", ()), offset, length),
+        "keep": _shift(warm_start.get("keep", ()), offset, length),
+        "fixed": _shift(warm_start.get("fixed", ()), offset, length),
+        "previous_day": previous_day,
+        "history": list(history),
+        # Only the final window touches the day after the horizon
+        "next_day": list(warm_start.get("next_day", ())) if offset + length >= payload["days"] else [],
+    }
+    return window
+
+def run_rolling(
+    payload: Dict[str, Any],
+    solve_window: Callable[..., Dict[str, Any]],
+    solver_params: Optional[Dict[str, Any]] = None,
+    on_solution: Optional[Callable[[float, float], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Solve payload window by window with solve_window (run_generation for one model).
+    solver_params apply to each window. Returns {"results", "stats"} like run_generation,
+    with per-window reports in stats["windows"]; results is None if any window fails.
+    """
+    t0 = time.perf_counter()
+    settings = payload["rolling"]
+    shifts = {s.id: (getattr(s, "weight", None) or 1, is_night_shift(s)) for s in payload["shift_types"]}
+    balances = {doc_id: list(b) for doc_id, b in (payload.get("balances") or {}).items()}
+    previous_day = list((payload.get("warm_start") or {}).get("previous_day", ()))
+    # (doctor_id, day relative to payload start_date, shift_type_id) before the current window
+    history = list((payload.get("warm_start") or {}).get("history", ()))
+    reach = rule_reach(payload.get("rules"))
+    calendar = payload.get("calendar") or {}
+    calendar = {**dict.fromkeys(calendar.get("workdays", ()), WORKDAY), **dict.fromkeys(calendar.get("holidays", ()), HOLIDAY)}
+
+    results, reports = [], []
+    for offset, length, commit in plan_windows(payload["days"], settings["window_days"], settings["commit_days"]):
+        window_history = [(doc, d - offset, st) for doc, d, st in history if offset - reach <= d < offset]
+        window = window_payload(payload, offset, length, previous_day, {k: tuple(v) for k, v in balances.items()}, window_history)
+        outcome = solve_window(window, solver_params, on_solution=on_solution, should_stop=should_stop)
+        stats = outcome["stats"]
+        reports.append({
+            "start_date": window["start_date"].isoformat(),
+            "days": length,
+            "committed": commit,
+            "status": stats["status"],
+            "objective": stats.get("objective"),
+            "wall_time": stats.get("wall_time", 0.0),
+        })
+        if outcome["results"] is None:
+            return {"results": None, "stats": {**stats, "wall_time": time.perf_counter() - t0, "windows": reports}}
+
+        last_committed = window["start_date"] + timedelta(days=commit - 1)
+        previous_day = []
+        for r in outcome["results"]:
+            if r["date"] > last_committed:
+                continue
+            results.append(r)
+            history.append((r["doctor_id"], (r["date"] - payload["start_date"]).days, r["shift_type_id"]))
+            weight, night = shifts.get(r["shift_type_id"], (1, False))
+            counters = balances.setdefault(r["doctor_id"], [0, 0, 0])
+            counters[0] += weight
+            counters[1] += night
+            counters[2] += is_rest_day(r["date"], calendar)
+            if r["date"] == last_committed:
+                previous_day.append((r["doctor_id"], r["shift_type_id"]))
+        history = [c for c in history if c[1] >= offset + commit - reach]
+
+    objectives = [w["objective"] for w in reports if w["objective"] is not None]
+    return {
+        "results": results,
+        "stats": {
+            "status": "OPTIMAL" if all(w["status"] == "OPTIMAL" for w in reports) else "FEASIBLE",
+            "objective": sum(objectives) if objectives else None,
+            "best_bound": None,
+            "gap": None,
+            "wall_time": time.perf_counter() - t0,
+            "windows": reports,
+        },
+    }
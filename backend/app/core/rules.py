@@ -0,0 +1,323 @@
+"""
+Pluggable scheduling rules (PRD 3.1.2).
+
+Each rule is a class registered under a name; departments enable rules with parameters
+stored in the department_rules table. SchedulingEngine.build_model() applies the enabled
+rules after its built-in constraints and records, per rule, the build time and the
+variables / constraints it added (engine.rule_stats), so oversized rules are visible.
+
+Rules add constraints through self.add(engine, ct) so they take part in the
+infeasibility explanations of core/feasibility.py. They must only use linear
+constraints (which support enforcement literals).
+
+Rules that look back in time (reach > 0) see the days before start_date through the
+engine's warm-start history, so a run or a week that started in the previous period is
+counted across the boundary.
+
+For the heuristic engine (core/heuristic.py) each rule also counts its violations in
+an assignment matrix (doctor x day -> shift index or -1), restricted to the doctors and
+days a move touches, so local search can evaluate moves incrementally. In the same
+spirit conflicts() checks saved rosters around one (doctor, date) cell of a
+core.conflicts.RosterIndex, which is how manual edits and trades are validated.
+"""
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Dict, Any, List, Type
+import numpy as np
+from ortools.sat.python import cp_model
+from .scheduler import is_night_shift
+
+RULES: Dict[str, Type["Rule"]] = {}
+
+def register(cls):
+    RULES[cls.name] = cls
+    return cls
+
+class Rule(ABC):
+    name = ""
+    description = ""
+    reach = 0  # days before a cell the rule looks at (history loaded before start_date)
+
+    def __init__(self, **params):
+        self.params = params
+
+    def add(self, engine, ct):
+        return engine._gate(ct, ("rule", self.name))
+
+    @abstractmethod
+    def apply(self, engine, day_vars):
+        """Add the rule to engine.model. day_vars[i][d] lists doctor i's variables on day d."""
+
+    def prepare(self, engine):
+        """Precompute lookups for violations(); called once by the heuristic engine."""
+
+    @abstractmethod
+    def violations(self, engine, assign: np.ndarray, rows, days) -> int:
+        """Violations involving doctors `rows` on days `days` of an assignment matrix."""
+
+    def conflicts(self, roster, doctor_id: int, day) -> List[Dict[str, Any]]:
+        """Conflicts of a saved roster (core.conflicts.RosterIndex) involving one doctor-day."""
+        return []
+
+def build_rule(name: str, params: Dict[str, Any] = None) -> Rule:
+    """
+    Instantiate a registered rule; ValueError for unknown rules or bad parameters, TypeError
+    for a rule class that does not implement apply() and violations().
+    """
+    cls = RULES.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown rule: {name}")
+    if cls.__abstractmethods__:
+        raise TypeError(f"Rule {name} does not implement {', '.join(sorted(cls.__abstractmethods__))}")
+    try:
+        return cls(**(params or {}))
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for {name}: {e}")
+
+def rule_reach(rules) -> int:
+    """Days of history the enabled rules (payload["rules"] dicts) need before start_date."""
+    return max((build_rule(r["rule"], r["params"]).reach for r in rules or ()), default=0)
+
+def _positive_int(value, field: str) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError(f"{field} must be a positive integer")
+    return value
+
+@register
+class ConsecutiveDutyLimit(Rule):
+    name = "consecutive_duty_limit"
+    description = "连续值班天数上限"
+
+    def __init__(self, max_days: int = 6):
+        super().__init__(max_days=max_days)
+        self.max_days = _positive_int(max_days, "max_days")
+
+    @property
+    def reach(self):
+        return self.max_days
+
+    def apply(self, engine, day_vars):
+        # Every window of max_days + 1 consecutive days leaves at least one day off; windows
+        # starting before start_date count the history days worked as used up
+        span = self.max_days + 1
+        worked_before = engine.worked_before()
+        starts = list(range(-self.max_days, 0)) + list(range(engine.num_days - span + 1))
+        for i, row in enumerate(day_vars):
+            before = worked_before.get(i, {})
+            for start in starts:
+                limit = self.max_days - sum(1 for d in range(start, 0) if d in before)
+                if start < 0 and limit == self.max_days:
+                    continue  # fewer than span days left in the horizon
+                window = [v for d in range(max(start, 0), min(start + span, engine.num_days)) for v in row[d]]
+                if len(window) > limit:
+                    self.add(engine, engine.model.Add(cp_model.LinearExpr.Sum(window) <= limit))
+
+    def prepare(self, engine):
+        # before[i, j]: doctor i worked on day j - max_days (history before start_date)
+        self.before = np.zeros((len(engine.doctors), self.max_days), dtype=int)
+        for i, worked in engine.worked_before().items():
+            for d in worked:
+                if d >= -self.max_days:
+                    self.before[i, d + self.max_days] = 1
+
+    def violations(self, engine, assign, rows, days):
+        span, lead = self.max_days + 1, self.max_days
+        starts = sorted({
+            s for d in days for s in range(max(-lead, d - span + 1), d + 1)
+            if s < 0 or s + span <= engine.num_days
+        })
+        if not starts:
+            return 0
+        starts = np.array(starts)
+        ends = np.minimum(starts + span, engine.num_days)
+        count = 0
+        for i in rows:
+            worked = np.concatenate(([0], np.cumsum(np.concatenate((self.before[i], assign[i] >= 0)))))
+            count += int(((worked[ends + lead] - worked[starts + lead]) > self.max_days).sum())
+        return count
+
+    def conflicts(self, roster, doctor_id, day):
+        if not roster.works(doctor_id, day):
+            return []
+        first = last = day
+        while roster.works(doctor_id, first - timedelta(days=1)):
+            first -= timedelta(days=1)
+        while roster.works(doctor_id, last + timedelta(days=1)):
+            last += timedelta(days=1)
+        length = (last - first).days + 1
+        if length <= self.max_days:
+            return []
+        return [roster.conflict(
+            self.name, doctor_id, first, f"{length} consecutive duty days from {first} (limit {self.max_days})",
+            rows=[r for d in range((last - first).days + 1) for r in roster.shifts(doctor_id, first + timedelta(days=d))],
+        )]
+
+@register
+class MaxNightsPerWeek(Rule):
+    name = "max_nights_per_week"
+    description = "每周夜班次数上限"
+    reach = 6  # back to the Monday of the week
+
+    def __init__(self, max_nights: int = 2):
+        super().__init__(max_nights=max_nights)
+        self.max_nights = _positive_int(max_nights, "max_nights")
+
+    def carried(self, engine):
+        """{doctor index: nights already worked in start_date's ISO week before start_date}."""
+        monday = -engine.start_date.weekday()
+        carried = {}
+        for i, worked in engine.worked_before().items():
+            nights = sum(1 for d, k in worked.items() if d >= monday and is_night_shift(engine.shift_types[k]))
+            if nights:
+                carried[i] = min(nights, self.max_nights)
+        return carried
+
+    def apply(self, engine, day_vars):
+        night_idx = [k for k, s in enumerate(engine.shift_types) if is_night_shift(s)]
+        weeks = {}
+        for d in engine.all_days:
+            weeks.setdefault((engine.start_date + timedelta(days=d)).isocalendar()[:2], []).append(d)
+        carried = self.carried(engine)
+        for i, row in enumerate(engine.x):
+            for w, days in enumerate(weeks.values()):
+                limit = self.max_nights - (carried.get(i, 0) if w == 0 else 0)
+                nights = [row[d][k] for d in days for k in night_idx if row[d][k] is not None]
+                if len(nights) > limit:
+                    self.add(engine, engine.model.Add(cp_model.LinearExpr.Sum(nights) <= limit))
+
+    def prepare(self, engine):
+        # Index -1 (off) hits the trailing False
+        self.night_lookup = np.array([is_night_shift(s) for s in engine.shift_types] + [False])
+        self.carried_nights = np.zeros(len(engine.doctors), dtype=int)
+        for i, nights in self.carried(engine).items():
+            self.carried_nights[i] = nights
+        weeks = {}
+        self.week_of_day = np.array([
+            weeks.setdefault((engine.start_date + timedelta(days=d)).isocalendar()[:2], len(weeks))
+            for d in engine.all_days
+        ])
+
+    def violations(self, engine, assign, rows, days):
+        weeks = np.unique(self.week_of_day[list(days)])
+        count = 0
+        for i in rows:
+            per_week = np.bincount(self.week_of_day[self.night_lookup[assign[i]]], minlength=len(self.week_of_day))
+            per_week[0] += self.carried_nights[i]  # week 0 is start_date's
+            count += int(np.maximum(per_week[weeks] - self.max_nights, 0).sum())
+        return count
+
+    def conflicts(self, roster, doctor_id, day):
+        monday = day - timedelta(days=day.weekday())
+        nights = [r for d in range(7) for r in roster.shifts(doctor_id, monday + timedelta(days=d)) if roster.is_night(r)]
+        if len(nights) <= self.max_nights:
+            return []
+        return [roster.conflict(
+            self.name, doctor_id, monday, f"{len(nights)} night shifts in the week of {monday} (limit {self.max_nights})", rows=nights,
+        )]
+
+@register
+class MutualExclusion(Rule):
+    name = "mutual_exclusion"
+    description = "两名医生不能同时值班（同一天或同一班次）"
+
+    def __init__(self, doctor_ids: List[int], scope: str = "day"):
+        super().__init__(doctor_ids=doctor_ids, scope=scope)
+        if not isinstance(doctor_ids, (list, tuple)) or len(set(doctor_ids)) != 2:
+            raise ValueError("doctor_ids must name two different doctors")
+        if scope not in ("day", "shift"):
+            raise ValueError("scope must be 'day' or 'shift'")
+        self.doctor_ids = list(doctor_ids)
+        self.scope = scope
+
+    def apply(self, engine, day_vars):
+        rows = [engine.doc_index.get(doctor_id) for doctor_id in self.doctor_ids]
+        if None in rows:
+            return  # one of them is not part of this roster
+        a, b = rows
+        for d in engine.all_days:
+            if self.scope == "day":
+                groups = [day_vars[a][d] + day_vars[b][d]]
+            else:
+                groups = [[v for v in (engine.x[a][d][k], engine.x[b][d][k]) if v is not None] for k in range(len(engine.shift_types))]
+            for group in groups:
+                if len(group) > 1:
+                    self.add(engine, engine.model.Add(cp_model.LinearExpr.Sum(group) <= 1))
+
+    def violations(self, engine, assign, rows, days):
+        rows = [engine.doc_index.get(doctor_id) for doctor_id in self.doctor_ids]
+        if None in rows:
+            return 0
+        a, b = assign[rows[0], list(days)], assign[rows[1], list(days)]
+        clash = (a >= 0) & (b >= 0)
+        if self.scope == "shift":
+            clash &= a == b
+        return int(clash.sum())
+
+    def conflicts(self, roster, doctor_id, day):
+        if doctor_id not in self.doctor_ids:
+            return []
+        a, b = (roster.shifts(i, day) for i in self.doctor_ids)
+        if self.scope == "shift":
+            clashing = {r.shift_type_id for r in a} & {r.shift_type_id for r in b}
+            a = [r for r in a if r.shift_type_id in clashing]
+            b = [r for r in b if r.shift_type_id in clashing]
+        if not (a and b):
+            return []
+        return [roster.conflict(
+            self.name, min(self.doctor_ids), day, f"Doctors {self.doctor_ids[0]} and {self.doctor_ids[1]} are both on duty", rows=a + b,
+        )]
+
+@register
+class QualificationPairing(Rule):
+    name = "qualification_pairing"
+    description = "资质搭配：无该资质的医生值班时，同班次至少一名具备资质的医生"
+
+    def __init__(self, qualification: str, shift_type_ids: List[int] = None):
+        super().__init__(qualification=qualification, shift_type_ids=shift_type_ids)
+        if not qualification:
+            raise ValueError("qualification is required")
+        self.qualification = qualification
+        self.shift_type_ids = shift_type_ids
+
+    def apply(self, engine, day_vars):
+        holders = [i for i, doc in enumerate(engine.doctors) if self.qualification in getattr(doc, "qualifications", ())]
+        holder_set = set(holders)
+        others = [i for i in range(len(engine.doctors)) if i not in holder_set]
+        shifts = [k for k, s in enumerate(engine.shift_types) if self.shift_type_ids is None or s.id in self.shift_type_ids]
+        for d in engine.all_days:
+            for k in shifts:
+                seniors = [engine.x[i][d][k] for i in holders if engine.x[i][d][k] is not None]
+                juniors = [engine.x[i][d][k] for i in others if engine.x[i][d][k] is not None]
+                if juniors:
+                    # len(juniors) * seniors >= juniors: any junior on the shift needs a senior
+                    self.add(engine, engine.model.Add(
+                        len(juniors) * cp_model.LinearExpr.Sum(seniors) >= cp_model.LinearExpr.Sum(juniors)
+                    ))
+
+    def prepare(self, engine):
+        self.holder_mask = np.array([self.qualification in getattr(doc, "qualifications", ()) for doc in engine.doctors], dtype=bool)
+        self.shift_scope = [k for k, s in enumerate(engine.shift_types) if self.shift_type_ids is None or s.id in self.shift_type_ids]
+
+    def violations(self, engine, assign, rows, days):
+        count = 0
+        for d in days:
+            column = assign[:, d]
+            for k in self.shift_scope:
+                on_shift = column == k
+                if on_shift[~self.holder_mask].any() and not on_shift[self.holder_mask].any():
+                    count += 1
+        return count
+
+    def conflicts(self, roster, doctor_id, day):
+        found = []
+        department_id = roster.department_of(doctor_id)
+        for row in roster.shifts(doctor_id, day):
+            if self.shift_type_ids is not None and row.shift_type_id not in self.shift_type_ids:
+                continue
+            crew = [r for r in roster.slot(day, row.shift_type_id) if roster.department_of(r.doctor_id) == department_id]
+            if any(self.qualification in roster.qualifications(r.doctor_id) for r in crew):
+                continue
+            found.append(roster.conflict(
+                self.name, None, day, f"No doctor with {self.qualification} on this shift", shift_type_id=row.shift_type_id, rows=crew,
+            ))
+        return found
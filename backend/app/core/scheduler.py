@@ -1,7 +1,44 @@
+import os
+import time
+import threading
 from ortools.sat.python import cp_model
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
 from datetime import date, timedelta
 
+# Solve budget defaults (PRD 4.2: 60 doctors / month in < 30s)
+DEFAULT_TIME_LIMIT = float(os.getenv("SCHEDULER_TIME_LIMIT", "25"))
+DEFAULT_NUM_WORKERS = int(os.getenv("SCHEDULER_NUM_WORKERS", str(min(os.cpu_count() or 1, 8))))
+
+# Objective weights
+STABILITY_WEIGHT = 4  # per current draft assignment changed
+DESIRE_WEIGHT = 3  # per granted "desire" preference
+# Fairness: per unit of (max - min) across doctors, carry-over balances included
+FAIRNESS_WEIGHTS = {"load": 2, "nights": 2, "weekends": 1}
+FEASIBILITY_FIRST_SHARE = 0.5  # max share of the budget for finding a seed solution (stops at the first one)
+
+def is_night_shift(shift) -> bool:
+    """
+    The one night-shift test used by the engines, rules, conflicts and reports: the category
+    decides, and shift types left uncategorised (NULL or the column default "day", i.e.
+    created before categories existed) count as nights when their name says 夜 / Night.
+    """
+    category = getattr(shift, "shift_category", None)
+    if category == "night":
+        return True
+    if category not in (None, "day"):
+        return False
+    name = getattr(shift, "name", None) or ""
+    return "夜" in name or "night" in name.lower()
+
+class _ProgressCallback(cp_model.CpSolverSolutionCallback):
+    """Reports (wall_time, objective) for every improving solution."""
+    def __init__(self, on_solution):
+        super().__init__()
+        self.on_solution = on_solution
+
+    def on_solution_callback(self):
+        self.on_solution(self.WallTime(), self.ObjectiveValue())
+
 class SchedulingEngine:
     def __init__(self, doctors: List[Any], shift_types: List[Any], start_date: date, num_days: int):
         self.doctors = doctors
@@ -9,82 +46,495 @@ class SchedulingEngine:
         self.start_date = start_date
         self.num_days = num_days
         self.model = cp_model.CpModel()
-        self.shifts = {} # (doctor_id, day_index, shift_id) -> BoolVar
         self.all_days = range(num_days)
+        self.stats = {}
+        # Dense variable index: x[doctor_idx][day][shift_idx] -> BoolVar
+        self.doc_index = {doc.id: i for i, doc in enumerate(doctors)}
+        self.shift_index = {s.id: k for k, s in enumerate(shift_types)}
+        self.x = []
+        # Warm start (see set_warm_start)
+        self.hints = []  # (doctor_id, day, shift_type_id) from earlier rosters
+        self.keep = []  # hints that count as "unchanged" in the objective (current drafts)
+        self.fixed = []  # assignments that must stay (e.g. published days)
+        self.previous_day = []  # (doctor_id, shift_type_id) worked on start_date - 1
+        self.next_day = []  # (doctor_id, shift_type_id) worked the day after the horizon
+        self.history = []  # (doctor_id, day < 0, shift_type_id) worked in the days before start_date
+        self.unavailable = []  # (doctor_id, day) cells the doctor cannot work
+        self.coverage = []  # CoverageRequirement-like rules (see set_coverage)
+        self.preferences = []  # (doctor_id, day, "desire"/"avoid", shift_type_id or None)
+        self.balances = {}  # doctor_id -> (load, nights, weekends) carried over from earlier periods
+        self.holidays = set()  # dates off whatever the weekday (see set_calendar)
+        self.workdays = set()  # make-up workdays: weekend dates that count as ordinary days
+        self.fairness_weights = dict(FAIRNESS_WEIGHTS)  # 0 / missing disables a fairness term
+        self.objective_terms = []  # summed into Minimize() at the end of build_model
+        self.counters = {}  # "load" / "nights" / "weekends" -> per doctor IntVars (after build_model)
+        # Explain mode (see core/feasibility.py): rule groups are gated by assumption literals
+        self.explain = False
+        self.assumptions = {}  # rule label -> assumption literal
+        self.rules = []  # core.rules.Rule instances enabled for this roster
+        self.rule_stats = []  # per block / rule: build_ms, variables and constraints added
         
-    def build_model(self):
-        # 1. Create Variables
+    def var(self, doctor_id: int, day: int, shift_type_id: int):
+        return self.x[self.doc_index[doctor_id]][day][self.shift_index[shift_type_id]]
+
+    def set_warm_start(self, hints=(), keep=(), fixed=(), previous_day=(), next_day=(), history=()):
+        """
+        Seed the model from existing rosters. Call before build_model().
+        hints / keep / fixed are (doctor_id, day_index, shift_type_id) triples;
+        previous_day / next_day are (doctor_id, shift_type_id) worked the day before
+        start_date / after the horizon. history holds (doctor_id, day_index < 0,
+        shift_type_id) triples of the days before start_date that department rules
+        look back at (see Rule.reach). Unknown doctors, shift types or days outside
+        the horizon are ignored.
+        """
+        self.hints = list(hints)
+        self.keep = list(keep)
+        self.fixed = list(fixed)
+        self.previous_day = list(previous_day)
+        self.next_day = list(next_day)
+        self.history = list(history)
+
+    def worked_before(self):
+        """{doctor index: {day_index < 0: shift index}} of the history (see set_warm_start)."""
+        worked = {}
+        for doctor_id, d, shift_type_id in self.history:
+            i, k = self.doc_index.get(doctor_id), self.shift_index.get(shift_type_id)
+            if i is not None and k is not None and d < 0:
+                worked.setdefault(i, {})[d] = k
+        return worked
+
+    def set_unavailable(self, cells):
+        """(doctor_id, day_index) pairs on which the doctor gets no shift (masked out). Call before build_model()."""
+        self.unavailable = list(cells)
+
+    def set_preferences(self, preferences):
+        """
+        (doctor_id, day_index, type, shift_type_id or None) tuples. Call before build_model().
+        "avoid" removes the cells from the model, "desire" is rewarded in the objective.
+        """
+        self.preferences = list(preferences)
+
+    def set_balances(self, balances):
+        """
+        Carry-over {doctor_id: (weighted load, nights, weekends)} from earlier periods, added
+        to each doctor's counters before balancing. Call before build_model().
+        """
+        self.balances = dict(balances)
+
+    def set_calendar(self, holidays=(), workdays=()):
+        """
+        Public holidays and make-up workdays (dates, see core/holidays.py): they decide which
+        days the "weekends" fairness counter covers. Call before build_model().
+        """
+        self.holidays = set(holidays)
+        self.workdays = set(workdays)
+
+    def rest_days(self) -> List[int]:
+        """Day indexes of holidays and of Saturdays / Sundays that are not make-up workdays."""
+        days = [self.start_date + timedelta(days=d) for d in self.all_days]
+        return [
+            d for d, day in zip(self.all_days, days)
+            if day in self.holidays or (day.weekday() >= 5 and day not in self.workdays)
+        ]
+
+    def set_rules(self, rules):
+        """Rule instances (see core/rules.py) applied after the built-in constraints. Call before build_model()."""
+        self.rules = list(rules)
+
+    def set_coverage(self, requirements):
+        """
+        Headcount rules with shift_type_id, department_id, weekday, date, min_count,
+        max_count, qualification (see models.CoverageRequirement). Call before build_model().
+        Without a matching rule a shift needs exactly one doctor.
+        """
+        self.coverage = list(requirements)
+
+    def demand(self):
+        """
+        Precompute headcount bounds from the coverage rules.
+        Returns (lo, hi, qualified): lo/hi are [day][shift_idx] arrays, qualified is a list of
+        (day, shift_idx, qualification, min, max or None) for qualification-specific rules.
+        """
+        n_shifts = len(self.shift_types)
+        lo = [[1] * n_shifts for _ in self.all_days]
+        hi = [[1] * n_shifts for _ in self.all_days]
+        qualified = []
+
+        grouped = {}  # (shift_idx, qualification or None) -> rules
+        for rule in self.coverage:
+            k = self.shift_index.get(rule.shift_type_id)
+            if k is not None:
+                grouped.setdefault((k, rule.qualification or None), []).append(rule)
+        if not grouped:
+            return lo, hi, qualified
+
+        def pick(rules, day):
+            # date > weekday > every day; department-specific beats global
+            best, best_rank = None, -1
+            for rule in rules:
+                if rule.date is not None and rule.date != day:
+                    continue
+                if rule.weekday is not None and rule.weekday != day.weekday():
+                    continue
+                rank = 4 * (rule.date is not None) + 2 * (rule.weekday is not None) + (rule.department_id is not None)
+                if rank > best_rank:
+                    best, best_rank = rule, rank
+            return best
+
         for d in self.all_days:
-            for shift in self.shift_types:
-                for doctor in self.doctors:
-                    self.shifts[(doctor.id, d, shift.id)] = self.model.NewBoolVar(
-                        f'shift_doc{doctor.id}_day{d}_sh{shift.id}'
-                    )
+            day = self.start_date + timedelta(days=d)
+            for (k, qualification), rules in grouped.items():
+                rule = pick(rules, day)
+                if rule is None:
+                    continue
+                max_count = rule.max_count if rule.max_count is not None else rule.min_count
+                if qualification is None:
+                    lo[d][k], hi[d][k] = rule.min_count, max_count
+                else:
+                    qualified.append((d, k, qualification, rule.min_count, rule.max_count))
+        return lo, hi, qualified
+
+    def _cell(self, doctor_id, day, shift_type_id):
+        i = self.doc_index.get(doctor_id)
+        k = self.shift_index.get(shift_type_id)
+        if i is None or k is None or not 0 <= day < self.num_days:
+            return None
+        return self.x[i][day][k]
+
+    def _gate(self, ct, label):
+        """In explain mode, enforce `ct` only under the assumption literal of its rule group."""
+        if self.explain:
+            lit = self.assumptions.get(label)
+            if lit is None:
+                lit = self.assumptions[label] = self.model.NewBoolVar(f'assume_{len(self.assumptions)}')
+            ct.OnlyEnforceIf(lit)
+        return ct
+
+    def _cost_mark(self):
+        proto = self.model.Proto()
+        return time.perf_counter(), len(proto.variables), len(proto.constraints)
+
+    def _record_cost(self, name: str, mark):
+        t0, n_vars, n_constraints = mark
+        proto = self.model.Proto()
+        self.rule_stats.append({
+            "rule": name,
+            "build_ms": (time.perf_counter() - t0) * 1000,
+            "variables": len(proto.variables) - n_vars,
+            "constraints": len(proto.constraints) - n_constraints,
+        })
+        return self._cost_mark()
+
+    def model_size(self) -> Dict[str, int]:
+        proto = self.model.Proto()
+        return {"variables": len(proto.variables), "constraints": len(proto.constraints)}
+
+    def masks(self):
+        """
+        Cells that may get a variable at all, before any is created:
+        eligible[i][k] - doctor i holds shift k's required_qualification (tag or title);
+        blocked_days   - (i, d) with an all-day avoid preference or an absence;
+        blocked_cells  - (i, d, k) with a shift-specific avoid preference.
+        Fixed assignments are never masked.
+        """
+        eligible = [
+            [
+                not getattr(s, "required_qualification", None) or s.required_qualification in getattr(doc, "qualifications", ())
+                for s in self.shift_types
+            ]
+            for doc in self.doctors
+        ]
+        blocked_days, blocked_cells = set(), set()
+        for doctor_id, d in self.unavailable:
+            i = self.doc_index.get(doctor_id)
+            if i is not None:
+                blocked_days.add((i, d))
+        for doctor_id, d, pref_type, shift_type_id in self.preferences:
+            i = self.doc_index.get(doctor_id)
+            if i is None or pref_type != "avoid":
+                continue
+            if shift_type_id is None:
+                blocked_days.add((i, d))
+            elif shift_type_id in self.shift_index:
+                blocked_cells.add((i, d, self.shift_index[shift_type_id]))
+        for doctor_id, d, shift_type_id in self.fixed:
+            i, k = self.doc_index.get(doctor_id), self.shift_index.get(shift_type_id)
+            if i is not None and k is not None:
+                eligible[i][k] = True
+                blocked_days.discard((i, d))
+                blocked_cells.discard((i, d, k))
+        return eligible, blocked_days, blocked_cells
+
+    def build_model(self):
+        model = self.model
+        n_shifts = len(self.shift_types)
+        
+        # 1. Create Variables (doctor x day x shift); masked cells stay None
+        self.rule_stats = []
+        mark = self._cost_mark()
+        eligible, blocked_days, blocked_cells = self.masks()
+        none_row = [None] * n_shifts
+        self.x = []
+        for i, doc in enumerate(self.doctors):
+            doc_rows = []
+            for d in self.all_days:
+                if (i, d) in blocked_days:
+                    doc_rows.append(none_row)
+                    continue
+                doc_rows.append([
+                    model.NewBoolVar(f'shift_doc{doc.id}_day{d}_sh{shift.id}')
+                    if eligible[i][k] and (i, d, k) not in blocked_cells else None
+                    for k, shift in enumerate(self.shift_types)
+                ])
+            self.x.append(doc_rows)
+        x = self.x
+        # Per doctor-day list of existing variables
+        day_vars = [[[v for v in cell if v is not None] for cell in row] for row in x]
+
+        mark = self._record_cost("variables", mark)
 
         # 2. Hard Constraints
         
-        # 2.1 Each shift must be assigned to EXACTLY ONE doctor (simplified for now)
-        # In reality, might need N doctors depending on shift config.
+        # 2.1 Coverage: each (day, shift) needs between lo and hi doctors (default exactly one),
+        # plus optional "at least N qualified" rows. Bounds are precomputed arrays.
+        lo, hi, qualified = self.demand()
         for d in self.all_days:
-            for shift in self.shift_types:
-                self.model.AddExactlyOne(
-                    self.shifts[(doc.id, d, shift.id)] for doc in self.doctors
-                )
+            for k in range(n_shifts):
+                column = [row[d][k] for row in x if row[d][k] is not None]
+                if lo[d][k] == 1 and hi[d][k] == 1 and not self.explain:
+                    model.AddExactlyOne(column)
+                else:
+                    self._gate(model.AddLinearConstraint(cp_model.LinearExpr.Sum(column), lo[d][k], hi[d][k]), ("coverage", d, k))
+        if qualified:
+            holders = {}
+            for d, k, qualification, min_count, max_count in qualified:
+                if qualification not in holders:
+                    holders[qualification] = [
+                        i for i, doc in enumerate(self.doctors)
+                        if qualification in getattr(doc, "qualifications", ())
+                    ]
+                column = [x[i][d][k] for i in holders[qualification] if x[i][d][k] is not None]
+                self._gate(model.AddLinearConstraint(
+                    cp_model.LinearExpr.Sum(column), min_count,
+                    max_count if max_count is not None else max(min_count, len(column))
+                ), ("qualification", d, k, qualification))
+
+        mark = self._record_cost("coverage", mark)
 
         # 2.2 Each doctor works at most one shift per day
-        for doc in self.doctors:
-            for d in self.all_days:
-                self.model.AddAtMostOne(
-                    self.shifts[(doc.id, d, shift.id)] for shift in self.shift_types
-                )
+        for row in day_vars:
+            for cell in row:
+                if len(cell) > 1:
+                    model.AddAtMostOne(cell)
         
-        # 2.3 No consecutive "24h" conflicts (Simplified: If night shift D, no day shift D+1)
-        # Assuming Shift ID 2 is Night, ID 1 is Day. 
-        # Needs flexible logic based on shift definitions.
-        # For MVP: If works any shift on Day D, verify rest time? 
-        # Let's say: Cannot work on D+1 if worked Night on D.
-        night_shifts = [s for s in self.shift_types if "Night" in s.name or "夜" in s.name]
-        for doc in self.doctors:
-            for d in range(self.num_days - 1):
-                for night in night_shifts:
-                    # If worked night on day d, cannot work ANY shift on day d+1
-                    # (This is a strong constraint, common in hospitals)
-                    worked_night = self.shifts[(doc.id, d, night.id)]
-                    for next_shift in self.shift_types:
-                         self.model.Add(self.shifts[(doc.id, d + 1, next_shift.id)] == 0).OnlyEnforceIf(worked_night)
+        mark = self._record_cost("one_shift_per_day", mark)
+
+        # 2.3 Night rest: a doctor who works a night shift on day d works nothing on d+1.
+        # Since 2.2 allows at most one shift per day, this is a single aggregated row
+        #   sum(night[d]) + sum(shifts[d+1]) <= 1
+        # (emitted as AtMostOne) instead of one implication per (night, next shift) pair.
+        night_idx = [k for k, s in enumerate(self.shift_types) if is_night_shift(s)]
+        if night_idx:
+            for doc, row, vars_row in zip(self.doctors, x, day_vars):
+                for d in range(self.num_days - 1):
+                    nights = [row[d][k] for k in night_idx if row[d][k] is not None]
+                    if nights and vars_row[d + 1]:
+                        if self.explain:
+                            self._gate(model.Add(cp_model.LinearExpr.Sum(nights + vars_row[d + 1]) <= 1), ("night_rest", doc.id))
+                        else:
+                            model.AddAtMostOne(nights + vars_row[d + 1])
+
+            # The rule carries across the boundary: last night of the previous period blocks day 0
+            night_ids = {self.shift_types[k].id for k in night_idx}
+            for doctor_id, shift_type_id in self.previous_day:
+                i = self.doc_index.get(doctor_id)
+                if i is not None and shift_type_id in night_ids:
+                    for v in day_vars[i][0]:
+                        self._gate(model.Add(v == 0), ("previous_night", doctor_id))
+            # ... and a shift right after the horizon forbids a night on its last day
+            for doctor_id, shift_type_id in self.next_day:
+                i = self.doc_index.get(doctor_id)
+                if i is not None:
+                    for k in night_idx:
+                        if x[i][self.num_days - 1][k] is not None:
+                            self._gate(model.Add(x[i][self.num_days - 1][k] == 0), ("next_shift", doctor_id))
+
+        mark = self._record_cost("night_rest", mark)
+
+        # 2.4 Fixed assignments (e.g. already published days)
+        for doctor_id, d, shift_type_id in self.fixed:
+            v = self._cell(doctor_id, d, shift_type_id)
+            if v is not None:
+                self._gate(model.Add(v == 1), ("fixed", doctor_id, d, shift_type_id))
+        mark = self._record_cost("fixed", mark)
+
+        # 2.5 Department rules (core/rules.py), each accounted separately
+        for rule in self.rules:
+            rule.apply(self, day_vars)
+            mark = self._record_cost(rule.name, mark)
 
         # 3. Soft Constraints (Objectives)
-        
-        # 3.1 Balance number of shifts
-        min_shifts_per_doc = (self.num_days * len(self.shift_types)) // len(self.doctors)
-        max_shifts_per_doc = min_shifts_per_doc + 2
-        
-        for doc in self.doctors:
-            shifts_worked = []
-            for d in self.all_days:
-                for s in self.shift_types:
-                    shifts_worked.append(self.shifts[(doc.id, d, s.id)])
-            
-            # Penalize deviation from average
-            # This is complex in CP-SAT directly without "AddSoftConstraint". 
-            # We minimize the sum of shifts worked * weight? No, we want equality.
-            # Simple approach: Minimize (Max - Min) or just Minimize Sum(Overworked)
-            
-            # Let's just try to keep it within range for now (Hard constraint for MVP balance)
-            # self.model.AddLinearConstraint(sum(shifts_worked), min_shifts_per_doc, max_shifts_per_doc)
-            pass
-
-    def solve(self):
-        solver = cp_model.CpSolver()
-        status = solver.Solve(self.model)
+        # 3.0 Fairness: per doctor integer counters (weighted load, nights, weekend shifts)
+        # plus carry-over; minimize max - min of each via AddMax/MinEquality.
+        weights = [getattr(s, "weight", None) or 1 for s in self.shift_types]
+        weekend_days = self.rest_days()
+        terms_of = {
+            "load": lambda i: [(x[i][d][k], weights[k]) for d in self.all_days for k in range(n_shifts)],
+            "nights": lambda i: [(x[i][d][k], 1) for d in self.all_days for k in night_idx],
+            "weekends": lambda i: [(v, 1) for d in weekend_days for v in day_vars[i][d]],
+        }
+        carry_slot = {"load": 0, "nights": 1, "weekends": 2}
+        counters = {}
+        for name, weight in self.fairness_weights.items():
+            if not weight:
+                continue
+            items = []
+            for i, doc in enumerate(self.doctors):
+                offset = self.balances.get(doc.id, (0, 0, 0))[carry_slot[name]]
+                terms = [(v, w) for v, w in terms_of[name](i) if v is not None]
+                upper = offset + sum(w for _, w in terms)
+                counter = model.NewIntVar(offset, upper, f'{name}_doc{doc.id}')
+                model.Add(counter == cp_model.LinearExpr.WeightedSum([v for v, _ in terms], [w for _, w in terms]) + offset)
+                items.append((counter, offset, upper))
+            counters[name] = items
+            if len(items) < 2 or all(lo == hi == items[0][1] for _, lo, hi in items):
+                continue  # nothing to balance (e.g. no night shifts)
+            lo = min(lo for _, lo, _ in items)
+            hi = max(hi for _, _, hi in items)
+            top = model.NewIntVar(lo, hi, f'max_{name}')
+            bottom = model.NewIntVar(lo, hi, f'min_{name}')
+            model.AddMaxEquality(top, [c for c, _, _ in items])
+            model.AddMinEquality(bottom, [c for c, _, _ in items])
+            # Redundant mean cuts (min <= mean <= max) tighten the LP bound considerably
+            total = cp_model.LinearExpr.Sum([c for c, _, _ in items])
+            model.Add(len(items) * top >= total)
+            model.Add(len(items) * bottom <= total)
+            self.objective_terms.append(weight * (top - bottom))
+        self.counters = {name: [c for c, _, _ in items] for name, items in counters.items()}
+
+        mark = self._record_cost("fairness", mark)
+
+        # 3.1 Stability: keep as many current draft assignments as possible
+        kept = [v for v in (self._cell(*a) for a in self.keep) if v is not None]
+        if kept:
+            self.objective_terms.append(STABILITY_WEIGHT * (len(kept) - cp_model.LinearExpr.Sum(kept)))
+
+        # 3.2 Desires: reward granted "desire" preferences (whole day or a specific shift)
+        desired = []
+        for doctor_id, d, pref_type, shift_type_id in self.preferences:
+            i = self.doc_index.get(doctor_id)
+            if i is None or pref_type != "desire" or not 0 <= d < self.num_days:
+                continue
+            if shift_type_id is None:
+                desired.extend(day_vars[i][d])
+            elif shift_type_id in self.shift_index and x[i][d][self.shift_index[shift_type_id]] is not None:
+                desired.append(x[i][d][self.shift_index[shift_type_id]])
+        if desired:
+            self.objective_terms.append(-DESIRE_WEIGHT * cp_model.LinearExpr.Sum(desired))
+
+        mark = self._record_cost("objectives", mark)
+
+        # 4. Warm start: hint a complete assignment (1 for hinted cells, 0 elsewhere)
+        if self.hints or self.fixed:
+            hinted = {v.Index() for v in (self._cell(*a) for a in list(self.hints) + list(self.fixed)) if v is not None}
+            for row in day_vars:
+                for cell in row:
+                    for v in cell:
+                        model.AddHint(v, 1 if v.Index() in hinted else 0)
+
+        if self.objective_terms:
+            model.Minimize(sum(self.objective_terms))
+
+    def solve(
+        self,
+        time_limit: Optional[float] = None,
+        num_workers: Optional[int] = None,
+        relative_gap: Optional[float] = None,
+        random_seed: Optional[int] = None,
+        on_solution: Optional[Callable[[float, float], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Solve within a wall-clock budget and return the best roster found so far.
+        Solver outcome (status, objective, bound, gap, wall time) is kept in self.stats.
+        on_solution(wall_time, objective) is called for each improving solution;
+        should_stop() is polled and aborts the search once it returns True.
+        """
+        time_limit = time_limit if time_limit is not None else DEFAULT_TIME_LIMIT
+        num_workers = num_workers if num_workers is not None else DEFAULT_NUM_WORKERS
+        active = []  # solver currently searching, for the should_stop watcher
+
+        def make_solver(budget):
+            solver = cp_model.CpSolver()
+            solver.parameters.max_time_in_seconds = max(budget, 0.01)
+            solver.parameters.num_search_workers = num_workers
+            if random_seed is not None:
+                solver.parameters.random_seed = random_seed
+            active[:] = [solver]
+            return solver
+
+        stop_watch, stopped = threading.Event(), threading.Event()
+        if should_stop is not None:
+            def watch():
+                while not stop_watch.wait(0.2):
+                    if should_stop():
+                        stopped.set()
+                        for solver in active:
+                            solver.StopSearch()
+                        return
+            threading.Thread(target=watch, daemon=True).start()
+
+        try:
+            # Feasibility first: balancing objectives make the first solution hard to find
+            # with few workers, so without a warm start seed the search with a complete hint
+            # from the same model minus its objective.
+            first_phase_time = 0.0
+            if self.model.HasObjective() and not self.model.Proto().solution_hint.vars:
+                feasible = self.model.Clone()
+                feasible.ClearObjective()
+                solver = make_solver(time_limit * FEASIBILITY_FIRST_SHARE)
+                first_status = solver.Solve(feasible)
+                first_phase_time = solver.WallTime()
+                if first_status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                    for i in range(len(feasible.Proto().variables)):
+                        self.model.AddHint(self.model.GetIntVarFromProtoIndex(i), solver.Value(feasible.GetIntVarFromProtoIndex(i)))
+                if first_status == cp_model.INFEASIBLE or stopped.is_set():
+                    self.stats = {"status": solver.StatusName(first_status), "objective": None, "best_bound": None, "gap": None, "wall_time": first_phase_time, "rules": self.rule_stats}
+                    return None
+
+            solver = make_solver(time_limit - first_phase_time)
+            if relative_gap is not None:
+                solver.parameters.relative_gap_limit = relative_gap
+            if on_solution is not None:
+                status = solver.Solve(self.model, _ProgressCallback(lambda t, o: on_solution(first_phase_time + t, o)))
+            else:
+                status = solver.Solve(self.model)
+        finally:
+            stop_watch.set()
+
+        self.stats = {
+            "status": solver.StatusName(status),
+            "objective": None,
+            "best_bound": None,
+            "gap": None,
+            "wall_time": first_phase_time + solver.WallTime(),
+            "rules": self.rule_stats,
+        }
         
         results = []
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+            if self.model.HasObjective():
+                objective = solver.ObjectiveValue()
+                bound = solver.BestObjectiveBound()
+                self.stats["objective"] = objective
+                self.stats["best_bound"] = bound
+                self.stats["gap"] = abs(objective - bound) / max(1.0, abs(objective))
             for d in self.all_days:
                 current_date = self.start_date + timedelta(days=d)
-                for s in self.shift_types:
-                    for doc in self.doctors:
-                        if solver.Value(self.shifts[(doc.id, d, s.id)]):
+                for k, s in enumerate(self.shift_types):
+                    for i, doc in enumerate(self.doctors):
+                        v = self.x[i][d][k]
+                        if v is not None and solver.BooleanValue(v):
                             results.append({
                                 "date": current_date,
                                 "doctor_id": doc.id,
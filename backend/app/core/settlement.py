@@ -0,0 +1,115 @@
+"""
+Duty-fee settlement (PRD 3.1.4): per-doctor pay for a period from shift weight, duration
+and the day each shift falls on.
+
+Each shift pays (base_fee * weight + hourly_rate * hours) of its category's DutyRate,
+times the weekend or holiday multiplier when it falls on a rest day of the holiday
+calendar (core/holidays.py). Shift types are parsed once per settlement into ShiftCost
+(hours from the "HH:MM" strings, cross-midnight aware), and the database returns one
+row per (doctor, shift type, day class) instead of every shift, ordered by doctor, so
+settle() emits each doctor's row as soon as the next one starts and the result can be
+streamed to CSV / XLSX (core/export.py) without holding the period in memory.
+"""
+from datetime import date
+from types import SimpleNamespace
+from typing import Dict, Iterable, Iterator, Any, Optional
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+from .. import models
+from .holidays import calendar_cache, calendar_between
+from .scheduler import is_night_shift
+from .workload import day_of_week, shift_hours
+from .pagination import STREAM_BATCH_SIZE
+
+SETTLEMENT_FIELDS = ("doctor_id", "doctor_name", "department_id", "total_shifts", "night_shifts",
+                     "weekend_shifts", "holiday_shifts", "hours", "weighted_score", "amount")
+DEFAULT_DUTY_RATE = {"base_fee": 0.0, "hourly_rate": 0.0, "weekend_multiplier": 2.0, "holiday_multiplier": 3.0}
+
+class ShiftCost:
+    """A shift type's settlement inputs, parsed once."""
+    def __init__(self, shift_type):
+        self.category = "night" if is_night_shift(shift_type) else (shift_type.shift_category or "day")
+        self.weight = shift_type.weight if shift_type.weight is not None else 1
+        self.hours = shift_hours(shift_type)
+
+    def pay(self, rate, day_class: str) -> float:
+        amount = rate.base_fee * self.weight + rate.hourly_rate * self.hours
+        if day_class == "holiday":
+            return amount * rate.holiday_multiplier
+        if day_class == "weekend":
+            return amount * rate.weekend_multiplier
+        return amount
+
+def load_rates(db: Session) -> Dict[str, Any]:
+    """Stored rates by shift category; categories without a row get DEFAULT_DUTY_RATE (see rate_for)."""
+    return {r.shift_category: r for r in db.query(models.DutyRate)}
+
+def rate_for(rates: Dict[str, Any], category: str):
+    return rates.get(category) or SimpleNamespace(shift_category=category, id=None, description=None, **DEFAULT_DUTY_RATE)
+
+def settlement_rows(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    department_id: Optional[int] = None,
+    include_drafts: bool = False,
+):
+    """Query of (doctor_id, name, department_id, shift_type_id, day_class, shifts) ordered by doctor."""
+    holidays, workdays = calendar_between(calendar_cache.get(db), start_date, end_date)
+    schedule = models.Schedule
+    weekend = and_(day_of_week(schedule.date, db.get_bind().dialect.name).in_([0, 6]), schedule.date.notin_(workdays))
+    day_class = case((schedule.date.in_(holidays), "holiday"), (weekend, "weekend"), else_="weekday")
+    # Classify in a subquery so GROUP BY names a column, not the parameterised CASE
+    shifts = select(schedule.doctor_id, schedule.shift_type_id, day_class.label("day_class")).where(
+        schedule.date >= start_date,
+        schedule.date <= end_date,
+        *([] if include_drafts else [schedule.status == "published"])
+    ).subquery()
+
+    query = db.query(
+        shifts.c.doctor_id,
+        models.User.full_name,
+        models.User.department_id,
+        shifts.c.shift_type_id,
+        shifts.c.day_class,
+        func.count(),
+    ).join(models.User, models.User.id == shifts.c.doctor_id)
+    if department_id:
+        query = query.filter(models.User.department_id == department_id)
+    group = (shifts.c.doctor_id, models.User.full_name, models.User.department_id, shifts.c.shift_type_id, shifts.c.day_class)
+    return query.group_by(*group).order_by(shifts.c.doctor_id)
+
+def settle(rows: Iterable, shift_types: Iterable, rates: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Per-doctor settlement rows from settlement_rows() output (grouped by doctor)."""
+    costs = {s.id: ShiftCost(s) for s in shift_types}
+    current = None
+    for doctor_id, full_name, department_id, shift_type_id, day_class, count in rows:
+        if current is None or current["doctor_id"] != doctor_id:
+            if current is not None:
+                yield _rounded(current)
+            current = {"doctor_id": doctor_id, "doctor_name": full_name, "department_id": department_id,
+                       "total_shifts": 0, "night_shifts": 0, "weekend_shifts": 0, "holiday_shifts": 0,
+                       "hours": 0.0, "weighted_score": 0, "amount": 0.0}
+        cost = costs.get(shift_type_id)
+        current["total_shifts"] += count
+        current["weekend_shifts"] += count if day_class == "weekend" else 0
+        current["holiday_shifts"] += count if day_class == "holiday" else 0
+        if cost is None:
+            continue
+        current["night_shifts"] += count if cost.category == "night" else 0
+        current["hours"] += cost.hours * count
+        current["weighted_score"] += cost.weight * count
+        current["amount"] += cost.pay(rate_for(rates, cost.category), day_class) * count
+    if current is not None:
+        yield _rounded(current)
+
+def _rounded(row: Dict[str, Any]) -> Dict[str, Any]:
+    row["hours"] = round(row["hours"], 2)
+    row["amount"] = round(row["amount"], 2)
+    return row
+
+def settle_period(db: Session, start_date: date, end_date: date, department_id: Optional[int] = None,
+                  include_drafts: bool = False) -> Iterator[Dict[str, Any]]:
+    """settle() over the period; rows are fetched in batches while the iterator is consumed."""
+    rows = settlement_rows(db, start_date, end_date, department_id, include_drafts).yield_per(STREAM_BATCH_SIZE)
+    return settle(rows, db.query(models.ShiftType).all(), load_rates(db))
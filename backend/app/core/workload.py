@@ -0,0 +1,111 @@
+"""
+Per-doctor daily workload rollup (models.WorkloadDaily) and the helpers that classify shifts
+for workload reports (PRD 3.1.4).
+
+Every write path to schedules (generation, repair, publish, delete, trades) calls
+refresh_workload() for the (doctors, dates) it touched before committing: the rollup rows
+of that scope are deleted and re-aggregated from schedules with one INSERT ... SELECT
+... GROUP BY doctor_id, date. Shift type attributes (category, weight, hours) come from
+the small shift_types table and are inlined as CASE lookups, so the refresh never joins
+or loads ORM rows. rebuild_workload() re-aggregates everything for backfills and after
+shift type edits (see rebuild_workload.py). Migration 0003 fills the table when it is
+created, and backfill_workload() rebuilds it at startup if it is empty while schedules
+is not (e.g. the table was created by create_all on an existing database).
+"""
+from datetime import date
+from typing import Optional
+from sqlalchemy import delete, insert, select, func, case, cast, extract, literal, Integer
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .. import models
+from .scheduler import is_night_shift
+
+def shift_hours(shift_type) -> float:
+    """Duration of a shift from its "HH:MM" times; an end at or before the start crosses midnight."""
+    try:
+        start_h, start_m = map(int, shift_type.start_time.split(":"))
+        end_h, end_m = map(int, shift_type.end_time.split(":"))
+    except (AttributeError, ValueError):
+        return 0.0
+    minutes = (end_h * 60 + end_m) - (start_h * 60 + start_m)
+    return (minutes if minutes > 0 else minutes + 24 * 60) / 60
+
+def day_of_week(column, dialect: str):
+    """0 = Sunday ... 6 = Saturday, on both SQLite and PostgreSQL."""
+    if dialect == "sqlite":
+        return cast(func.strftime("%w", column), Integer)
+    return extract("dow", column)
+
+def _per_shift_type(values: dict):
+    """CASE schedules.shift_type_id WHEN <id> THEN <value> ... ELSE 0."""
+    if not values:
+        return literal(0)
+    return case(values, value=models.Schedule.shift_type_id, else_=0)
+
+def _rollup_select(db: Session, conditions: list):
+    shift_type = models.ShiftType
+    shift_types = db.query(
+        shift_type.id, shift_type.name, shift_type.start_time, shift_type.end_time, shift_type.weight, shift_type.shift_category
+    ).all()
+    night = {s.id for s in shift_types if is_night_shift(s)}
+    category = {s.id: s.shift_category or "day" for s in shift_types}
+    schedule = models.Schedule
+    return select(
+        schedule.doctor_id,
+        schedule.date,
+        func.count(),
+        func.sum(_per_shift_type({i: 1 for i, c in category.items() if c == "day" and i not in night})),
+        func.sum(_per_shift_type({i: 1 for i in night})),
+        func.sum(_per_shift_type({i: 1 for i, c in category.items() if c == "oncall"})),
+        func.sum(_per_shift_type({i: 1 for i, c in category.items() if c == "backup"})),
+        func.sum(case((schedule.status == "published", 1), else_=0)),
+        func.sum(_per_shift_type({s.id: s.weight if s.weight is not None else 1 for s in shift_types})),
+        func.sum(_per_shift_type({s.id: shift_hours(s) for s in shift_types})),
+    ).where(schedule.doctor_id.isnot(None), *conditions).group_by(schedule.doctor_id, schedule.date)
+
+ROLLUP_COLUMNS = ["doctor_id", "date", "total_shifts", "day_shifts", "night_shifts", "oncall_shifts",
+                  "backup_shifts", "published_shifts", "weighted_score", "hours"]
+
+def refresh_workload(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    doctor_ids=None,
+):
+    """
+    Re-aggregate the rollup for [start_date, end_date] (open-ended when None), optionally
+    only for doctor_ids (an iterable of ids or a select of them). Runs in the caller's
+    transaction; pending ORM changes are flushed first.
+    """
+    db.flush()
+    rollup, schedule = models.WorkloadDaily, models.Schedule
+    rollup_scope, schedule_scope = [], []
+    if start_date is not None:
+        rollup_scope.append(rollup.date >= start_date)
+        schedule_scope.append(schedule.date >= start_date)
+    if end_date is not None:
+        rollup_scope.append(rollup.date <= end_date)
+        schedule_scope.append(schedule.date <= end_date)
+    if doctor_ids is not None:
+        if isinstance(doctor_ids, (set, frozenset)):
+            doctor_ids = list(doctor_ids)
+        rollup_scope.append(rollup.doctor_id.in_(doctor_ids))
+        schedule_scope.append(schedule.doctor_id.in_(doctor_ids))
+    db.execute(delete(rollup).where(*rollup_scope), execution_options={"synchronize_session": False})
+    db.execute(insert(rollup).from_select(ROLLUP_COLUMNS, _rollup_select(db, schedule_scope)))
+
+def rebuild_workload(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Backfill: re-aggregate every doctor over the range (everything by default) and commit."""
+    refresh_workload(db, start_date, end_date)
+    db.commit()
+
+def backfill_workload(db: Session) -> bool:
+    """Rebuild the rollup if it is empty but schedules is not; True if it did."""
+    if db.query(models.WorkloadDaily.doctor_id).first() is not None or db.query(models.Schedule.id).first() is None:
+        return False
+    try:
+        rebuild_workload(db)
+    except IntegrityError:
+        db.rollback()  # another worker filled it concurrently
+        return False
+    return True
@@ -1,15 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-from .database import engine, Base, get_db
+from .database import engine, Base, get_db, SessionLocal
 from . import models
-from .api import auth, users, departments, schedules, trades, shift_types, rooms, preferences, stats, notifications, feedback, tags, audit
+from .core.workload import backfill_workload
+from .core.jobs import reap_stale_jobs
+from .api import auth, users, departments, schedules, trades, shift_types, rooms, preferences, stats, notifications, feedback, tags, audit, jobs, coverage, rules, holidays
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Doctor Scheduling System API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker: workload_daily is empty when create_all added it to an existing database,
+    # and jobs whose worker died stay queued / running until reaped
+    db = SessionLocal()
+    try:
+        backfill_workload(db)
+        reap_stale_jobs(db)
+    finally:
+        db.close()
+    yield
+
+app = FastAPI(title="Doctor Scheduling System API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -24,8 +39,12 @@ app.include_router(auth.router, tags=["auth"])
 app.include_router(users.router, tags=["users"])
 app.include_router(departments.router, tags=["departments"])
 app.include_router(schedules.router, tags=["schedules"])
+app.include_router(jobs.router, tags=["schedules"])
 app.include_router(trades.router, tags=["trades"])
 app.include_router(shift_types.router, tags=["shift-types"])
+app.include_router(coverage.router, tags=["shift-types"])
+app.include_router(rules.router, tags=["departments"])
+app.include_router(holidays.router, tags=["holidays"])
 app.include_router(rooms.router, tags=["rooms"])
 app.include_router(preferences.router, tags=["preferences"])
 app.include_router(stats.router, tags=["stats"])
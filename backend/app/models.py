@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Date, Enum as SAEnum, Table
+from sqlalchemy import Column, Integer, Float, String, Boolean, ForeignKey, DateTime, Date, Enum as SAEnum, Table, JSON, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 import enum
@@ -29,9 +29,11 @@ class User(Base):
     hashed_password = Column(String)
     full_name = Column(String)
     role = Column(SAEnum(RoleEnum), default=RoleEnum.DOCTOR)
-    department_id = Column(Integer, ForeignKey("departments.id"))
+    department_id = Column(Integer, ForeignKey("departments.id"), index=True)
     title = Column(String) 
     phone = Column(String)
+    # Bumped on every update; renames change the calendar ETag
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     department = relationship("Department", back_populates="users")
     schedules = relationship("Schedule", back_populates="doctor")
@@ -58,6 +60,8 @@ class Room(Base):
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
     capacity = Column(Integer, default=1)
     description = Column(String, nullable=True)
+    # Bumped on every update; renames change the calendar ETag
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     department = relationship("Department", back_populates="rooms")
     schedules = relationship("Schedule", back_populates="room")
@@ -74,6 +78,43 @@ class ShiftType(Base):
     shift_category = Column(String, default="day")  # day/night/oncall/backup/holiday
     description = Column(String, nullable=True)
 
+class CoverageRequirement(Base):
+    """
+    Headcount demand per shift type. The most specific matching rule wins for a given day:
+    date > weekday > every day, and a department rule beats a global one (department_id null).
+    Rules with a qualification add "at least min_count (at most max_count) of the assigned
+    doctors hold this tag/title" on top of the plain headcount.
+    """
+    __tablename__ = "coverage_requirements"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    shift_type_id = Column(Integer, ForeignKey("shift_types.id"))
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
+    weekday = Column(Integer, nullable=True)  # 0=Mon .. 6=Sun
+    date = Column(Date, nullable=True)
+    min_count = Column(Integer, default=1)
+    max_count = Column(Integer, nullable=True)  # null: exactly min_count
+    qualification = Column(String, nullable=True)
+    description = Column(String, nullable=True)
+    
+    shift_type = relationship("ShiftType")
+
+class DepartmentRule(Base):
+    """
+    Scheduling rule (see core/rules.py) enabled for a department with its parameters.
+    Rows without a department apply hospital-wide; a department row for the same rule
+    replaces the global one, and a disabled department row switches it off there.
+    """
+    __tablename__ = "department_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    department_id = Column(Integer, ForeignKey("departments.id"), nullable=True, index=True)
+    rule = Column(String, index=True)  # registered rule name, e.g. consecutive_duty_limit
+    params = Column(JSON, default=dict)
+    enabled = Column(Boolean, default=True)
+    description = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class Schedule(Base):
     __tablename__ = "schedules"
     
@@ -83,10 +124,70 @@ class Schedule(Base):
     room_id = Column(Integer, ForeignKey("rooms.id"), nullable=True)
     date = Column(Date, index=True)
     status = Column(String, default="draft")
+    # Bumped on every insert / update (incl. bulk ones); drives the calendar ETag
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     doctor = relationship("User", back_populates="schedules")
     shift_type = relationship("ShiftType")
     room = relationship("Room", back_populates="schedules")
+    
+    __table_args__ = (
+        # One row per doctor per shift per day; backs ON CONFLICT DO NOTHING in bulk saves
+        Index("uq_schedules_date_shift_doctor", "date", "shift_type_id", "doctor_id", unique=True),
+        # Hot filters (see migrations/versions/0002_hot_query_indexes.py)
+        Index("ix_schedules_doctor_date", "doctor_id", "date"),
+        Index("ix_schedules_status_date", "status", "date"),
+    )
+
+class DutyRate(Base):
+    """
+    Duty-fee rates for one shift category (see core/settlement.py): each shift pays
+    base_fee * shift weight + hourly_rate * shift hours, times the multiplier of its day.
+    """
+    __tablename__ = "duty_rates"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    shift_category = Column(String, unique=True, index=True)  # day/night/oncall/backup/holiday
+    base_fee = Column(Float, default=0.0)
+    hourly_rate = Column(Float, default=0.0)
+    weekend_multiplier = Column(Float, default=2.0)
+    holiday_multiplier = Column(Float, default=3.0)
+    description = Column(String, nullable=True)
+
+class Holiday(Base):
+    """
+    Calendar day overriding the Saturday / Sunday default (see core/holidays.py): a public
+    holiday (kind "holiday") or a make-up workday on a weekend (kind "workday", 调休上班).
+    """
+    __tablename__ = "holidays"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, unique=True, index=True)
+    name = Column(String)
+    kind = Column(String, default="holiday")  # holiday/workday
+    description = Column(String, nullable=True)
+
+class WorkloadDaily(Base):
+    """
+    Per-doctor, per-day rollup of schedules (see core/workload.py), kept in step with every
+    write to schedules so workload reports never re-scan the raw rows.
+    """
+    __tablename__ = "workload_daily"
+    
+    doctor_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    total_shifts = Column(Integer, default=0)
+    day_shifts = Column(Integer, default=0)
+    night_shifts = Column(Integer, default=0)
+    oncall_shifts = Column(Integer, default=0)
+    backup_shifts = Column(Integer, default=0)
+    published_shifts = Column(Integer, default=0)
+    weighted_score = Column(Integer, default=0)  # sum of shift type weights
+    hours = Column(Float, default=0.0)
+    
+    __table_args__ = (
+        Index("ix_workload_daily_date", "date"),
+    )
 
 class TradeStatus(str, enum.Enum):
     PENDING = "pending"
@@ -156,6 +257,10 @@ class Notification(Base):
     
     user = relationship("User", back_populates="notifications")
 
+    __table_args__ = (
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    )
+
 # Add relationships to User model
 User.notifications = relationship("Notification", back_populates="user")
 
@@ -198,3 +303,26 @@ class AuditLog(Base):
     
     user = relationship("User")
 
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    
+    id = Column(String, primary_key=True, index=True)  # uuid hex
+    status = Column(String, default=JobStatus.QUEUED)
+    params = Column(JSON)  # start_date / days / department_id / solver params
+    progress = Column(JSON, default=list)  # [{"wall_time": .., "objective": ..}]
+    result = Column(JSON, nullable=True)  # solver stats + saved schedule ids
+    error = Column(String, nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # refreshed by the owning worker while queued / running
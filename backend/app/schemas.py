@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -89,6 +89,55 @@ class RoomResponse(RoomBase):
 
 from datetime import date as date_type
 
+class HolidayBase(BaseModel):
+    date: date_type
+    name: str
+    kind: str = Field("holiday", pattern="^(holiday|workday)$")  # workday: 调休上班
+    description: Optional[str] = None
+
+class HolidayCreate(HolidayBase):
+    pass
+
+class HolidayUpdate(BaseModel):
+    date: Optional[date_type] = None
+    name: Optional[str] = None
+    kind: Optional[str] = Field(None, pattern="^(holiday|workday)$")
+    description: Optional[str] = None
+
+class HolidaySchema(HolidayBase):
+    id: int
+    model_config = ConfigDict(from_attributes=True)
+
+class HolidayImportResult(BaseModel):
+    created: int
+    updated: int
+    holidays: int
+    workdays: int
+
+class DutyRateBase(BaseModel):
+    base_fee: float = Field(0.0, ge=0)  # per shift, times the shift weight
+    hourly_rate: float = Field(0.0, ge=0)
+    weekend_multiplier: float = Field(2.0, ge=0)
+    holiday_multiplier: float = Field(3.0, ge=0)
+    description: Optional[str] = None
+
+class DutyRateSchema(DutyRateBase):
+    id: Optional[int] = None  # None: built-in default, not stored yet
+    shift_category: str
+    model_config = ConfigDict(from_attributes=True)
+
+class SettlementRow(BaseModel):
+    doctor_id: int
+    doctor_name: Optional[str] = None
+    department_id: Optional[int] = None
+    total_shifts: int
+    night_shifts: int
+    weekend_shifts: int
+    holiday_shifts: int
+    hours: float
+    weighted_score: int
+    amount: float
+
 class ShiftTypeBase(BaseModel):
     name: str
     start_time: str
@@ -115,6 +164,32 @@ class ShiftTypeSchema(ShiftTypeBase):
 
     model_config = {"from_attributes": True}
 
+class CoverageRequirementBase(BaseModel):
+    shift_type_id: int
+    department_id: Optional[int] = None
+    weekday: Optional[int] = Field(None, ge=0, le=6)  # 0=Mon .. 6=Sun
+    date: Optional[date_type] = None
+    min_count: int = Field(1, ge=0)
+    max_count: Optional[int] = Field(None, ge=0)
+    qualification: Optional[str] = None
+    description: Optional[str] = None
+
+class CoverageRequirementCreate(CoverageRequirementBase):
+    pass
+
+class CoverageRequirementUpdate(BaseModel):
+    weekday: Optional[int] = Field(None, ge=0, le=6)
+    date: Optional[date_type] = None
+    min_count: Optional[int] = Field(None, ge=0)
+    max_count: Optional[int] = Field(None, ge=0)
+    qualification: Optional[str] = None
+    description: Optional[str] = None
+
+class CoverageRequirementSchema(CoverageRequirementBase):
+    id: int
+    
+    model_config = ConfigDict(from_attributes=True)
+
 class ScheduleSchema(BaseModel):
     id: int
     date: date_type
@@ -125,6 +200,203 @@ class ScheduleSchema(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class CalendarShift(BaseModel):
+    id: int
+    name: str
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    shift_category: Optional[str] = None
+
+class CalendarEntry(BaseModel):
+    schedule_id: int
+    doctor_id: int
+    doctor_name: Optional[str] = None
+    room_id: Optional[int] = None
+    room_name: Optional[str] = None
+    status: str
+
+class CalendarDay(BaseModel):
+    date: date_type
+    cells: List[List[CalendarEntry]]  # aligned with CalendarResponse.shift_types
+
+class CalendarResponse(BaseModel):
+    start_date: date_type
+    end_date: date_type
+    shift_types: List[CalendarShift]
+    days: List[CalendarDay]
+
+class DepartmentGenerateStatus(BaseModel):
+    department_id: Optional[int] = None
+    department_name: Optional[str] = None
+    doctors: int
+    status: str
+    objective: Optional[float] = None
+    wall_time: float = 0.0
+    assignments: int = 0
+    error: Optional[str] = None
+    cache_hit: bool = False
+
+class RuleCost(BaseModel):
+    rule: str  # built-in block (coverage, night_rest, ...) or department rule name
+    build_ms: float
+    variables: int
+    constraints: int
+
+class WindowGenerateStatus(BaseModel):
+    start_date: date_type
+    days: int
+    committed: int
+    status: str
+    objective: Optional[float] = None
+    wall_time: float = 0.0
+
+class DepartmentRuleBase(BaseModel):
+    department_id: Optional[int] = None  # null: hospital-wide
+    rule: str
+    params: Dict[str, Any] = {}
+    enabled: bool = True
+    description: Optional[str] = None
+
+class DepartmentRuleCreate(DepartmentRuleBase):
+    pass
+
+class DepartmentRuleUpdate(BaseModel):
+    params: Optional[Dict[str, Any]] = None
+    enabled: Optional[bool] = None
+    description: Optional[str] = None
+
+class DepartmentRuleSchema(DepartmentRuleBase):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class RuleInfo(BaseModel):
+    name: str
+    description: str
+
+class GenerateResponse(BaseModel):
+    schedules: List[ScheduleSchema] = []
+    status: str  # CP-SAT status name: OPTIMAL / FEASIBLE (PARTIAL when some departments failed)
+    objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    gap: Optional[float] = None
+    wall_time: float = 0.0
+    persist_ms: Optional[float] = None  # time spent saving the roster
+    cache_hit: Optional[bool] = None  # answered from the generation result cache
+    departments: List[DepartmentGenerateStatus] = []  # split_by_department only
+    windows: List[WindowGenerateStatus] = []  # rolling horizon only
+    rules: List[RuleCost] = []  # model build cost per constraint block / rule
+
+class GenerationCacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+class UserCacheStats(BaseModel):
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    claim_hits: int  # requests served from token claims without any lookup
+    hit_rate: float
+
+class GenerateJobCreate(BaseModel):
+    start_date: date_type
+    days: int = Field(30, ge=1, le=366)
+    department_id: Optional[int] = None
+    time_limit: Optional[float] = Field(None, gt=0, le=3600)
+    num_workers: Optional[int] = Field(None, ge=1, le=64)
+    relative_gap: Optional[float] = Field(None, ge=0, le=1)
+    random_seed: Optional[int] = None
+    warm_start: bool = True
+    keep_published: bool = True
+    window_days: Optional[int] = Field(None, ge=7, le=120)  # rolling horizon (see /schedules/generate)
+    commit_days: Optional[int] = Field(None, ge=1, le=120)
+    engine: str = Field("cpsat", pattern="^(cpsat|heuristic)$")  # see /schedules/generate
+
+class GenerateJobProgress(BaseModel):
+    wall_time: float
+    objective: float
+
+class GenerateJobResponse(BaseModel):
+    id: str
+    status: str
+    params: dict
+    progress: List[GenerateJobProgress] = []
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class RepairRequest(BaseModel):
+    doctor_id: int
+    start_date: date_type
+    end_date: date_type
+    neighbourhood_days: int = Field(2, ge=0, le=14)
+    # Scope the roster was generated with; inferred from the rostered doctors when neither is set
+    department_id: Optional[int] = None
+    hospital_wide: bool = False
+    time_limit: Optional[float] = Field(None, gt=0, le=60)
+    apply: bool = True  # False: only return the proposed diff
+    force: bool = False  # apply even if the diff creates roster conflicts (409 otherwise)
+
+class RepairAssignment(BaseModel):
+    id: Optional[int] = None
+    date: date_type
+    doctor_id: int
+    shift_type_id: int
+    status: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+class RepairResponse(BaseModel):
+    status: str
+    wall_time: float = 0.0
+    applied: bool
+    removed: List[RepairAssignment] = []
+    added: List[RepairAssignment] = []
+
+class FeasibilityIssue(BaseModel):
+    kind: str  # shift_understaffed / day_understaffed / night_rest / qualification / fixed_over_max
+    date: Optional[date_type] = None
+    shift_type_id: Optional[int] = None
+    shift: Optional[str] = None
+    message: str
+    required: Optional[int] = None
+    available: Optional[int] = None
+    qualification: Optional[str] = None
+
+class RosterConflict(BaseModel):
+    kind: str  # double_booking / night_rest / qualification or a department rule name
+    doctor_id: Optional[int] = None  # None for crew-level conflicts (qualification_pairing)
+    date: date_type
+    shift_type_id: Optional[int] = None
+    schedule_ids: List[int] = []
+    message: str
+
+class UnsatCoreRule(BaseModel):
+    rule: str  # coverage / qualification / fixed / night_rest / previous_night / next_shift
+    date: Optional[date_type] = None
+    shift_type_id: Optional[int] = None
+    shift: Optional[str] = None
+    doctor_id: Optional[int] = None
+    qualification: Optional[str] = None
+
+class FeasibilityReport(BaseModel):
+    feasible: Optional[bool] = None  # False: proven infeasible, None: no contradiction found
+    issues: List[FeasibilityIssue] = []
+    core: Optional[List[UnsatCoreRule]] = None
+    analysis_ms: float = 0.0
+
 class TradeCreate(BaseModel):
     request_shift_id: int
     target_doctor_id: int
@@ -0,0 +1,85 @@
+"""
+Benchmark SchedulingEngine.build_model: build time and model size.
+
+Compares the dense builder against the previous per-pair implication builder
+(reproduced below as legacy_build) for 60 / 300 / 1000 doctors over 30 / 60 / 90 days.
+legacy_build has no objective, so the timed dense build runs with the fairness terms
+switched off; a second, default build reports what the fairness counters and their
+max - min objective add on top (fair_ms, from the engine's rule_stats).
+
+Usage (from backend/):
+    python -m benchmarks.build_model
+    python -m benchmarks.build_model --doctors 60 300 --days 30
+"""
+import argparse
+import time
+from datetime import date
+from types import SimpleNamespace
+from ortools.sat.python import cp_model
+from app.core.scheduler import SchedulingEngine
+
+SHIFT_TYPES = [
+    SimpleNamespace(id=1, name="Day Shift", start_time="08:00", end_time="17:00"),
+    SimpleNamespace(id=2, name="Night Shift", start_time="17:00", end_time="08:00", shift_category="night"),
+    SimpleNamespace(id=3, name="On-call", start_time="08:00", end_time="08:00"),
+]
+
+def legacy_build(doctors, shift_types, num_days):
+    """The original dict-keyed builder with one OnlyEnforceIf per (night, next shift)."""
+    model = cp_model.CpModel()
+    shifts = {}
+    for d in range(num_days):
+        for shift in shift_types:
+            for doctor in doctors:
+                shifts[(doctor.id, d, shift.id)] = model.NewBoolVar(f'shift_doc{doctor.id}_day{d}_sh{shift.id}')
+    for d in range(num_days):
+        for shift in shift_types:
+            model.AddExactlyOne(shifts[(doc.id, d, shift.id)] for doc in doctors)
+    for doc in doctors:
+        for d in range(num_days):
+            model.AddAtMostOne(shifts[(doc.id, d, shift.id)] for shift in shift_types)
+    night_shifts = [s for s in shift_types if "Night" in s.name or "夜" in s.name]
+    for doc in doctors:
+        for d in range(num_days - 1):
+            for night in night_shifts:
+                worked_night = shifts[(doc.id, d, night.id)]
+                for next_shift in shift_types:
+                    model.Add(shifts[(doc.id, d + 1, next_shift.id)] == 0).OnlyEnforceIf(worked_night)
+    return model
+
+def run(doctor_counts, day_counts):
+    rows = []
+    for n in doctor_counts:
+        doctors = [SimpleNamespace(id=i + 1) for i in range(n)]
+        for days in day_counts:
+            t0 = time.perf_counter()
+            legacy = legacy_build(doctors, SHIFT_TYPES, days)
+            legacy_ms = (time.perf_counter() - t0) * 1000
+            legacy_constraints = len(legacy.Proto().constraints)
+            del legacy
+
+            t0 = time.perf_counter()
+            engine = SchedulingEngine(doctors, SHIFT_TYPES, date(2026, 1, 1), days)
+            engine.fairness_weights = {}  # like for like: constraints only
+            engine.build_model()
+            dense_ms = (time.perf_counter() - t0) * 1000
+            size = engine.model_size()
+            del engine
+
+            engine = SchedulingEngine(doctors, SHIFT_TYPES, date(2026, 1, 1), days)
+            engine.build_model()
+            fairness_ms = sum(s["build_ms"] for s in engine.rule_stats if s["rule"] == "fairness")
+            del engine
+
+            rows.append((n, days, size["variables"], legacy_constraints, size["constraints"], legacy_ms, dense_ms, fairness_ms))
+            print(f"{n:>6} {days:>5} {size['variables']:>9} {legacy_constraints:>12} {size['constraints']:>11} "
+                  f"{legacy_ms:>10.0f} {dense_ms:>9.0f} {legacy_ms / dense_ms:>7.1f}x {fairness_ms:>8.0f}", flush=True)
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, nargs="+", default=[60, 300, 1000])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 60, 90])
+    args = parser.parse_args()
+    print(f"{'docs':>6} {'days':>5} {'vars':>9} {'legacy_cons':>12} {'dense_cons':>11} {'legacy_ms':>10} {'dense_ms':>9} {'speedup':>8} {'fair_ms':>8}")
+    run(args.doctors, args.days)
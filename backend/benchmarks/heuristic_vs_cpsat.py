@@ -0,0 +1,79 @@
+"""
+Benchmark the heuristic fast path against CP-SAT: runtime and objective on the same roster.
+
+A synthetic department (a third of the doctors tagged "senior", day / evening / night
+shifts, each needing `--per-shift` doctors and one senior on nights, a few desire and
+avoid preferences) is generated with both engines. Objectives use the same formula, so
+the quality gap is objective(heuristic) - objective(cpsat).
+
+Usage (from backend/):
+    python -m benchmarks.heuristic_vs_cpsat
+    python -m benchmarks.heuristic_vs_cpsat --doctors 60 120 --days 31 --time-limit 30
+"""
+import argparse
+import random
+import time
+from datetime import date
+from types import SimpleNamespace
+from app.core.generation import configure_engine
+
+SHIFT_TYPES = [
+    SimpleNamespace(id=1, name="Day", start_time="08:00", end_time="16:00", weight=1, required_qualification=None, shift_category="day"),
+    SimpleNamespace(id=2, name="Evening", start_time="16:00", end_time="24:00", weight=1, required_qualification=None, shift_category="day"),
+    SimpleNamespace(id=3, name="Night", start_time="00:00", end_time="08:00", weight=2, required_qualification=None, shift_category="night"),
+]
+
+def make_payload(n, days, per_shift, seed=0):
+    rng = random.Random(seed)
+    doctors = [
+        SimpleNamespace(id=i + 1, full_name=f"Doctor {i + 1}", qualifications=frozenset({"senior"} if i % 3 == 0 else ()))
+        for i in range(n)
+    ]
+    coverage = [
+        SimpleNamespace(shift_type_id=s.id, department_id=None, weekday=None, date=None, min_count=per_shift, max_count=None, qualification=None)
+        for s in SHIFT_TYPES
+    ]
+    coverage.append(SimpleNamespace(shift_type_id=3, department_id=None, weekday=None, date=None, min_count=1, max_count=None, qualification="senior"))
+    preferences = [
+        (rng.randint(1, n), rng.randrange(days), rng.choice(("desire", "avoid")), rng.choice((None, 1, 2, 3)))
+        for _ in range(n // 2)
+    ]
+    return {
+        "doctors": doctors,
+        "shift_types": SHIFT_TYPES,
+        "coverage": coverage,
+        "preferences": preferences,
+        "rules": [{"rule": "max_nights_per_week", "params": {"max_nights": 2}}],
+        "start_date": date(2026, 3, 1),
+        "days": days,
+    }
+
+def solve(payload, engine, time_limit, num_workers):
+    t0 = time.perf_counter()
+    solver = configure_engine({**payload, "engine": engine})
+    solver.build_model()
+    results = solver.solve(time_limit=time_limit, num_workers=num_workers, random_seed=0)
+    return (time.perf_counter() - t0) * 1000, solver.stats["status"], solver.stats["objective"], results is not None
+
+def run(doctor_counts, days, per_shift, time_limit, num_workers):
+    rows = []
+    for n in doctor_counts:
+        payload = make_payload(n, days, per_shift)
+        heuristic = solve(payload, "heuristic", time_limit, num_workers)
+        cpsat = solve(payload, "cpsat", time_limit, num_workers)
+        gap = heuristic[2] - cpsat[2] if heuristic[3] and cpsat[3] else None
+        rows.append((n, days, heuristic, cpsat, gap))
+        print(f"{n:>6} {days:>5} {heuristic[0]:>9.0f} {heuristic[1]:>9} {str(heuristic[2]):>9} "
+              f"{cpsat[0]:>9.0f} {cpsat[1]:>9} {str(cpsat[2]):>9} {str(gap):>6}", flush=True)
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--doctors", type=int, nargs="+", default=[60])
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--per-shift", type=int, default=4)
+    parser.add_argument("--time-limit", type=float, default=30.0, help="CP-SAT budget in seconds")
+    parser.add_argument("--num-workers", type=int, default=8)
+    args = parser.parse_args()
+    print(f"{'docs':>6} {'days':>5} {'heur_ms':>9} {'heur':>9} {'heur_obj':>9} {'cp_ms':>9} {'cpsat':>9} {'cp_obj':>9} {'gap':>6}")
+    run(args.doctors, args.days, args.per_shift, args.time_limit, args.num_workers)
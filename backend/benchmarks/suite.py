@@ -0,0 +1,176 @@
+"""
+Scheduler benchmark suite over seeded synthetic hospitals (see benchmarks/synthetic.py).
+
+For each scale every department payload is built and solved with the chosen engine;
+per scale the report records build / solve time, variable and constraint counts,
+objective, status and the peak RSS of the process that ran it. Each scale runs in a
+fresh worker process so the memory peak belongs to that scale alone.
+
+`compare` matches two reports by scale and flags regressions: slower build / solve or
+higher memory beyond --tolerance (and an absolute floor, to ignore timer noise), any
+growth in model size, a worse objective or a weaker status.
+
+Usage (from backend/):
+    python -m benchmarks.suite run --scales small medium --output bench/base
+    python -m benchmarks.suite run --time-limit 5 --engine heuristic --output bench/new
+    python -m benchmarks.suite compare bench/base.json bench/new.json --tolerance 0.2
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, Any, List, Optional
+from app.core.generation import configure_engine
+from benchmarks.synthetic import SCALES, make_scale
+
+FIELDS = ("scale", "departments", "doctors", "days", "status", "objective", "build_ms", "solve_ms", "variables", "constraints", "peak_rss_mb")
+STATUS_RANK = {"OPTIMAL": 3, "FEASIBLE": 2, "UNKNOWN": 1, "INFEASIBLE": 0, "MODEL_INVALID": 0}
+# metric -> absolute change below which a relative regression is treated as noise
+NOISE_FLOOR = {"build_ms": 20.0, "solve_ms": 100.0, "peak_rss_mb": 10.0}
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+def run_scale(scale: str, seed: int, engine: str, time_limit: float, num_workers: int) -> Dict[str, Any]:
+    """Build and solve every department of one synthetic hospital (runs in a worker process)."""
+    units = make_scale(scale, seed)
+    row = {
+        "scale": scale,
+        "departments": len(units),
+        "doctors": sum(len(u["doctors"]) for u in units),
+        "days": units[0]["days"],
+        "status": "OPTIMAL",
+        "objective": 0.0,
+        "build_ms": 0.0,
+        "solve_ms": 0.0,
+        "variables": 0,
+        "constraints": 0,
+    }
+    units_report = []
+    for unit in units:
+        solver = configure_engine({**unit, "engine": engine})
+        t0 = time.perf_counter()
+        solver.build_model()
+        build_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        results = solver.solve(time_limit=time_limit, num_workers=num_workers, random_seed=seed)
+        solve_ms = (time.perf_counter() - t0) * 1000
+        size = solver.model_size()
+        status = solver.stats["status"]
+        units_report.append({"department_id": unit["department_id"], "status": status, "objective": solver.stats["objective"],
+                             "build_ms": build_ms, "solve_ms": solve_ms, **size})
+
+        row["build_ms"] += build_ms
+        row["solve_ms"] += solve_ms
+        row["variables"] += size["variables"]
+        row["constraints"] += size["constraints"]
+        if STATUS_RANK.get(status, 0) < STATUS_RANK[row["status"]]:
+            row["status"] = status
+        if results is None or row["objective"] is None:
+            row["objective"] = None
+        else:
+            row["objective"] += solver.stats["objective"] or 0.0
+    row["peak_rss_mb"] = _peak_rss_mb()
+    row["units"] = units_report
+    return row
+
+def run(scales: List[str], seed: int = 0, engine: str = "cpsat", time_limit: float = 10.0, num_workers: int = 8) -> Dict[str, Any]:
+    rows = []
+    for scale in scales:
+        # A fresh process per scale: ru_maxrss only ever grows within a process
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            row = pool.submit(run_scale, scale, seed, engine, time_limit, num_workers).result()
+        rows.append(row)
+        print("  ".join(f"{row[f]:.1f}" if isinstance(row[f], float) else str(row[f]) for f in FIELDS), flush=True)
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "engine": engine,
+        "seed": seed,
+        "time_limit": time_limit,
+        "num_workers": num_workers,
+        "results": rows,
+    }
+
+def write_report(report: Dict[str, Any], output: str):
+    """Writes <output>.json (full report) and <output>.csv (one row per scale)."""
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(output + ".csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(report["results"])
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Regressions of `current` against `baseline`, as {"scale", "metric", "baseline", "current"}."""
+    regressions = []
+    base_rows = {row["scale"]: row for row in baseline["results"]}
+
+    def flag(scale, metric, old, new):
+        regressions.append({"scale": scale, "metric": metric, "baseline": old, "current": new})
+
+    for row in current["results"]:
+        old = base_rows.get(row["scale"])
+        if old is None:
+            continue
+        scale = row["scale"]
+        for metric, floor in NOISE_FLOOR.items():
+            if row[metric] > old[metric] * (1 + tolerance) and row[metric] - old[metric] > floor:
+                flag(scale, metric, old[metric], row[metric])
+        for metric in ("variables", "constraints"):
+            if row[metric] > old[metric]:
+                flag(scale, metric, old[metric], row[metric])
+        if STATUS_RANK.get(row["status"], 0) < STATUS_RANK.get(old["status"], 0):
+            flag(scale, "status", old["status"], row["status"])
+        if old["objective"] is not None and (row["objective"] is None or row["objective"] > old["objective"] + max(1.0, abs(old["objective"]) * tolerance)):
+            flag(scale, "objective", old["objective"], row["objective"])
+    return regressions
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite and write <output>.json / <output>.csv")
+    run_parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--engine", choices=("cpsat", "heuristic"), default="cpsat")
+    run_parser.add_argument("--time-limit", type=float, default=10.0, help="solve budget per department in seconds")
+    run_parser.add_argument("--num-workers", type=int, default=8)
+    run_parser.add_argument("--output", default="benchmark_report")
+    compare_parser = commands.add_parser("compare", help="flag regressions of CURRENT against BASELINE")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown / memory growth")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        print("  ".join(FIELDS))
+        report = run(args.scales, args.seed, args.engine, args.time_limit, args.num_workers)
+        write_report(report, args.output)
+        print(f"Report written to {args.output}.json / {args.output}.csv")
+        return 0
+
+    regressions = compare(_load(args.baseline), _load(args.current), args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['scale']} {r['metric']}: {r['baseline']} -> {r['current']}")
+    if not regressions:
+        print("No regressions")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
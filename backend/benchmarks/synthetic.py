@@ -0,0 +1,100 @@
+"""
+Seeded synthetic hospitals for engine benchmarks.
+
+make_hospital() returns one generation payload per department, shaped exactly like
+core.decomposition.load_department_payloads() output (SimpleNamespace snapshots,
+preference / absence tuples, carry-over balances, department rules), so the payloads
+can go straight into configure_engine() / run_generation(). The same seed always
+yields the same hospital.
+"""
+import random
+from datetime import date
+from types import SimpleNamespace
+from typing import Dict, Any, List
+
+# name -> departments, doctors per department, horizon in days
+SCALES = {
+    "small": {"departments": 2, "doctors": 10, "days": 14},
+    "medium": {"departments": 4, "doctors": 15, "days": 31},
+    "large": {"departments": 10, "doctors": 30, "days": 31},
+}
+
+DEPARTMENT_NAMES = ["内科", "外科", "儿科", "急诊科", "妇产科", "骨科", "心内科", "神经内科", "呼吸科", "消化科", "肿瘤科", "ICU"]
+SURNAMES = ["王", "李", "张", "刘", "陈", "杨", "赵", "黄", "周", "吴", "徐", "孙"]
+GIVEN_NAMES = ["伟", "芳", "娜", "敏", "静", "强", "磊", "军", "洋", "杰", "涛", "明"]
+TITLES = ["住院医师", "主治医师", "副主任医师", "主任医师"]
+TAGS = ["急诊", "ICU", "超声", "内镜", "介入"]
+SENIOR_TAG = "二线"  # on every night shift (coverage qualification rule)
+
+SHIFT_TYPES = [
+    SimpleNamespace(id=1, name="白班", start_time="08:00", end_time="16:00", weight=1, required_qualification=None, shift_category="day"),
+    SimpleNamespace(id=2, name="小夜", start_time="16:00", end_time="24:00", weight=1, required_qualification=None, shift_category="evening"),
+    SimpleNamespace(id=3, name="大夜", start_time="00:00", end_time="08:00", weight=2, required_qualification=None, shift_category="night"),
+]
+
+def _coverage(shift_type_id, department_id, min_count, weekday=None, qualification=None):
+    return SimpleNamespace(
+        shift_type_id=shift_type_id, department_id=department_id, weekday=weekday, date=None,
+        min_count=min_count, max_count=None, qualification=qualification,
+    )
+
+def make_department(rng: random.Random, department_id: int, first_doctor_id: int, n_doctors: int, start_date: date, days: int) -> Dict[str, Any]:
+    doctors = []
+    for j in range(n_doctors):
+        title = rng.choices(TITLES, weights=(4, 3, 2, 1))[0]
+        tags = set(rng.sample(TAGS, rng.randint(0, 2)))
+        if j < 3 or title != TITLES[0]:
+            tags.add(SENIOR_TAG)  # at least three seniors per department
+        doctors.append(SimpleNamespace(
+            id=first_doctor_id + j,
+            full_name=rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES),
+            department_id=department_id,
+            title=title,
+            qualifications=frozenset(tags | {title}),
+        ))
+
+    # Headcounts scale with the department; weekends run with a reduced day shift
+    day_count = max(1, n_doctors // 6)
+    coverage = [
+        _coverage(1, department_id, day_count),
+        _coverage(2, department_id, max(1, n_doctors // 10)),
+        _coverage(3, department_id, max(1, n_doctors // 10)),
+        _coverage(3, department_id, 1, qualification=SENIOR_TAG),
+    ]
+    coverage += [_coverage(1, department_id, max(1, day_count // 2), weekday=w) for w in (5, 6)]
+
+    preferences, unavailable = [], []
+    for doc in doctors:
+        for _ in range(rng.randint(0, 3)):
+            preferences.append((doc.id, rng.randrange(days), rng.choice(("desire", "avoid")), rng.choice((None, 1, 2, 3))))
+        if rng.random() < 0.15:  # a leave block
+            first = rng.randrange(days)
+            unavailable.extend((doc.id, d) for d in range(first, min(days, first + rng.randint(2, 5))))
+    rules = [{"rule": "consecutive_duty_limit", "params": {"max_days": 6}}]
+    if rng.random() < 0.5:
+        rules.append({"rule": "max_nights_per_week", "params": {"max_nights": 2}})
+
+    return {
+        "doctors": doctors,
+        "shift_types": SHIFT_TYPES,
+        "coverage": coverage,
+        "rules": rules,
+        "preferences": preferences,
+        "unavailable": unavailable,
+        "balances": {doc.id: (rng.randint(0, 4), rng.randint(0, 2), rng.randint(0, 2)) for doc in doctors if rng.random() < 0.5},
+        "start_date": start_date,
+        "days": days,
+        "department_id": department_id,
+        "department_name": DEPARTMENT_NAMES[(department_id - 1) % len(DEPARTMENT_NAMES)],
+    }
+
+def make_hospital(departments: int, doctors: int, days: int, seed: int = 0, start_date: date = date(2026, 3, 2)) -> List[Dict[str, Any]]:
+    """One payload per department; `doctors` is per department."""
+    rng = random.Random(seed)
+    return [
+        make_department(rng, dept + 1, dept * doctors + 1, doctors, start_date, days)
+        for dept in range(departments)
+    ]
+
+def make_scale(scale: str, seed: int = 0) -> List[Dict[str, Any]]:
+    return make_hospital(seed=seed, **SCALES[scale])
@@ -0,0 +1,105 @@
+"""
+/stats/workload: the rollup-backed GROUP BY implementation against the previous Python loop.
+
+Seeds a temporary SQLite database (or --url, which is dropped and recreated) with the
+query_plans data set plus a holiday calendar, builds the workload_daily rollup (timed: the one-off backfill
+cost), then times both implementations over a hospital-year and over one department,
+checking that they return the same counts.
+
+Usage (from backend/):
+    python -m benchmarks.workload_stats
+    python -m benchmarks.workload_stats --rows 300000 --repeat 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from typing import Optional
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import Base
+from app import models
+from app.api.stats import workload_stats
+from app.core.scheduler import is_night_shift
+from app.core.workload import rebuild_workload
+from app.core.holidays import calendar_cache, import_holidays, HOLIDAY, WORKDAY
+from benchmarks.query_plans import seed
+
+def legacy_workload_stats(db: Session, start_date: date, end_date: date, department_id: Optional[int] = None):
+    """The ORM-triple loop /stats/workload used before the GROUP BY query (with calendar lookups)."""
+    calendar = calendar_cache.get(db)
+    query = db.query(models.Schedule, models.User, models.ShiftType)\
+        .join(models.User, models.Schedule.doctor_id == models.User.id)\
+        .join(models.ShiftType, models.Schedule.shift_type_id == models.ShiftType.id)\
+        .filter(models.Schedule.date >= start_date, models.Schedule.date <= end_date)
+    if department_id:
+        query = query.filter(models.User.department_id == department_id)
+    results = query.all()
+    user_query = db.query(models.User)
+    if department_id:
+        user_query = user_query.filter(models.User.department_id == department_id)
+    stats_map = {
+        user.id: {"doctor_id": user.id, "doctor_name": user.full_name, "department_id": user.department_id,
+                  "total_shifts": 0, "night_shifts": 0, "weekend_shifts": 0, "holiday_shifts": 0}
+        for user in user_query.all()
+    }
+    for schedule, user, shift_type in results:
+        entry = stats_map.get(user.id)
+        if entry is None:
+            continue
+        entry["total_shifts"] += 1
+        entry["night_shifts"] += is_night_shift(shift_type)
+        entry["weekend_shifts"] += schedule.date.weekday() >= 5 and calendar.get(schedule.date) != WORKDAY
+        entry["holiday_shifts"] += calendar.get(schedule.date) == HOLIDAY
+    return list(stats_map.values())
+
+def measure(engine, implementation, repeat: int, *args):
+    timings, peak, result = [], 0, None
+    for _ in range(repeat):
+        with Session(bind=engine) as db:
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            result = implementation(db, *args)
+            timings.append((time.perf_counter() - t0) * 1000)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    return result, statistics.median(timings), peak / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="scratch database URL (default: a temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        engine = create_engine(args.url or f"sqlite:///{os.path.join(scratch, 'workload.db')}")
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        seed(engine, args.rows)
+        with Session(bind=engine) as db:
+            # Fixed-date holidays plus one make-up Saturday per year
+            import_holidays(db, [
+                {"date": date(year, month, day), "name": "holiday", "kind": HOLIDAY}
+                for year in (2024, 2025) for month, day in ((1, 1), (5, 1), (5, 2), (5, 3), (10, 1), (10, 2), (10, 3))
+            ] + [{"date": date(2024, 10, 12), "name": "make-up", "kind": WORKDAY}, {"date": date(2025, 9, 28), "name": "make-up", "kind": WORKDAY}])
+            t0 = time.perf_counter()
+            rebuild_workload(db)
+            print(f"Rollup rebuilt in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        scopes = {"hospital-year": (date(2024, 1, 1), date(2024, 12, 31), None),
+                  "department-year": (date(2024, 1, 1), date(2024, 12, 31), 3)}
+        print(f"{'scope':<16} {'legacy_ms':>10} {'sql_ms':>10} {'speedup':>8} {'legacy_mb':>10} {'sql_mb':>8}")
+        for name, scope in scopes.items():
+            legacy, legacy_ms, legacy_mb = measure(engine, legacy_workload_stats, args.repeat, *scope)
+            current, sql_ms, sql_mb = measure(engine, workload_stats, args.repeat, *scope)
+            counts = [{k: v for k, v in row.items() if k not in ("weighted_score", "hours")} for row in current]
+            if sorted(legacy, key=lambda r: r["doctor_id"]) != counts:
+                raise SystemExit(f"{name}: results differ")
+            print(f"{name:<16} {legacy_ms:>10.1f} {sql_ms:>10.1f} {legacy_ms / sql_ms:>7.1f}x {legacy_mb:>10.1f} {sql_mb:>8.1f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -44,3 +44,38 @@ except Exception as e:
     print(f"Error checking/migrating database: {e}")
     import traceback
     traceback.print_exc()
+
+# Unique (date, shift_type_id, doctor_id) index used by bulk schedule saves.
+# Duplicate rows (left by the old per-row save loop) are removed first, keeping the lowest id.
+try:
+    with engine.connect() as connection:
+        connection.execute(text(
+            "DELETE FROM schedules WHERE id NOT IN ("
+            "SELECT MIN(id) FROM schedules GROUP BY date, shift_type_id, doctor_id)"
+        ))
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_schedules_date_shift_doctor "
+            "ON schedules (date, shift_type_id, doctor_id)"
+        ))
+        connection.commit()
+        print("uq_schedules_date_shift_doctor index is in place.")
+except Exception as e:
+    print(f"Error creating unique schedule index: {e}")
+    import traceback
+    traceback.print_exc()
+
+# Uncategorised shift types with a night-looking name are already treated as nights
+# (core.scheduler.is_night_shift); make their category explicit so duty rates and the UI agree.
+try:
+    with engine.connect() as connection:
+        result = connection.execute(text(
+            "UPDATE shift_types SET shift_category = 'night' "
+            "WHERE (shift_category IS NULL OR shift_category = 'day') "
+            "AND (name LIKE '%Night%' OR name LIKE '%night%' OR name LIKE '%夜%')"
+        ))
+        connection.commit()
+        print(f"Marked {result.rowcount} shift types as night shifts.")
+except Exception as e:
+    print(f"Error backfilling shift categories: {e}")
+    import traceback
+    traceback.print_exc()
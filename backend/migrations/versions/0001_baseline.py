@@ -0,0 +1,136 @@
+"""Baseline: the schema app.main created (Base.metadata.create_all) before migrations existed
+
+Creates every table of that schema that is missing, so `alembic upgrade head` works on
+an empty database as well as on one created by an older release (whose tables are
+left as they are; later revisions add what is new).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def _id():
+    return sa.Column("id", sa.Integer(), primary_key=True)
+
+# name -> (columns, indexes as (name, columns, unique)), in foreign key order
+TABLES = {
+    "tags": (lambda: [
+        _id(),
+        sa.Column("name", sa.String()),
+        sa.Column("color", sa.String()),
+    ], [("ix_tags_id", ["id"], False), ("ix_tags_name", ["name"], True)]),
+    "departments": (lambda: [
+        _id(),
+        sa.Column("name", sa.String()),
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("departments.id"), nullable=True),
+    ], [("ix_departments_id", ["id"], False), ("ix_departments_name", ["name"], True)]),
+    "shift_types": (lambda: [
+        _id(),
+        sa.Column("name", sa.String()),
+        sa.Column("start_time", sa.String()),
+        sa.Column("end_time", sa.String()),
+        sa.Column("weight", sa.Integer()),
+        sa.Column("required_qualification", sa.String(), nullable=True),
+        sa.Column("shift_category", sa.String()),
+        sa.Column("description", sa.String(), nullable=True),
+    ], [("ix_shift_types_id", ["id"], False)]),
+    "users": (lambda: [
+        _id(),
+        sa.Column("username", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("full_name", sa.String()),
+        sa.Column("role", sa.Enum("ADMIN", "DOCTOR", "DEPARTMENT_MANAGER", name="roleenum")),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id")),
+        sa.Column("title", sa.String()),
+        sa.Column("phone", sa.String()),
+    ], [("ix_users_id", ["id"], False), ("ix_users_username", ["username"], True)]),
+    "rooms": (lambda: [
+        _id(),
+        sa.Column("name", sa.String()),
+        sa.Column("room_number", sa.String()),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id"), nullable=True),
+        sa.Column("capacity", sa.Integer()),
+        sa.Column("description", sa.String(), nullable=True),
+    ], [("ix_rooms_id", ["id"], False), ("ix_rooms_name", ["name"], False), ("ix_rooms_room_number", ["room_number"], True)]),
+    "user_tags": (lambda: [
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("tag_id", sa.Integer(), sa.ForeignKey("tags.id")),
+    ], []),
+    "schedules": (lambda: [
+        _id(),
+        sa.Column("doctor_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("shift_type_id", sa.Integer(), sa.ForeignKey("shift_types.id")),
+        sa.Column("room_id", sa.Integer(), sa.ForeignKey("rooms.id"), nullable=True),
+        sa.Column("date", sa.Date()),
+        sa.Column("status", sa.String()),
+    ], [("ix_schedules_id", ["id"], False), ("ix_schedules_date", ["date"], False)]),
+    "shift_trades": (lambda: [
+        _id(),
+        sa.Column("requester_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("request_shift_id", sa.Integer(), sa.ForeignKey("schedules.id")),
+        sa.Column("target_doctor_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("status", sa.String()),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    ], [("ix_shift_trades_id", ["id"], False)]),
+    "preferences": (lambda: [
+        _id(),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("date", sa.Date()),
+        sa.Column("type", sa.String()),
+        sa.Column("shift_type_id", sa.Integer(), sa.ForeignKey("shift_types.id"), nullable=True),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    ], [("ix_preferences_id", ["id"], False), ("ix_preferences_date", ["date"], False)]),
+    "notifications": (lambda: [
+        _id(),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("content", sa.String()),
+        sa.Column("is_read", sa.Boolean()),
+        sa.Column("type", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    ], [("ix_notifications_id", ["id"], False)]),
+    "feedbacks": (lambda: [
+        _id(),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("type", sa.String()),
+        sa.Column("urgency", sa.String()),
+        sa.Column("content", sa.String()),
+        sa.Column("page", sa.String(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    ], [("ix_feedbacks_id", ["id"], False)]),
+    "audit_logs": (lambda: [
+        _id(),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("action", sa.String()),
+        sa.Column("resource", sa.String()),
+        sa.Column("resource_id", sa.String(), nullable=True),
+        sa.Column("details", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    ], [("ix_audit_logs_id", ["id"], False)]),
+}
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for name, (columns, indexes) in TABLES.items():
+        if name in existing:
+            continue
+        op.create_table(name, *columns())
+        for index, index_columns, unique in indexes:
+            op.create_index(index, name, index_columns, unique=unique)
+
+def downgrade():
+    for name, (_, indexes) in reversed(list(TABLES.items())):
+        for index, _, _ in indexes:
+            op.drop_index(index, table_name=name, if_exists=True)
+        op.drop_table(name)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS roleenum")
@@ -0,0 +1,49 @@
+"""Composite indexes for the hot schedule, user and notification queries
+
+- schedules (doctor_id, date): per-doctor listings, conflict checks, draft replacement
+- schedules (status, date): publish and the non-admin (published only) listings
+- schedules unique (date, shift_type_id, doctor_id): bulk-save dedup (created if an
+  older database lacks it; duplicate rows are removed first, keeping the lowest id, and
+  shift_trades pointing at a removed row are re-pointed to the kept one)
+- users (department_id): department joins in listings, stats and generation
+- notifications (user_id, is_read, created_at): inbox and unread count
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_schedules_doctor_date", "schedules", ["doctor_id", "date"]),
+    ("ix_schedules_status_date", "schedules", ["status", "date"]),
+    ("ix_users_department_id", "users", ["department_id"]),
+    ("ix_notifications_user_read_created", "notifications", ["user_id", "is_read", "created_at"]),
+]
+
+def upgrade():
+    op.execute(
+        "UPDATE shift_trades SET request_shift_id = ("
+        "SELECT kept.keep_id FROM ("
+        "SELECT id, MIN(id) OVER (PARTITION BY date, shift_type_id, doctor_id) AS keep_id FROM schedules"
+        ") AS kept WHERE kept.id = shift_trades.request_shift_id) "
+        "WHERE request_shift_id IN (SELECT id FROM schedules WHERE id NOT IN ("
+        "SELECT MIN(id) FROM schedules GROUP BY date, shift_type_id, doctor_id))"
+    )
+    op.execute(
+        "DELETE FROM schedules WHERE id NOT IN ("
+        "SELECT MIN(id) FROM schedules GROUP BY date, shift_type_id, doctor_id)"
+    )
+    op.create_index("uq_schedules_date_shift_doctor", "schedules", ["date", "shift_type_id", "doctor_id"], unique=True, if_not_exists=True)
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+    op.drop_index("uq_schedules_date_shift_doctor", table_name="schedules", if_exists=True)
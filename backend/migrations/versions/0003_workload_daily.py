@@ -0,0 +1,88 @@
+"""Per-doctor daily workload rollup table (workload_daily)
+
+Filled from the existing schedules (one INSERT ... SELECT ... GROUP BY doctor_id, date);
+from then on every write to schedules keeps it current (see app/core/workload.py). The
+backfill is a frozen copy of that aggregation, so later changes to the application code
+do not change what this revision does.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("workload_daily"):  # else created by Base.metadata.create_all
+        _create_table()
+    # Backfill, unless the application has been maintaining the table already
+    if op.get_bind().execute(sa.text("SELECT 1 FROM workload_daily LIMIT 1")).first() is None:
+        _backfill()
+
+def _is_night(category, name) -> bool:
+    if category == "night":
+        return True
+    if category not in (None, "day"):
+        return False
+    return "夜" in (name or "") or "night" in (name or "").lower()
+
+def _hours(start_time, end_time) -> float:
+    try:
+        start_h, start_m = map(int, start_time.split(":"))
+        end_h, end_m = map(int, end_time.split(":"))
+    except (AttributeError, ValueError):
+        return 0.0
+    minutes = (end_h * 60 + end_m) - (start_h * 60 + start_m)
+    return (minutes if minutes > 0 else minutes + 24 * 60) / 60
+
+def _per_shift_type(values: dict) -> str:
+    """CASE shift_type_id WHEN <id> THEN <value> ... ELSE 0 END (ids and values are numbers)."""
+    if not values:
+        return "0"
+    whens = " ".join(f"WHEN {int(i)} THEN {value!r}" for i, value in values.items())
+    return f"CASE shift_type_id {whens} ELSE 0 END"
+
+def _backfill():
+    shift_types = op.get_bind().execute(sa.text(
+        "SELECT id, name, start_time, end_time, weight, shift_category FROM shift_types"
+    )).all()
+    night = {s.id for s in shift_types if _is_night(s.shift_category, s.name)}
+    category = {s.id: s.shift_category or "day" for s in shift_types}
+    op.execute(
+        "INSERT INTO workload_daily (doctor_id, date, total_shifts, day_shifts, night_shifts, oncall_shifts, "
+        "backup_shifts, published_shifts, weighted_score, hours) "
+        "SELECT doctor_id, date, COUNT(*), "
+        f"SUM({_per_shift_type({i: 1 for i, c in category.items() if c == 'day' and i not in night})}), "
+        f"SUM({_per_shift_type({i: 1 for i in night})}), "
+        f"SUM({_per_shift_type({i: 1 for i, c in category.items() if c == 'oncall'})}), "
+        f"SUM({_per_shift_type({i: 1 for i, c in category.items() if c == 'backup'})}), "
+        "SUM(CASE WHEN status = 'published' THEN 1 ELSE 0 END), "
+        f"SUM({_per_shift_type({s.id: int(s.weight) if s.weight is not None else 1 for s in shift_types})}), "
+        f"SUM({_per_shift_type({s.id: float(_hours(s.start_time, s.end_time)) for s in shift_types})}) "
+        "FROM schedules WHERE doctor_id IS NOT NULL GROUP BY doctor_id, date"
+    )
+
+def _create_table():
+    op.create_table(
+        "workload_daily",
+        sa.Column("doctor_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("total_shifts", sa.Integer(), default=0),
+        sa.Column("day_shifts", sa.Integer(), default=0),
+        sa.Column("night_shifts", sa.Integer(), default=0),
+        sa.Column("oncall_shifts", sa.Integer(), default=0),
+        sa.Column("backup_shifts", sa.Integer(), default=0),
+        sa.Column("published_shifts", sa.Integer(), default=0),
+        sa.Column("weighted_score", sa.Integer(), default=0),
+        sa.Column("hours", sa.Float(), default=0.0),
+    )
+    op.create_index("ix_workload_daily_date", "workload_daily", ["date"])
+
+def downgrade():
+    op.drop_index("ix_workload_daily_date", table_name="workload_daily", if_exists=True)
+    op.drop_table("workload_daily")
@@ -0,0 +1,67 @@
+"""Holiday calendar table (holidays)
+
+Public holidays and make-up workdays; fill it from the admin UI or POST /holidays/import.
+Seeded with the fixed dates the workload stats used to hardcode (New Year, Labor Day and
+National Day) for every year the existing schedules span through next year, so
+holiday_shifts keeps counting them until a real calendar is imported.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# (month, day, name) previously hardcoded as is_holiday() in app/api/stats.py
+LEGACY_HOLIDAYS = [
+    (1, 1, "元旦"),
+    (5, 1, "劳动节"), (5, 2, "劳动节"), (5, 3, "劳动节"),
+    (10, 1, "国庆节"), (10, 2, "国庆节"), (10, 3, "国庆节"),
+]
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("holidays"):  # else created by Base.metadata.create_all
+        _create_table()
+    if op.get_bind().execute(sa.text("SELECT 1 FROM holidays LIMIT 1")).first() is None:
+        _seed_legacy_holidays()
+
+def _seed_legacy_holidays():
+    first, last = op.get_bind().execute(sa.text("SELECT MIN(date), MAX(date) FROM schedules")).first()
+    this_year = date.today().year
+    # str() because SQLite returns the dates as strings
+    first_year = int(str(first)[:4]) if first is not None else this_year
+    last_year = max(int(str(last)[:4]) if last is not None else this_year, this_year + 1)
+    holidays = sa.table(
+        "holidays",
+        sa.column("date", sa.Date()),
+        sa.column("name", sa.String()),
+        sa.column("kind", sa.String()),
+    )
+    op.bulk_insert(holidays, [
+        {"date": date(year, month, day), "name": name, "kind": "holiday"}
+        for year in range(first_year, last_year + 1)
+        for month, day, name in LEGACY_HOLIDAYS
+    ])
+
+def _create_table():
+    op.create_table(
+        "holidays",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("date", sa.Date()),
+        sa.Column("name", sa.String()),
+        sa.Column("kind", sa.String(), default="holiday"),
+        sa.Column("description", sa.String(), nullable=True),
+    )
+    op.create_index("ix_holidays_id", "holidays", ["id"])
+    op.create_index("ix_holidays_date", "holidays", ["date"], unique=True)
+
+def downgrade():
+    op.drop_index("ix_holidays_date", table_name="holidays", if_exists=True)
+    op.drop_index("ix_holidays_id", table_name="holidays", if_exists=True)
+    op.drop_table("holidays")
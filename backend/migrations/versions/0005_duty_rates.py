@@ -0,0 +1,34 @@
+"""Duty-fee rate table (duty_rates), one row per shift category
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("duty_rates"):
+        return  # already created by Base.metadata.create_all
+    op.create_table(
+        "duty_rates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("shift_category", sa.String()),
+        sa.Column("base_fee", sa.Float(), default=0.0),
+        sa.Column("hourly_rate", sa.Float(), default=0.0),
+        sa.Column("weekend_multiplier", sa.Float(), default=2.0),
+        sa.Column("holiday_multiplier", sa.Float(), default=3.0),
+        sa.Column("description", sa.String(), nullable=True),
+    )
+    op.create_index("ix_duty_rates_id", "duty_rates", ["id"])
+    op.create_index("ix_duty_rates_shift_category", "duty_rates", ["shift_category"], unique=True)
+
+def downgrade():
+    op.drop_index("ix_duty_rates_shift_category", table_name="duty_rates", if_exists=True)
+    op.drop_index("ix_duty_rates_id", table_name="duty_rates", if_exists=True)
+    op.drop_table("duty_rates")
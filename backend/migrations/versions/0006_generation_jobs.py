@@ -0,0 +1,36 @@
+"""Background generation job table (generation_jobs)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("generation_jobs"):
+        return  # already created by Base.metadata.create_all
+    op.create_table(
+        "generation_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("status", sa.String()),
+        sa.Column("params", sa.JSON()),
+        sa.Column("progress", sa.JSON()),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("cancel_requested", sa.Boolean()),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_generation_jobs_id", "generation_jobs", ["id"])
+
+def downgrade():
+    op.drop_index("ix_generation_jobs_id", table_name="generation_jobs", if_exists=True)
+    op.drop_table("generation_jobs")
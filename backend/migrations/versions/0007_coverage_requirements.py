@@ -0,0 +1,34 @@
+"""Per-shift headcount demand table (coverage_requirements)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("coverage_requirements"):
+        return  # already created by Base.metadata.create_all
+    op.create_table(
+        "coverage_requirements",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("shift_type_id", sa.Integer(), sa.ForeignKey("shift_types.id")),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id"), nullable=True),
+        sa.Column("weekday", sa.Integer(), nullable=True),
+        sa.Column("date", sa.Date(), nullable=True),
+        sa.Column("min_count", sa.Integer()),
+        sa.Column("max_count", sa.Integer(), nullable=True),
+        sa.Column("qualification", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+    )
+    op.create_index("ix_coverage_requirements_id", "coverage_requirements", ["id"])
+
+def downgrade():
+    op.drop_index("ix_coverage_requirements_id", table_name="coverage_requirements", if_exists=True)
+    op.drop_table("coverage_requirements")
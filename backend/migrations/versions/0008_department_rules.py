@@ -0,0 +1,35 @@
+"""Per-department scheduling rule table (department_rules)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("department_rules"):
+        return  # already created by Base.metadata.create_all
+    op.create_table(
+        "department_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("department_id", sa.Integer(), sa.ForeignKey("departments.id"), nullable=True),
+        sa.Column("rule", sa.String()),
+        sa.Column("params", sa.JSON()),
+        sa.Column("enabled", sa.Boolean()),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_department_rules_id", "department_rules", ["id"])
+    op.create_index("ix_department_rules_department_id", "department_rules", ["department_id"])
+    op.create_index("ix_department_rules_rule", "department_rules", ["rule"])
+
+def downgrade():
+    for name in ("ix_department_rules_rule", "ix_department_rules_department_id", "ix_department_rules_id"):
+        op.drop_index(name, table_name="department_rules", if_exists=True)
+    op.drop_table("department_rules")
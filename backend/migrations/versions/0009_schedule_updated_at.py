@@ -0,0 +1,23 @@
+"""schedules.updated_at (calendar ETag), stamped with the upgrade time on existing rows
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("schedules")}
+    if "updated_at" not in columns:
+        op.add_column("schedules", sa.Column("updated_at", sa.DateTime()))
+    op.execute("UPDATE schedules SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+
+def downgrade():
+    with op.batch_alter_table("schedules") as batch:
+        batch.drop_column("updated_at")
@@ -0,0 +1,22 @@
+"""generation_jobs.heartbeat_at: lets workers fail jobs orphaned by a dead worker
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("generation_jobs")}
+    if "heartbeat_at" not in columns:
+        op.add_column("generation_jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+def downgrade():
+    with op.batch_alter_table("generation_jobs") as batch:
+        batch.drop_column("heartbeat_at")
@@ -0,0 +1,27 @@
+"""users.updated_at and rooms.updated_at (calendar ETag), stamped with the upgrade time on existing rows
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+TABLES = ["users", "rooms"]
+
+def upgrade():
+    for table in TABLES:
+        columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+        if "updated_at" not in columns:
+            op.add_column(table, sa.Column("updated_at", sa.DateTime()))
+        op.execute(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("updated_at")
@@ -0,0 +1,29 @@
+"""
+重建排班工作量汇总表 (workload_daily)：历史数据回填、班次类型批量修改后使用
+
+Usage (from backend/):
+    python rebuild_workload.py
+    python rebuild_workload.py --start 2026-01-01 --end 2026-12-31
+"""
+import argparse
+import time
+from datetime import date
+from app.database import SessionLocal, Base, engine
+from app import models
+from app.core.workload import rebuild_workload
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, help="first date to rebuild (default: all)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last date to rebuild (default: all)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[models.WorkloadDaily.__table__])
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        rebuild_workload(db, args.start, args.end)
+        rows = db.query(models.WorkloadDaily).count()
+        print(f"Rebuilt workload_daily in {time.perf_counter() - t0:.2f}s ({rows} doctor-days)")
+    finally:
+        db.close()
@@ -1,3 +1,4 @@
 $env:PYTHONPATH = "d:\Project\Doctor-Scheduling-System\backend"
 .\.venv\Scripts\activate
+alembic upgrade head
 uvicorn app.main:app --reload --host 0.0.0.0 --port 8000
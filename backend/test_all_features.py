@@ -98,7 +98,7 @@ def test_all_features():
     # 生成排班
     resp = requests.post(f"{BASE_URL}/schedules/generate?start_date=2026-01-06&days=7", headers=headers)
     if resp.status_code == 200:
-        schedules = resp.json()
+        schedules = resp.json()["schedules"]
         print(f"✅ 生成排班成功，共 {len(schedules)} 条记录")
         schedule_id = schedules[0]["id"] if schedules else None
     else:
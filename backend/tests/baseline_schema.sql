@@ -0,0 +1,141 @@
+-- Schema of a database created by Base.metadata.create_all before the migration series (SQLite)
+CREATE TABLE tags (
+	id INTEGER NOT NULL, 
+	name VARCHAR, 
+	color VARCHAR, 
+	PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_tags_name ON tags (name);
+CREATE INDEX ix_tags_id ON tags (id);
+CREATE TABLE departments (
+	id INTEGER NOT NULL, 
+	name VARCHAR, 
+	parent_id INTEGER, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(parent_id) REFERENCES departments (id)
+);
+CREATE INDEX ix_departments_id ON departments (id);
+CREATE UNIQUE INDEX ix_departments_name ON departments (name);
+CREATE TABLE shift_types (
+	id INTEGER NOT NULL, 
+	name VARCHAR, 
+	start_time VARCHAR, 
+	end_time VARCHAR, 
+	weight INTEGER, 
+	required_qualification VARCHAR, 
+	shift_category VARCHAR, 
+	description VARCHAR, 
+	PRIMARY KEY (id)
+);
+CREATE INDEX ix_shift_types_id ON shift_types (id);
+CREATE TABLE users (
+	id INTEGER NOT NULL, 
+	username VARCHAR, 
+	hashed_password VARCHAR, 
+	full_name VARCHAR, 
+	role VARCHAR(18), 
+	department_id INTEGER, 
+	title VARCHAR, 
+	phone VARCHAR, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(department_id) REFERENCES departments (id)
+);
+CREATE INDEX ix_users_id ON users (id);
+CREATE UNIQUE INDEX ix_users_username ON users (username);
+CREATE TABLE rooms (
+	id INTEGER NOT NULL, 
+	name VARCHAR, 
+	room_number VARCHAR, 
+	department_id INTEGER, 
+	capacity INTEGER, 
+	description VARCHAR, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(department_id) REFERENCES departments (id)
+);
+CREATE INDEX ix_rooms_name ON rooms (name);
+CREATE INDEX ix_rooms_id ON rooms (id);
+CREATE UNIQUE INDEX ix_rooms_room_number ON rooms (room_number);
+CREATE TABLE user_tags (
+	user_id INTEGER, 
+	tag_id INTEGER, 
+	FOREIGN KEY(user_id) REFERENCES users (id), 
+	FOREIGN KEY(tag_id) REFERENCES tags (id)
+);
+CREATE TABLE schedules (
+	id INTEGER NOT NULL, 
+	doctor_id INTEGER, 
+	shift_type_id INTEGER, 
+	room_id INTEGER, 
+	date DATE, 
+	status VARCHAR, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(doctor_id) REFERENCES users (id), 
+	FOREIGN KEY(shift_type_id) REFERENCES shift_types (id), 
+	FOREIGN KEY(room_id) REFERENCES rooms (id)
+);
+CREATE INDEX ix_schedules_date ON schedules (date);
+CREATE INDEX ix_schedules_id ON schedules (id);
+CREATE TABLE preferences (
+	id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	date DATE, 
+	type VARCHAR, 
+	shift_type_id INTEGER, 
+	reason VARCHAR, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id), 
+	FOREIGN KEY(shift_type_id) REFERENCES shift_types (id)
+);
+CREATE INDEX ix_preferences_date ON preferences (date);
+CREATE INDEX ix_preferences_id ON preferences (id);
+CREATE TABLE notifications (
+	id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	content VARCHAR, 
+	is_read BOOLEAN, 
+	type VARCHAR, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_notifications_id ON notifications (id);
+CREATE TABLE feedbacks (
+	id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	type VARCHAR, 
+	urgency VARCHAR, 
+	content VARCHAR, 
+	page VARCHAR, 
+	status VARCHAR, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_feedbacks_id ON feedbacks (id);
+CREATE TABLE audit_logs (
+	id INTEGER NOT NULL, 
+	user_id INTEGER, 
+	action VARCHAR, 
+	resource VARCHAR, 
+	resource_id VARCHAR, 
+	details VARCHAR, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE INDEX ix_audit_logs_id ON audit_logs (id);
+CREATE TABLE shift_trades (
+	id INTEGER NOT NULL, 
+	requester_id INTEGER, 
+	request_shift_id INTEGER, 
+	target_doctor_id INTEGER, 
+	status VARCHAR, 
+	reason VARCHAR, 
+	created_at DATETIME, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(requester_id) REFERENCES users (id), 
+	FOREIGN KEY(request_shift_id) REFERENCES schedules (id), 
+	FOREIGN KEY(target_doctor_id) REFERENCES users (id)
+);
+CREATE INDEX ix_shift_trades_id ON shift_trades (id);
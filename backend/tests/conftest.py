@@ -6,6 +6,9 @@ from app.main import app
 from app.database import Base, get_db
 from app.models import User, RoleEnum
 from app.core.security import get_password_hash
+from app.core.cache import generation_cache
+from app.core.holidays import calendar_cache
+from app.core.auth_cache import user_cache
 
 # Use an in-memory SQLite database for tests, or a separate test PG DB.
 # For simplicity in this environment, let's use SQLite or just mock?
@@ -24,6 +27,13 @@ def db_engine():
     yield engine
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_generation_cache():
+    # Rolled-back tests reuse row ids, so cached rosters must not leak between tests
+    generation_cache.clear()
+    calendar_cache.invalidate()
+    user_cache.clear()
+
 @pytest.fixture(scope="function")
 def db(db_engine):
     connection = db_engine.connect()
@@ -47,15 +57,9 @@ def client(db):
         yield c
 
 @pytest.fixture
-def admin_token_headers(client):
-    # Create admin
-    hashed = get_password_hash("admin123")
-    # We need to manually insert because API might be protected
-    # But wait, we are using the same DB session?
-    # Actually, we can just use the registration endpoint if it's open (it is for now)
-    # Or insert directly to DB fixture
-    # Let's insert directly.
-    # Note: SQLite multithreading might be an issue with TestClient? TestClient is sync.
-    pass 
-    # For now, let's just return a helper to create token
-    return {}
+def admin_token_headers(client, db):
+    admin = User(username="admin_fixture", hashed_password=get_password_hash("admin123"), role=RoleEnum.ADMIN)
+    db.add(admin)
+    db.commit()
+    resp = client.post("/token", data={"username": "admin_fixture", "password": "admin123"})
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
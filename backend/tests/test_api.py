@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 from app.main import app
+from app.models import ShiftType
 
 client = TestClient(app)
 
@@ -12,3 +13,21 @@ def test_health_db():
     response = client.get("/health/db")
     assert response.status_code == 200
     assert response.json()["status"] == "ok"
+
+def test_coverage_requirement_bounds_are_validated(client, db, admin_token_headers):
+    st = ShiftType(name="Ward", start_time="08:00", end_time="17:00")
+    db.add(st)
+    db.commit()
+    resp = client.post(
+        "/coverage-requirements/",
+        json={"shift_type_id": st.id, "min_count": 3, "max_count": 2},
+        headers=admin_token_headers
+    )
+    assert resp.status_code == 400
+    resp = client.post(
+        "/coverage-requirements/",
+        json={"shift_type_id": st.id, "weekday": 5, "min_count": 2},
+        headers=admin_token_headers
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["max_count"] is None
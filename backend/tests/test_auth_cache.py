@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+from app.models import User, RoleEnum
+from app.core.security import get_password_hash
+from app.core.auth_cache import UserCache, user_cache
+
+def test_user_cache_lru_ttl_and_version_guard():
+    cache = UserCache(max_size=2, ttl=60)
+    for name in ("a", "b"):
+        cache.put(name, SimpleNamespace(username=name))
+    assert cache.get("a").username == "a"
+    cache.put("c", SimpleNamespace(username="c"))  # evicts b, the least recently used
+    assert cache.get("b") is None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+    version = cache.version()
+    cache.invalidate("a")
+    cache.put("a", SimpleNamespace(username="stale"), version)  # loaded before the invalidation
+    assert cache.get("a") is None
+
+    expired = UserCache(ttl=0)
+    expired.put("a", SimpleNamespace(username="a"))
+    assert expired.get("a") is None and expired.stats()["expirations"] == 1
+
+def test_cached_user_is_dropped_on_delete(client, db, admin_token_headers):
+    db.add(User(username="cached_doc", hashed_password=get_password_hash("pw"), role=RoleEnum.DOCTOR))
+    db.commit()
+    headers = {"Authorization": f"Bearer {client.post('/token', data={'username': 'cached_doc', 'password': 'pw'}).json()['access_token']}"}
+    for _ in range(3):
+        assert client.get("/users/me", headers=headers).status_code == 200
+    stats = user_cache.stats()
+    assert stats["hits"] >= 2 and stats["size"] >= 1
+
+    doctor_id = db.query(User).filter(User.username == "cached_doc").one().id
+    assert client.delete(f"/users/{doctor_id}", headers=admin_token_headers).status_code == 200
+    assert client.get("/users/me", headers=headers).status_code == 401
+    # Read-only endpoints trust the signed claims until the token expires
+    claims_before = user_cache.stats()["claim_hits"]
+    assert client.get("/notifications/unread-count", headers=headers).status_code == 200
+    assert user_cache.stats()["claim_hits"] == claims_before + 1
+
+def test_cache_stats_endpoint(client, admin_token_headers):
+    response = client.get("/auth/cache", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert set(response.json()) >= {"size", "hits", "misses", "claim_hits", "hit_rate"}
@@ -0,0 +1,23 @@
+from benchmarks.suite import compare
+from benchmarks.synthetic import make_hospital
+from app.core.feasibility import check_feasibility
+
+def test_synthetic_hospital_is_seeded_and_feasible():
+    first = make_hospital(departments=2, doctors=10, days=7, seed=5)
+    again = make_hospital(departments=2, doctors=10, days=7, seed=5)
+    assert [[vars(d) for d in u["doctors"]] for u in first] == [[vars(d) for d in u["doctors"]] for u in again]
+    assert [u["preferences"] for u in first] == [u["preferences"] for u in again]
+    assert make_hospital(departments=2, doctors=10, days=7, seed=6)[0]["preferences"] != first[0]["preferences"]
+    assert {d.department_id for d in first[1]["doctors"]} == {2}
+    for unit in first:
+        assert check_feasibility(unit) == []
+
+def test_compare_flags_regressions_beyond_noise():
+    row = {"scale": "small", "status": "OPTIMAL", "objective": -10.0, "build_ms": 100.0, "solve_ms": 1000.0,
+           "variables": 500, "constraints": 600, "peak_rss_mb": 150.0}
+    baseline = {"results": [row]}
+    noisy = {"results": [{**row, "build_ms": 110.0, "solve_ms": 1050.0, "objective": -9.5}]}
+    assert compare(baseline, noisy) == []
+
+    worse = {"results": [{**row, "solve_ms": 2000.0, "constraints": 700, "status": "FEASIBLE", "objective": -5.0}]}
+    assert {r["metric"] for r in compare(baseline, worse)} == {"solve_ms", "constraints", "status", "objective"}
@@ -0,0 +1,34 @@
+from datetime import date
+from types import SimpleNamespace
+from app.core.cache import GenerationCache, input_key
+
+def make_payload(**overrides):
+    payload = {
+        "doctors": [SimpleNamespace(id=1, qualifications=frozenset({"ICU", "主治医师"})), SimpleNamespace(id=2, qualifications=frozenset())],
+        "shift_types": [SimpleNamespace(id=1, name="Day", weight=1)],
+        "preferences": [(1, 0, "avoid", None)],
+        "start_date": date(2026, 1, 1),
+        "days": 7,
+        "warm_start": {"hints": [], "keep": [], "fixed": [], "previous_day": []},
+    }
+    payload.update(overrides)
+    return payload
+
+def test_input_key_tracks_inputs_but_not_soft_hints():
+    base = input_key(make_payload(), {"time_limit": 5})
+    assert input_key(make_payload(), {"time_limit": 5}) == base
+    assert input_key(make_payload(warm_start={"hints": [(1, 0, 1)], "keep": [(1, 0, 1)], "fixed": [], "previous_day": []}), {"time_limit": 5}) == base
+    assert input_key(make_payload(days=8), {"time_limit": 5}) != base
+    assert input_key(make_payload(preferences=[]), {"time_limit": 5}) != base
+    assert input_key(make_payload(shift_types=[SimpleNamespace(id=1, name="Day", weight=2)]), {"time_limit": 5}) != base
+    assert input_key(make_payload(), {"time_limit": 6}) != base
+
+def test_lru_eviction_and_counters():
+    cache = GenerationCache(max_size=2)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}  # "a" is now most recent
+    cache.put("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("c") == {"n": 3}
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 2, "misses": 1, "evictions": 1, "hit_rate": 2 / 3}
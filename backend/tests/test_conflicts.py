@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+from app.core.conflicts import RosterIndex
+from app.core.rules import build_rule
+from app.models import User, RoleEnum, ShiftType, Schedule, ShiftTrade, TradeStatus, DepartmentRule
+
+SHIFT_TYPES = [
+    SimpleNamespace(id=1, name="Day", required_qualification=None),
+    SimpleNamespace(id=2, name="Night", required_qualification=None, shift_category="night"),
+    SimpleNamespace(id=3, name="ICU", required_qualification="ICU"),
+]
+MONDAY = date(2026, 3, 2)
+
+def doctor(doctor_id, qualifications=(), department_id=1):
+    return SimpleNamespace(id=doctor_id, department_id=department_id, qualifications=frozenset(qualifications))
+
+def rows(*cells):
+    return [SimpleNamespace(id=n + 1, doctor_id=d, date=MONDAY + timedelta(days=day), shift_type_id=st) for n, (d, day, st) in enumerate(cells)]
+
+def kinds(conflicts):
+    return sorted(c["kind"] for c in conflicts)
+
+def test_builtin_checks_in_one_pass():
+    roster = RosterIndex(
+        rows((1, 0, 1), (1, 0, 2), (2, 1, 2), (2, 2, 1), (3, 0, 3), (4, 0, 1)),
+        SHIFT_TYPES, [doctor(1), doctor(2), doctor(3), doctor(4, {"ICU"})], {},
+    )
+    conflicts = roster.check()
+    assert kinds(conflicts) == ["double_booking", "night_rest", "qualification"]
+    night_rest = next(c for c in conflicts if c["kind"] == "night_rest")
+    assert night_rest["doctor_id"] == 2 and night_rest["date"] == MONDAY + timedelta(days=1)
+    assert night_rest["schedule_ids"] == [3, 4]
+
+def test_department_rules_and_incremental_check():
+    rules = {1: [
+        build_rule("consecutive_duty_limit", {"max_days": 3}),
+        build_rule("max_nights_per_week", {"max_nights": 1}),
+        build_rule("mutual_exclusion", {"doctor_ids": [5, 6]}),
+        build_rule("qualification_pairing", {"qualification": "senior", "shift_type_ids": [2]}),
+    ]}
+    roster = RosterIndex(
+        rows(*[(1, d, 1) for d in range(4)], (2, 0, 2), (2, 2, 2), (5, 3, 1), (6, 3, 1), (7, 5, 2)),
+        SHIFT_TYPES, [doctor(i, {"senior"} if i == 2 else ()) for i in (1, 2, 5, 6, 7)], rules,
+    )
+    assert kinds(roster.check()) == ["consecutive_duty_limit", "max_nights_per_week", "mutual_exclusion", "qualification_pairing"]
+
+    # Only the touched cells are re-checked: a trade giving doctor 7's unpaired night to senior doctor 2
+    row = roster.shifts(7, MONDAY + timedelta(days=5))[0]
+    touched = [(7, row.date), (2, row.date)]
+    assert kinds(roster.check(touched)) == ["max_nights_per_week", "qualification_pairing"]
+    roster.move(row, 2)
+    after = roster.check(touched)
+    assert kinds(after) == ["max_nights_per_week"]
+    assert len(after[0]["schedule_ids"]) == 3
+
+def test_conflicts_endpoint_and_trade_validation(client, db, admin_token_headers):
+    docs = [User(username=f"conf_doc{i}", full_name=f"Doc {i}", role=RoleEnum.DOCTOR) for i in range(3)]
+    day = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    night = ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night")
+    db.add_all(docs + [day, night])
+    db.commit()
+    a, b, c = docs
+    monday = date(2026, 8, 3)
+    traded = Schedule(date=monday, doctor_id=a.id, shift_type_id=night.id, status="published")
+    db.add_all([
+        traded,
+        Schedule(date=monday + timedelta(days=1), doctor_id=b.id, shift_type_id=day.id, status="published"),
+        Schedule(date=monday + timedelta(days=2), doctor_id=c.id, shift_type_id=night.id, status="published"),
+        Schedule(date=monday + timedelta(days=3), doctor_id=c.id, shift_type_id=day.id, status="published"),
+    ])
+    db.commit()
+
+    resp = client.get(f"/schedules/conflicts?start_date={monday}&end_date={monday + timedelta(days=6)}", headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    assert [(x["kind"], x["doctor_id"]) for x in resp.json()] == [("night_rest", c.id)]
+
+    trade = ShiftTrade(requester_id=a.id, request_shift_id=traded.id, target_doctor_id=b.id, status=TradeStatus.ACCEPTED)
+    db.add(trade)
+    db.commit()
+    resp = client.post(f"/trades/{trade.id}/approve", headers=admin_token_headers)
+    assert resp.status_code == 409
+    assert resp.json()["detail"]["conflicts"][0]["kind"] == "night_rest"
+    assert db.get(Schedule, traded.id).doctor_id == a.id
+
+    resp = client.post(f"/trades/{trade.id}/approve?force=true", headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    assert db.get(Schedule, traded.id).doctor_id == b.id
+
+def test_forced_trade_cannot_duplicate_a_shift(client, db, admin_token_headers):
+    a, b = (User(username=f"dup_doc{i}", full_name=f"Dup {i}", role=RoleEnum.DOCTOR) for i in range(2))
+    day = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add_all([a, b, day])
+    db.commit()
+    traded = Schedule(date=date(2026, 8, 10), doctor_id=a.id, shift_type_id=day.id, status="published")
+    db.add_all([traded, Schedule(date=date(2026, 8, 10), doctor_id=b.id, shift_type_id=day.id, status="published")])
+    db.commit()
+    trade = ShiftTrade(requester_id=a.id, request_shift_id=traded.id, target_doctor_id=b.id, status=TradeStatus.ACCEPTED)
+    db.add(trade)
+    db.commit()
+
+    resp = client.post(f"/trades/{trade.id}/approve?force=true", headers=admin_token_headers)
+    assert resp.status_code == 409
+    assert "already holds this shift" in resp.json()["detail"]
+    db.expire_all()
+    assert db.get(Schedule, traded.id).doctor_id == a.id
+    assert db.get(ShiftTrade, trade.id).status == TradeStatus.ACCEPTED
+
+def test_publish_and_repair_are_validated(client, db, admin_token_headers):
+    a, b = (User(username=f"guard_doc{i}", role=RoleEnum.DOCTOR) for i in range(2))
+    day = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add_all([a, b, day, DepartmentRule(rule="consecutive_duty_limit", params={"max_days": 3})])
+    db.commit()
+    # b works the three days after the absence: covering it would make a four-day run
+    db.add(Schedule(date=date(2026, 9, 7), doctor_id=a.id, shift_type_id=day.id, status="draft"))
+    db.add_all([Schedule(date=date(2026, 9, d), doctor_id=b.id, shift_type_id=day.id, status="draft") for d in (8, 9, 10)])
+    db.commit()
+
+    repair = {"doctor_id": a.id, "start_date": "2026-09-07", "end_date": "2026-09-07", "neighbourhood_days": 0}
+    resp = client.post("/schedules/repair", json=repair, headers=admin_token_headers)
+    assert resp.status_code == 409
+    assert resp.json()["detail"]["conflicts"][0]["kind"] == "consecutive_duty_limit"
+    assert db.query(Schedule).filter(Schedule.date == date(2026, 9, 7)).one().doctor_id == a.id
+    resp = client.post("/schedules/repair", json={**repair, "force": True}, headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+
+    url = "/schedules/publish?start_date=2026-09-07&end_date=2026-09-10"
+    resp = client.post(url, headers=admin_token_headers)
+    assert resp.status_code == 409
+    assert {c["kind"] for c in resp.json()["detail"]["conflicts"]} == {"consecutive_duty_limit"}
+    assert client.post(url + "&force=true", headers=admin_token_headers).status_code == 200
+    db.expire_all()
+    assert {s.status for s in db.query(Schedule).filter(Schedule.doctor_id == b.id)} == {"published"}
+
+def test_conflict_margin_follows_the_longest_rule(db):
+    from app.core.conflicts import conflict_margin, validate_changes
+    doc = User(username="margin_doc", role=RoleEnum.DOCTOR)
+    day = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add_all([doc, day, DepartmentRule(rule="consecutive_duty_limit", params={"max_days": 9})])
+    db.commit()
+    db.add_all([Schedule(date=date(2026, 10, 1) + timedelta(days=d), doctor_id=doc.id, shift_type_id=day.id) for d in range(9)])
+    db.commit()
+
+    assert conflict_margin(db) == 9
+    # The tenth day only breaks the limit if all nine earlier days are loaded
+    added = [{"doctor_id": doc.id, "date": date(2026, 10, 10), "shift_type_id": day.id}]
+    assert [c["kind"] for c in validate_changes(db, [], added)] == ["consecutive_duty_limit"]
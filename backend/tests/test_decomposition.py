@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+from app.models import User, RoleEnum, ShiftType, Department
+from app.core.decomposition import department_subtree
+
+def test_department_subtree_follows_parent_ids():
+    departments = [
+        SimpleNamespace(id=1, parent_id=None),
+        SimpleNamespace(id=2, parent_id=1),
+        SimpleNamespace(id=3, parent_id=2),
+        SimpleNamespace(id=4, parent_id=None),
+    ]
+    assert sorted(department_subtree(departments, 1)) == [1, 2, 3]
+    assert sorted(department_subtree(departments, None)) == [1, 2, 3, 4]
+
+def test_generate_split_by_department(client, db, admin_token_headers):
+    hospital = Department(name="Hospital")
+    db.add(hospital)
+    db.commit()
+    surgery = Department(name="Surgery", parent_id=hospital.id)
+    medicine = Department(name="Medicine", parent_id=hospital.id)
+    db.add_all([surgery, medicine])
+    db.commit()
+    for dept in (surgery, medicine):
+        for i in range(3):
+            db.add(User(username=f"{dept.name}_{i}", role=RoleEnum.DOCTOR, department_id=dept.id))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+
+    resp = client.post(
+        f"/schedules/generate?start_date=2026-04-06&days=7&department_id={hospital.id}&split_by_department=true&time_limit=10",
+        headers=admin_token_headers
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["status"] in ("OPTIMAL", "FEASIBLE")
+    assert {r["department_name"] for r in data["departments"]} == {"Surgery", "Medicine"}
+    # every shift is covered once per department
+    assert len(data["schedules"]) == 2 * 7 * 2
+    assert all(r["assignments"] == 14 for r in data["departments"])
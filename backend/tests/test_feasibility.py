@@ -0,0 +1,42 @@
+from datetime import date
+from types import SimpleNamespace
+from app.core.feasibility import check_feasibility, explain_infeasibility
+
+def make_payload(n_doctors, days, **extra):
+    return {
+        "doctors": [SimpleNamespace(id=i + 1, qualifications=frozenset()) for i in range(n_doctors)],
+        "shift_types": [
+            SimpleNamespace(id=1, name="Day Shift", weight=1),
+            SimpleNamespace(id=2, name="Night Shift", weight=2, shift_category="night"),
+        ],
+        "start_date": date(2026, 1, 1),
+        "days": days,
+        **extra,
+    }
+
+def rule(shift_type_id, min_count, **kwargs):
+    fields = {"department_id": None, "weekday": None, "date": None, "max_count": None, "qualification": None}
+    fields.update(kwargs)
+    return SimpleNamespace(shift_type_id=shift_type_id, min_count=min_count, **fields)
+
+def test_counting_checks_name_the_over_constrained_shift():
+    payload = make_payload(6, 7, coverage=[rule(1, 4, date=date(2026, 1, 3)), rule(2, 3, qualification="ICU")])
+    payload["unavailable"] = [(1, 2), (2, 2), (3, 2)]
+    issues = check_feasibility(payload)
+
+    kinds = {(i["kind"], i["date"], i["shift_type_id"]) for i in issues}
+    assert ("shift_understaffed", date(2026, 1, 3), 1) in kinds  # 4 needed, 3 available
+    assert ("qualification", date(2026, 1, 1), 2) in kinds  # nobody holds ICU
+    assert check_feasibility(make_payload(4, 7)) == []
+
+def test_night_rest_pigeonhole_is_detected_without_solving():
+    # 2 doctors: whoever works night 1 cannot cover day 2
+    issues = check_feasibility(make_payload(2, 2))
+    assert [i["kind"] for i in issues] == ["night_rest"]
+
+def test_unsat_core_is_minimal():
+    payload = make_payload(5, 7, warm_start={"fixed": [(1, 0, 2), (1, 1, 1), (2, 4, 1)]})
+    assert check_feasibility(payload) == []
+
+    core = explain_infeasibility(payload)
+    assert sorted((c["rule"], c.get("doctor_id")) for c in core) == [("fixed", 1), ("fixed", 1), ("night_rest", 1)]
@@ -0,0 +1,106 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+from app.core.generation import configure_engine
+from app.core.heuristic import HeuristicEngine
+from app.core.rules import build_rule
+from app.models import User, RoleEnum, ShiftType
+
+SHIFT_TYPES = [
+    SimpleNamespace(id=1, name="Day", weight=1),
+    SimpleNamespace(id=2, name="Evening", weight=1),
+    SimpleNamespace(id=3, name="Night", weight=2, shift_category="night"),
+]
+
+def coverage(min_count, qualification=None, shift_type_id=None):
+    return [
+        SimpleNamespace(shift_type_id=s.id, department_id=None, weekday=None, date=None, min_count=min_count, max_count=None, qualification=qualification)
+        for s in SHIFT_TYPES if shift_type_id in (None, s.id)
+    ]
+
+def make_payload(n, days, **extra):
+    doctors = [SimpleNamespace(id=i + 1, qualifications=frozenset({"senior"} if i % 3 == 0 else ())) for i in range(n)]
+    return {"doctors": doctors, "shift_types": SHIFT_TYPES, "start_date": date(2026, 3, 2), "days": days, **extra}
+
+def assert_valid(results, payload, per_shift):
+    cells = {}
+    for r in results:
+        assert (r["doctor_id"], r["date"]) not in cells  # one shift per day
+        cells[(r["doctor_id"], r["date"])] = r["shift_type_id"]
+    for d in range(payload["days"]):
+        day = payload["start_date"] + timedelta(days=d)
+        for s in SHIFT_TYPES:
+            assert sum(1 for (_, on), st in cells.items() if on == day and st == s.id) >= per_shift
+    for (doctor_id, day), st in cells.items():
+        if st == 3:
+            assert (doctor_id, day + timedelta(days=1)) not in cells  # night rest
+    return cells
+
+def test_heuristic_staffs_60_doctors_for_a_month_quickly():
+    payload = make_payload(60, 31, coverage=coverage(4) + coverage(1, "senior", 3), engine="heuristic")
+    engine = configure_engine(payload)
+    assert isinstance(engine, HeuristicEngine)
+    engine.build_model()
+    results = engine.solve()
+
+    assert engine.stats["status"] == "FEASIBLE"
+    assert engine.stats["wall_time"] < 0.2
+    cells = assert_valid(results, payload, 4)
+    seniors = {doc.id for doc in payload["doctors"] if "senior" in doc.qualifications}
+    for d in range(31):
+        day = payload["start_date"] + timedelta(days=d)
+        assert any(cells.get((doctor_id, day)) == 3 for doctor_id in seniors)
+
+def test_heuristic_respects_masks_fixed_cells_and_rules():
+    payload = make_payload(
+        8, 14,
+        coverage=coverage(1),
+        unavailable=[(1, d) for d in range(14)],
+        preferences=[(2, 3, "avoid", None), (3, 4, "avoid", 1)],
+        warm_start={"fixed": [(4, 0, 3)], "previous_day": [(5, 3)]},
+        rules=[{"rule": "max_nights_per_week", "params": {"max_nights": 1}}, {"rule": "mutual_exclusion", "params": {"doctor_ids": [6, 7]}}],
+        engine="heuristic",
+    )
+    engine = configure_engine(payload)
+    engine.build_model()
+    results = engine.solve(random_seed=1)
+    assert results is not None, engine.stats
+    cells = assert_valid(results, payload, 1)
+
+    start = payload["start_date"]
+    assert not any(doctor_id == 1 for doctor_id, _ in cells)
+    assert (2, start + timedelta(days=3)) not in cells
+    assert cells[(4, start)] == 3
+    assert (5, start) not in cells  # worked the night before the horizon
+    assert cells.get((3, start + timedelta(days=4))) != 1
+    assert not any((6, day) in cells and (7, day) in cells for _, day in cells)
+    assert engine._rule_violations(engine.assign, range(8), range(14)) == 0
+
+def test_heuristic_objective_is_comparable_with_cpsat():
+    payload = make_payload(9, 7, coverage=coverage(1), preferences=[(2, 1, "desire", 3), (5, 2, "desire", None)])
+    objectives = {}
+    for name in ("cpsat", "heuristic"):
+        engine = configure_engine({**payload, "engine": name})
+        engine.build_model()
+        assert engine.solve(time_limit=5, num_workers=2, random_seed=1) is not None
+        objectives[name] = engine.stats["objective"]
+    assert objectives["cpsat"] <= objectives["heuristic"] <= objectives["cpsat"] + 2
+
+def test_heuristic_reports_unknown_when_it_cannot_staff():
+    engine = configure_engine(make_payload(2, 3, coverage=coverage(1), engine="heuristic"))
+    engine.build_model()
+    assert engine.solve() is None
+    assert engine.stats["status"] == "UNKNOWN"
+
+def test_generate_with_heuristic_engine(client, db, admin_token_headers):
+    for i in range(5):
+        db.add(User(username=f"heur_doc{i}", role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+
+    resp = client.post("/schedules/generate?start_date=2026-11-02&days=7&engine=heuristic", headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["status"] == "FEASIBLE"
+    assert len(resp.json()["schedules"]) == 14
+    resp = client.post("/schedules/generate?start_date=2026-11-02&days=7&engine=greedy", headers=admin_token_headers)
+    assert resp.status_code == 422
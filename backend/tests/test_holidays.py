@@ -0,0 +1,58 @@
+from datetime import date
+from app.models import Holiday
+from app.core.holidays import parse_csv, parse_ics, calendar_cache, is_rest_day
+from app.core.scheduler import SchedulingEngine
+from tests.test_scheduler import make_doctors, make_shift_types
+
+ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20261001
+DTEND;VALUE=DATE:20261004
+SUMMARY:国庆节
+END:VEVENT
+BEGIN:VEVENT
+DTSTART;VALUE=DATE:20261010
+SUMMARY:国庆节补班
+END:VEVENT
+END:VCALENDAR
+"""
+
+def test_parse_csv_and_ics():
+    assert parse_csv("date,name,kind\n2026-01-01,元旦\n2026-02-14,春节调休,workday\n") == [
+        {"date": date(2026, 1, 1), "name": "元旦", "kind": "holiday"},
+        {"date": date(2026, 2, 14), "name": "春节调休", "kind": "workday"},
+    ]
+    entries = parse_ics(ICS)
+    assert [(e["date"], e["kind"]) for e in entries] == [
+        (date(2026, 10, 1), "holiday"), (date(2026, 10, 2), "holiday"), (date(2026, 10, 3), "holiday"),
+        (date(2026, 10, 10), "workday"),
+    ]
+
+def test_import_and_crud_invalidate_the_cache(client, db, admin_token_headers):
+    assert calendar_cache.get(db) == {}
+    response = client.post("/holidays/import", files={"file": ("2026.ics", ICS.encode(), "text/calendar")}, headers=admin_token_headers)
+    assert response.status_code == 200
+    assert response.json() == {"created": 4, "updated": 0, "holidays": 3, "workdays": 1}
+    calendar = calendar_cache.get(db)
+    assert calendar[date(2026, 10, 10)] == "workday"
+    assert is_rest_day(date(2026, 10, 2), calendar) and not is_rest_day(date(2026, 10, 10), calendar)
+
+    holiday_id = db.query(Holiday).filter(Holiday.date == date(2026, 10, 3)).one().id
+    response = client.put(f"/holidays/{holiday_id}", json={"kind": "workday"}, headers=admin_token_headers)
+    assert response.status_code == 200
+    assert calendar_cache.get(db)[date(2026, 10, 3)] == "workday"
+    assert client.delete(f"/holidays/{holiday_id}", headers=admin_token_headers).status_code == 200
+    assert date(2026, 10, 3) not in calendar_cache.get(db)
+
+    response = client.post("/holidays/", json={"date": "2026-10-01", "name": "dup"}, headers=admin_token_headers)
+    assert response.status_code == 400
+    response = client.post("/holidays/import", files={"file": ("bad.csv", b"not-a-date,x\n", "text/csv")}, headers=admin_token_headers)
+    assert response.status_code == 400
+    assert [h["date"] for h in client.get("/holidays/?year=2026", headers=admin_token_headers).json()] == ["2026-10-01", "2026-10-02", "2026-10-10"]
+
+def test_engine_weekend_counter_follows_the_calendar():
+    # 2026-10-01 is a Thursday; 10-03 / 10-04 a weekend, 10-10 a Saturday
+    engine = SchedulingEngine(make_doctors(3), make_shift_types(), date(2026, 10, 1), 14)
+    assert engine.rest_days() == [2, 3, 9, 10]
+    engine.set_calendar(holidays=[date(2026, 10, 1), date(2026, 10, 2)], workdays=[date(2026, 10, 10)])
+    assert engine.rest_days() == [0, 1, 2, 3, 10]
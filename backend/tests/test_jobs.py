@@ -0,0 +1,111 @@
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import User, RoleEnum, ShiftType, Schedule, JobStatus, GenerationJob, CoverageRequirement
+from app.core.generation import load_generation_inputs
+from app.core import jobs
+from app.core.jobs import JobManager, wait_for_job, reap_stale_jobs
+
+def test_job_runs_in_process_pool_and_saves_drafts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(4):
+        db.add(User(username=f"job_doc{i}", role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+
+    payload = load_generation_inputs(db, date(2026, 2, 2), 7)
+    manager = JobManager(max_workers=1)
+    job = manager.submit(db, payload, {"start_date": "2026-02-02", "days": 7}, {"time_limit": 10, "num_workers": 1})
+    assert job.status == JobStatus.QUEUED
+
+    job = wait_for_job(db, job.id)
+    assert job.status == JobStatus.COMPLETED, job.error
+    assert job.started_at is not None
+    assert len(job.result["schedule_ids"]) == 14
+    assert db.query(Schedule).filter(Schedule.status == "draft").count() == 14
+    assert job.result["cache_hit"] is False
+
+    # Identical inputs are answered from the worker's result cache without a solve
+    again = manager.submit(db, payload, {"start_date": "2026-02-02", "days": 7}, {"time_limit": 10, "num_workers": 1})
+    assert again.status == JobStatus.COMPLETED and again.result["cache_hit"] is True
+    db.close()
+
+def test_cancel_stops_a_running_solve(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    for i in range(60):
+        db.add(User(username=f"cancel_doc{i}", role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00", weight=2))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night", weight=3))
+    db.commit()
+
+    # Large enough that the solver uses its whole budget without proving optimality
+    payload = load_generation_inputs(db, date(2026, 3, 2), 56)
+    manager = JobManager(max_workers=1)
+    job = manager.submit(db, payload, {"start_date": "2026-03-02", "days": 56}, {"time_limit": 60, "num_workers": 1})
+    deadline = time.time() + 30
+    while job.status != JobStatus.RUNNING and time.time() < deadline:
+        time.sleep(0.2)
+        db.expire_all()
+        job = db.get(GenerationJob, job.id)
+    assert job.status == JobStatus.RUNNING
+
+    t0 = time.time()
+    manager.request_cancel(db, job)
+    job = wait_for_job(db, job.id)
+    # CANCELLED is only written once the worker's solve has returned: should_stop cut the
+    # 60 s budget short
+    assert job.status == JobStatus.CANCELLED
+    assert time.time() - t0 < 20
+    assert job.finished_at is not None and job.result is None
+    assert db.query(Schedule).count() == 0
+    db.close()
+
+def test_jobs_of_a_dead_worker_are_reaped(db):
+    old = datetime.utcnow() - timedelta(hours=1)
+    db.add_all([
+        GenerationJob(id="orphan", status=JobStatus.RUNNING, params={}, heartbeat_at=old),
+        GenerationJob(id="orphan-queued", status=JobStatus.QUEUED, params={}, created_at=old),
+        GenerationJob(id="alive", status=JobStatus.RUNNING, params={}, heartbeat_at=datetime.utcnow()),
+        GenerationJob(id="done", status=JobStatus.COMPLETED, params={}, heartbeat_at=old),
+    ])
+    db.commit()
+    assert reap_stale_jobs(db) == 2
+    statuses = {job.id: job.status for job in db.query(GenerationJob)}
+    assert statuses == {"orphan": "failed", "orphan-queued": "failed", "alive": "running", "done": "completed"}
+
+def test_status_polls_reap_at_most_once_per_interval(client, db, admin_token_headers, monkeypatch):
+    monkeypatch.setattr(jobs, "_last_reap", 0.0)
+    old = datetime.utcnow() - timedelta(hours=1)
+    db.add(GenerationJob(id="polled", status=JobStatus.RUNNING, params={}, heartbeat_at=old))
+    db.commit()
+    resp = client.get("/schedules/jobs/polled", headers=admin_token_headers)
+    assert resp.json()["status"] == "failed"
+
+    db.add(GenerationJob(id="polled-later", status=JobStatus.RUNNING, params={}, heartbeat_at=old))
+    db.commit()
+    # Within the interval the poll only reads the row
+    resp = client.get("/schedules/jobs/polled-later", headers=admin_token_headers)
+    assert resp.json()["status"] == "running"
+
+def test_infeasible_job_is_rejected_before_queueing(client, db, admin_token_headers):
+    db.add(User(username="job_lonely", role=RoleEnum.DOCTOR))
+    shift = ShiftType(name="Job Day", start_time="08:00", end_time="17:00")
+    db.add(shift)
+    db.flush()
+    db.add(CoverageRequirement(shift_type_id=shift.id, min_count=3))
+    db.commit()
+    resp = client.post("/schedules/jobs", json={"start_date": "2026-02-02", "days": 7}, headers=admin_token_headers)
+    assert resp.status_code == 400
+    assert resp.json()["detail"]["issues"]
+    assert db.query(GenerationJob).count() == 0
+
+def test_unknown_job_returns_404(client, admin_token_headers):
+    resp = client.get("/schedules/jobs/does-not-exist", headers=admin_token_headers)
+    assert resp.status_code == 404
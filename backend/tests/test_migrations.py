@@ -0,0 +1,94 @@
+import os
+from alembic import command
+from alembic.config import Config
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from datetime import date
+from sqlalchemy.orm import Session
+from app.api.stats import workload_stats
+from app.database import Base
+from app.models import Schedule
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_SCHEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_schema.sql")
+NEW_INDEXES = {
+    "schedules": {"ix_schedules_doctor_date", "ix_schedules_status_date", "uq_schedules_date_shift_doctor"},
+    "users": {"ix_users_department_id"},
+    "notifications": {"ix_notifications_user_read_created"},
+}
+NEW_TABLES = {"workload_daily", "holidays", "duty_rates", "generation_jobs", "coverage_requirements", "department_rules"}
+
+def alembic_config(connection):
+    config = Config(os.path.join(BACKEND, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND, "migrations"))
+    config.attributes["connection"] = connection
+    return config
+
+def upgrade(engine, revision="head"):
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), revision)
+
+def index_names(engine, table):
+    return {ix["name"] for ix in inspect(engine).get_indexes(table)}
+
+def schema_drift(engine):
+    with engine.connect() as connection:
+        return compare_metadata(MigrationContext.configure(connection), Base.metadata)
+
+def baseline_database(tmp_path):
+    """A database as the release before the migration series created it."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    connection = engine.raw_connection()
+    with open(BASELINE_SCHEMA, encoding="utf-8") as f:
+        connection.executescript(f.read())
+    connection.close()
+    return engine
+
+def test_upgrade_from_the_baseline_schema(tmp_path):
+    engine = baseline_database(tmp_path)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO shift_types (id, name, start_time, end_time, weight, shift_category) VALUES (1, 'Night', '20:00', '08:00', 1, 'night')"))
+        for _ in range(2):
+            connection.execute(text("INSERT INTO schedules (date, doctor_id, shift_type_id, status) VALUES ('2026-01-01', 1, 1, 'draft')"))
+        # A trade against the duplicate row that 0002 removes
+        connection.execute(text("INSERT INTO shift_trades (requester_id, request_shift_id, target_doctor_id, status) VALUES (1, 2, 2, 'pending')"))
+
+    upgrade(engine)
+    assert schema_drift(engine) == []
+    for table, names in NEW_INDEXES.items():
+        assert names <= index_names(engine, table)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM schedules")).scalar() == 1  # duplicate removed
+        assert connection.execute(text("SELECT request_shift_id FROM shift_trades")).scalar() == 1  # re-pointed to the kept row
+        # 0003 backfilled the rollup from the existing rows
+        assert connection.execute(text("SELECT doctor_id, total_shifts, night_shifts, hours FROM workload_daily")).all() == [(1, 1, 1, 12.0)]
+    with Session(engine) as db:
+        assert db.query(Schedule).one().updated_at is not None  # stamped by 0009
+
+    with engine.begin() as connection:
+        command.downgrade(alembic_config(connection), "0001")
+    assert not NEW_INDEXES["schedules"] & index_names(engine, "schedules")
+    assert not NEW_TABLES & set(inspect(engine).get_table_names())
+
+def test_upgrade_seeds_the_previously_hardcoded_holidays(tmp_path):
+    engine = baseline_database(tmp_path)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, username, role) VALUES (1, 'doc', 'DOCTOR')"))
+        connection.execute(text("INSERT INTO shift_types (id, name, start_time, end_time, weight, shift_category) VALUES (1, 'Day', '08:00', '17:00', 1, 'day')"))
+        for day in ("2025-10-01", "2025-10-02", "2025-10-08"):
+            connection.execute(text(f"INSERT INTO schedules (date, doctor_id, shift_type_id, status) VALUES ('{day}', 1, 1, 'published')"))
+
+    upgrade(engine)
+    with Session(engine) as db:
+        [row] = workload_stats(db, date(2025, 10, 1), date(2025, 10, 31))
+    assert row["total_shifts"] == 3
+    assert row["holiday_shifts"] == 2  # National Day, as the hardcoded list counted it
+    with engine.connect() as connection:
+        seeded = {d for (d,) in connection.execute(text("SELECT date FROM holidays"))}
+    assert {"2025-01-01", "2026-05-01", f"{date.today().year + 1}-10-03"} <= seeded
+
+def test_upgrade_creates_an_empty_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    upgrade(engine)
+    assert schema_drift(engine) == []
@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+import pytest
+from app.core.generation import run_generation
+from app.core.rolling import plan_rolling, plan_windows
+
+def make_payload(n_doctors, days, **extra):
+    return {
+        "doctors": [SimpleNamespace(id=i + 1, qualifications=frozenset()) for i in range(n_doctors)],
+        "shift_types": [
+            SimpleNamespace(id=1, name="Day Shift", weight=1),
+            SimpleNamespace(id=2, name="Night Shift", weight=2, shift_category="night"),
+        ],
+        "start_date": date(2026, 1, 1),
+        "days": days,
+        **extra,
+    }
+
+def test_plan_windows_overlap_and_cover_the_horizon():
+    assert plan_windows(90, 35, 28) == [(0, 35, 28), (28, 35, 28), (56, 34, 34)]
+    assert plan_rolling(30) is None
+    assert plan_rolling(90) == {"window_days": 35, "commit_days": 28}
+    assert plan_rolling(30, window_days=14, commit_days=7) == {"window_days": 14, "commit_days": 7}
+    with pytest.raises(ValueError):
+        plan_rolling(30, commit_days=7)  # would silently be a single model
+
+def test_rolling_generation_keeps_rules_across_window_boundaries():
+    payload = make_payload(5, 40, rolling={"window_days": 14, "commit_days": 10}, unavailable=[(1, 12), (1, 13)])
+    outcome = run_generation(payload, {"time_limit": 2, "num_workers": 2, "random_seed": 1})
+
+    results = outcome["results"]
+    assert [w["committed"] for w in outcome["stats"]["windows"]] == [10, 10, 10, 10]
+    cells = {(r["date"], r["shift_type_id"]) for r in results}
+    assert len(results) == len(cells) == 40 * 2
+
+    worked = {(r["doctor_id"], r["date"]): r["shift_type_id"] for r in results}
+    for (doctor_id, day), shift_type_id in worked.items():
+        if shift_type_id == 2:
+            assert (doctor_id, day + timedelta(days=1)) not in worked
+    assert not any(doc == 1 and day in (date(2026, 1, 13), date(2026, 1, 14)) for doc, day in worked)
+
+    # Carried counters keep the cumulative weighted load balanced over the whole horizon
+    load = {}
+    for r in results:
+        load[r["doctor_id"]] = load.get(r["doctor_id"], 0) + (2 if r["shift_type_id"] == 2 else 1)
+    assert max(load.values()) - min(load.values()) <= 3
+
+def test_rolling_windows_carry_duty_runs_and_weekly_nights():
+    rules = [
+        {"rule": "consecutive_duty_limit", "params": {"max_days": 2}},
+        {"rule": "max_nights_per_week", "params": {"max_nights": 2}},
+    ]
+    history = [(1, -2, 1), (1, -1, 1), (2, -3, 2), (3, -1, 2)]  # Thursday start: doctor 2 had Monday's night
+    payload = make_payload(5, 30, rolling={"window_days": 10, "commit_days": 5}, rules=rules, warm_start={"history": history, "previous_day": [(1, 1), (3, 2)]})
+    outcome = run_generation(payload, {"time_limit": 2, "num_workers": 2, "random_seed": 1})
+    assert outcome["results"] is not None, outcome["stats"]
+
+    start = payload["start_date"]
+    cells = [(doc, start + timedelta(days=d), st) for doc, d, st in history]
+    cells += [(r["doctor_id"], r["date"], r["shift_type_id"]) for r in outcome["results"]]
+    worked = {(doc, day) for doc, day, _ in cells}
+    nights = {}
+    for doc, day, shift_type_id in cells:
+        if shift_type_id == 2:
+            key = (doc, day.isocalendar()[:2])
+            nights[key] = nights.get(key, 0) + 1
+    for doctor_id, day in worked:
+        assert not all((doctor_id, day + timedelta(days=k)) in worked for k in range(3))
+    assert max(nights.values()) <= 2
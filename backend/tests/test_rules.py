@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+import pytest
+from app.core.scheduler import SchedulingEngine
+from app.core.heuristic import HeuristicEngine
+from app.core.rules import RULES, Rule, build_rule, register
+
+def make_engine(n_doctors, days, qualifications=None, start=date(2026, 1, 5), engine_class=SchedulingEngine):
+    doctors = [SimpleNamespace(id=i + 1, qualifications=frozenset((qualifications or {}).get(i + 1, ()))) for i in range(n_doctors)]
+    shift_types = [
+        SimpleNamespace(id=1, name="Day Shift", weight=1),
+        SimpleNamespace(id=2, name="Night Shift", weight=1, shift_category="night"),
+    ]
+    return engine_class(doctors, shift_types, start, days)
+
+def solve(engine):
+    engine.build_model()
+    results = engine.solve(time_limit=5, num_workers=2, random_seed=1)
+    assert results is not None, engine.stats
+    return results
+
+def test_build_rule_validates_parameters():
+    with pytest.raises(ValueError):
+        build_rule("no_such_rule")
+    with pytest.raises(ValueError):
+        build_rule("consecutive_duty_limit", {"max_days": 0})
+    with pytest.raises(ValueError):
+        build_rule("mutual_exclusion", {"doctor_ids": [1, 1]})
+    assert build_rule("max_nights_per_week", {"max_nights": 1}).max_nights == 1
+
+def test_incomplete_rule_fails_when_built(monkeypatch):
+    monkeypatch.setattr("app.core.rules.RULES", dict(RULES))
+
+    @register
+    class ApplyOnly(Rule):
+        name = "apply_only"
+
+        def apply(self, engine, day_vars):
+            pass
+
+    with pytest.raises(TypeError, match="violations"):
+        build_rule("apply_only")
+    with pytest.raises(TypeError):
+        ApplyOnly()
+
+def test_consecutive_duty_and_weekly_night_limits():
+    engine = make_engine(4, 14)
+    engine.set_rules([build_rule("consecutive_duty_limit", {"max_days": 2}), build_rule("max_nights_per_week", {"max_nights": 2})])
+    results = solve(engine)
+
+    worked = {(r["doctor_id"], r["date"]) for r in results}
+    for doctor_id, day in worked:
+        assert not all((doctor_id, day + timedelta(days=k)) in worked for k in range(3))
+    nights = {}
+    for r in results:
+        if r["shift_type_id"] == 2:
+            key = (r["doctor_id"], r["date"].isocalendar()[1])
+            nights[key] = nights.get(key, 0) + 1
+    assert max(nights.values()) <= 2
+
+    costs = {c["rule"]: c for c in engine.stats["rules"]}
+    assert costs["consecutive_duty_limit"]["constraints"] == 4 * (14 - 2)
+    assert costs["max_nights_per_week"]["constraints"] == 4 * 2
+    assert {"variables", "coverage", "night_rest", "fairness"} <= set(costs)
+
+@pytest.mark.parametrize("engine_class", [SchedulingEngine, HeuristicEngine])
+def test_duty_and_night_limits_count_the_days_before_start(engine_class):
+    # Thursday start: doctor 1 is ending a three-day run, doctor 2 already had Monday's night
+    engine = make_engine(3, 2, start=date(2026, 1, 8), engine_class=engine_class)
+    engine.set_warm_start(history=[(1, -3, 1), (1, -2, 1), (1, -1, 1), (2, -3, 2)])
+    engine.set_rules([build_rule("consecutive_duty_limit", {"max_days": 3}), build_rule("max_nights_per_week", {"max_nights": 1})])
+    results = solve(engine)
+
+    assert sorted((r["date"].day, r["shift_type_id"], r["doctor_id"]) for r in results) == [(8, 1, 2), (8, 2, 3), (9, 1, 2), (9, 2, 1)]
+
+def test_mutual_exclusion_and_qualification_pairing():
+    engine = make_engine(5, 7, qualifications={1: {"主治医师"}, 2: {"主治医师"}})
+    engine.set_coverage([SimpleNamespace(shift_type_id=1, department_id=None, weekday=None, date=None, min_count=2, max_count=None, qualification=None)])
+    engine.set_rules([
+        build_rule("mutual_exclusion", {"doctor_ids": [1, 2], "scope": "day"}),
+        build_rule("qualification_pairing", {"qualification": "主治医师", "shift_type_ids": [1]}),
+    ])
+    results = solve(engine)
+
+    on_day = {}
+    for r in results:
+        on_day.setdefault((r["date"], r["shift_type_id"]), set()).add(r["doctor_id"])
+    for (day, shift_type_id), docs in on_day.items():
+        assert not {1, 2} <= docs
+        if shift_type_id == 1:
+            assert docs & {1, 2}
+
+def test_department_rule_api_and_loader(client, db, admin_token_headers):
+    from app.models import Department
+    from app.core.generation import load_rules
+    dept = Department(name="rules_dept")
+    db.add(dept)
+    db.commit()
+
+    bad = client.post("/department-rules/", json={"rule": "max_nights_per_week", "params": {"max_nights": -1}}, headers=admin_token_headers)
+    assert bad.status_code == 400
+    assert client.post("/department-rules/", json={"rule": "max_nights_per_week", "params": {"max_nights": 2}}, headers=admin_token_headers).status_code == 200
+    assert client.post("/department-rules/", json={"rule": "consecutive_duty_limit", "params": {"max_days": 5}}, headers=admin_token_headers).status_code == 200
+    override = client.post(
+        "/department-rules/",
+        json={"department_id": dept.id, "rule": "max_nights_per_week", "params": {"max_nights": 3}},
+        headers=admin_token_headers
+    ).json()
+    disable = client.post(
+        "/department-rules/",
+        json={"department_id": dept.id, "rule": "consecutive_duty_limit", "enabled": False},
+        headers=admin_token_headers
+    )
+    assert disable.status_code == 200
+
+    assert load_rules(db, dept.id) == [{"rule": "max_nights_per_week", "params": {"max_nights": 3}}]
+    assert len(load_rules(db)) == 2
+    assert client.put(f"/department-rules/{override['id']}", json={"enabled": False}, headers=admin_token_headers).status_code == 200
+    assert load_rules(db, dept.id) == []
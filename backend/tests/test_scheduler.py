@@ -0,0 +1,156 @@
+from datetime import date
+from types import SimpleNamespace
+from app.core.scheduler import SchedulingEngine, is_night_shift
+
+def make_doctors(n):
+    return [SimpleNamespace(id=i + 1, name=f"doc{i + 1}") for i in range(n)]
+
+def make_shift_types():
+    return [
+        SimpleNamespace(id=1, name="Day Shift", start_time="08:00", end_time="17:00"),
+        SimpleNamespace(id=2, name="Night Shift", start_time="17:00", end_time="08:00", shift_category="night"),
+    ]
+
+def test_solve_returns_stats_and_full_coverage():
+    engine = SchedulingEngine(make_doctors(6), make_shift_types(), date(2026, 1, 1), 7)
+    engine.build_model()
+    results = engine.solve(time_limit=5, num_workers=2, random_seed=1)
+
+    assert results is not None
+    assert len(results) == 7 * 2
+    assert engine.stats["status"] in ("OPTIMAL", "FEASIBLE")
+    assert engine.stats["wall_time"] < 5
+
+def test_night_shift_blocks_next_day():
+    engine = SchedulingEngine(make_doctors(4), make_shift_types(), date(2026, 1, 1), 10)
+    engine.build_model()
+    results = engine.solve(time_limit=5, num_workers=2)
+
+    worked = {(r["doctor_id"], r["date"]): r["shift_type_id"] for r in results}
+    for (doctor_id, day), shift_type_id in worked.items():
+        if shift_type_id == 2:
+            assert (doctor_id, date.fromordinal(day.toordinal() + 1)) not in worked
+
+def test_night_shift_predicate_prefers_the_category_over_the_name():
+    assert is_night_shift(SimpleNamespace(name="Day", shift_category="night"))
+    assert is_night_shift(SimpleNamespace(name="夜班", shift_category=None))
+    assert is_night_shift(SimpleNamespace(name="Night Shift", shift_category="day"))  # column default on legacy rows
+    assert not is_night_shift(SimpleNamespace(name="小夜", shift_category="evening"))
+    assert not is_night_shift(SimpleNamespace(name="Day Shift", shift_category="day"))
+
+def test_infeasible_returns_none():
+    # One doctor cannot cover a day and a night shift on the same day
+    engine = SchedulingEngine(make_doctors(1), make_shift_types(), date(2026, 1, 1), 2)
+    engine.build_model()
+    assert engine.solve(time_limit=5, num_workers=1) is None
+    assert engine.stats["status"] == "INFEASIBLE"
+
+def test_model_has_one_night_rest_row_per_doctor_day():
+    engine = SchedulingEngine(make_doctors(5), make_shift_types(), date(2026, 1, 1), 10)
+    engine.fairness_weights = {}
+    engine.build_model()
+    size = engine.model_size()
+    assert size["variables"] == 5 * 10 * 2
+    # coverage (day x shift) + one-shift-per-day (doctor x day) + night rest (doctor x day-1)
+    assert size["constraints"] == 10 * 2 + 5 * 10 + 5 * 9
+
+def test_warm_start_fixes_published_and_blocks_day_after_boundary_night():
+    engine = SchedulingEngine(make_doctors(4), make_shift_types(), date(2026, 1, 1), 5)
+    engine.set_warm_start(fixed=[(3, 2, 1)], previous_day=[(1, 2), (2, 1)])
+    engine.build_model()
+    results = engine.solve(time_limit=5, num_workers=2)
+
+    assigned = {(r["doctor_id"], (r["date"] - date(2026, 1, 1)).days, r["shift_type_id"]) for r in results}
+    assert (3, 2, 1) in assigned
+    # doctor 1 worked the night before start_date, doctor 2 only a day shift
+    assert not any(doc == 1 and day == 0 for doc, day, _ in assigned)
+
+def test_warm_start_keeps_current_draft():
+    first = SchedulingEngine(make_doctors(6), make_shift_types(), date(2026, 1, 1), 14)
+    first.build_model()
+    draft = [(r["doctor_id"], (r["date"] - date(2026, 1, 1)).days, r["shift_type_id"]) for r in first.solve(time_limit=5, num_workers=2)]
+
+    second = SchedulingEngine(make_doctors(6), make_shift_types(), date(2026, 1, 1), 14)
+    second.set_warm_start(hints=draft, keep=draft)
+    second.build_model()
+    results = second.solve(time_limit=5, num_workers=2)
+
+    assert second.stats["objective"] == first.stats["objective"]  # nothing changed
+    assert {(r["doctor_id"], (r["date"] - date(2026, 1, 1)).days, r["shift_type_id"]) for r in results} == set(draft)
+
+def test_coverage_rules_set_headcount_per_weekday_and_qualification():
+    doctors = make_doctors(12)
+    for doc in doctors[:3]:
+        doc.qualifications = frozenset({"主治医师"})
+    coverage = [
+        # Day shift: 3 doctors on weekdays, 2 on weekends
+        SimpleNamespace(shift_type_id=1, department_id=None, weekday=None, date=None, min_count=3, max_count=None, qualification=None),
+        SimpleNamespace(shift_type_id=1, department_id=None, weekday=5, date=None, min_count=2, max_count=None, qualification=None),
+        SimpleNamespace(shift_type_id=1, department_id=None, weekday=6, date=None, min_count=2, max_count=None, qualification=None),
+        # Night shift: at least one attending
+        SimpleNamespace(shift_type_id=2, department_id=None, weekday=None, date=None, min_count=1, max_count=None, qualification="主治医师"),
+    ]
+    # 2026-01-05 is a Monday
+    engine = SchedulingEngine(doctors, make_shift_types(), date(2026, 1, 5), 7)
+    engine.set_coverage(coverage)
+    engine.build_model()
+    results = engine.solve(time_limit=5, num_workers=2)
+
+    attendings = {doc.id for doc in doctors[:3]}
+    for day in range(7):
+        current = date(2026, 1, 5 + day)
+        day_shift = [r for r in results if r["date"] == current and r["shift_type_id"] == 1]
+        night_shift = [r for r in results if r["date"] == current and r["shift_type_id"] == 2]
+        assert len(day_shift) == (2 if current.weekday() >= 5 else 3)
+        assert len(night_shift) == 1
+        assert night_shift[0]["doctor_id"] in attendings
+
+def test_avoid_preferences_and_qualifications_remove_variables():
+    doctors = make_doctors(4)
+    for doc in doctors:
+        doc.qualifications = frozenset({"ICU"}) if doc.id <= 2 else frozenset()
+    shift_types = make_shift_types()
+    shift_types[1].required_qualification = "ICU"
+    engine = SchedulingEngine(doctors, shift_types, date(2026, 1, 1), 5)
+    engine.set_preferences([(1, 0, "avoid", None), (2, 1, "avoid", 2)])
+    engine.fairness_weights = {}
+    engine.build_model()
+
+    # doctors 3/4 get no night variables, doctor 1 none on day 0, doctor 2 no night on day 1
+    assert engine.model_size()["variables"] == 4 * 5 * 2 - 2 * 5 - 2 - 1
+    results = engine.solve(time_limit=5, num_workers=2)
+    assigned = {(r["doctor_id"], (r["date"] - date(2026, 1, 1)).days, r["shift_type_id"]) for r in results}
+    assert all(doc in (1, 2) for doc, _, shift in assigned if shift == 2)
+    assert not any(doc == 1 and day == 0 for doc, day, _ in assigned)
+    assert (2, 1, 2) not in assigned
+
+def test_desire_preferences_are_granted():
+    engine = SchedulingEngine(make_doctors(6), make_shift_types(), date(2026, 1, 1), 7)
+    desires = [(3, 2, "desire", 2), (5, 4, "desire", None)]
+    engine.set_preferences(desires)
+    engine.build_model()
+    results = engine.solve(time_limit=5, num_workers=2)
+
+    assigned = {(r["doctor_id"], (r["date"] - date(2026, 1, 1)).days, r["shift_type_id"]) for r in results}
+    assert (3, 2, 2) in assigned
+    assert any(doc == 5 and day == 4 for doc, day, _ in assigned)
+
+def test_fairness_balances_weighted_load_nights_and_carry_over():
+    shift_types = make_shift_types()
+    shift_types[1].weight = 2
+    engine = SchedulingEngine(make_doctors(4), shift_types, date(2026, 1, 5), 14)
+    # doctor 1 already did two extra nights last month
+    engine.set_balances({1: (4, 2, 0)})
+    engine.build_model()
+    results = engine.solve(time_limit=10, num_workers=4, random_seed=1)
+    assert engine.stats["status"] == "OPTIMAL"
+
+    nights = {doc.id: 0 for doc in make_doctors(4)}
+    load = dict.fromkeys(nights, 0)
+    for r in results:
+        load[r["doctor_id"]] += 2 if r["shift_type_id"] == 2 else 1
+        nights[r["doctor_id"]] += r["shift_type_id"] == 2
+    load[1] += 4
+    nights[1] += 2
+    assert max(load.values()) - min(load.values()) <= 1
+    assert max(nights.values()) - min(nights.values()) <= 1
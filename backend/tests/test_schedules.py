@@ -1,6 +1,6 @@
 import pytest
 from datetime import date
-from app.models import User, RoleEnum, ShiftType, ShiftTrade, Schedule, TradeStatus
+from app.models import User, RoleEnum, ShiftType, ShiftTrade, Schedule, TradeStatus, DepartmentRule, Department
 from app.core.security import get_password_hash
 
 def test_generate_schedule_permission(client):
@@ -52,3 +52,356 @@ def test_create_trade_flow(client, db):
     resp = client.put(f"/trades/{trade_id}/respond?action=accept", headers=headersB)
     assert resp.status_code == 200
     assert resp.json()["status"] == "accepted"
+
+def test_generate_schedule_reports_solver_stats(client, db, admin_token_headers):
+    pwd = get_password_hash("pass")
+    for i in range(4):
+        db.add(User(username=f"gen_doc{i}", hashed_password=pwd, role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+
+    resp = client.post(
+        "/schedules/generate?start_date=2026-03-02&days=7&time_limit=5&num_workers=2",
+        headers=admin_token_headers
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["status"] in ("OPTIMAL", "FEASIBLE")
+    assert len(data["schedules"]) == 14
+    assert data["wall_time"] <= 5
+
+def test_regenerate_replaces_drafts_instead_of_duplicating(client, db, admin_token_headers):
+    for i in range(4):
+        db.add(User(username=f"regen_doc{i}", role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+
+    url = "/schedules/generate?start_date=2026-05-04&days=7&time_limit=5"
+    first = client.post(url, headers=admin_token_headers)
+    assert first.status_code == 200
+    resp = client.post(url, headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["objective"] == first.json()["objective"]  # nothing changed
+    assert db.query(Schedule).filter(Schedule.date >= date(2026, 5, 4)).count() == 14
+
+def test_repair_absence_changes_only_affected_cells(client, db, admin_token_headers):
+    for i in range(6):
+        db.add(User(username=f"rep_doc{i}", role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+    resp = client.post("/schedules/generate?start_date=2026-06-01&days=14&time_limit=5", headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+
+    absent = db.query(Schedule).filter(Schedule.date == date(2026, 6, 7)).first()
+    payload = {
+        "doctor_id": absent.doctor_id,
+        "start_date": "2026-06-07",
+        "end_date": "2026-06-07",
+        "neighbourhood_days": 2,
+    }
+    resp = client.post("/schedules/repair", json=payload, headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["applied"]
+    assert any(r["doctor_id"] == absent.doctor_id for r in data["removed"])
+    assert len(data["added"]) == len(data["removed"])
+    assert all(date(2026, 6, 5) <= date.fromisoformat(r["date"]) <= date(2026, 6, 9) for r in data["added"])
+
+    db.expire_all()
+    day_rows = db.query(Schedule).filter(Schedule.date == date(2026, 6, 7)).all()
+    assert len(day_rows) == 2
+    assert absent.doctor_id not in {r.doctor_id for r in day_rows}
+
+def test_repair_keeps_traded_rows_valid(client, db, admin_token_headers):
+    from app.models import Notification
+    for i in range(6):
+        db.add(User(username=f"trade_rep_doc{i}", role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+    assert client.post("/schedules/generate?start_date=2026-06-01&days=14&time_limit=5", headers=admin_token_headers).status_code == 200
+    assert client.post("/schedules/publish?start_date=2026-06-01&end_date=2026-06-14", headers=admin_token_headers).status_code == 200
+
+    absent = db.query(Schedule).filter(Schedule.date == date(2026, 6, 7)).first()
+    neighbour = db.query(Schedule).filter(Schedule.date == date(2026, 6, 8), Schedule.doctor_id != absent.doctor_id).first()
+    pending = ShiftTrade(requester_id=absent.doctor_id, request_shift_id=absent.id, target_doctor_id=neighbour.doctor_id)
+    approved = ShiftTrade(requester_id=absent.doctor_id, request_shift_id=neighbour.id, target_doctor_id=neighbour.doctor_id, status=TradeStatus.APPROVED)
+    db.add_all([pending, approved])
+    db.commit()
+    absent_doctor, neighbour_doctor = absent.doctor_id, neighbour.doctor_id
+
+    payload = {"doctor_id": absent_doctor, "start_date": "2026-06-07", "end_date": "2026-06-07", "time_limit": 5}
+    resp = client.post("/schedules/repair", json=payload, headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    assert [r["id"] for r in resp.json()["removed"]] == [absent.id]
+
+    db.expire_all()
+    # The traded row is handed over in place, so the trade still points at an existing shift
+    row = db.get(Schedule, absent.id)
+    assert row is not None and row.doctor_id != absent_doctor and row.status == "published"
+    assert db.get(ShiftTrade, pending.id).status == TradeStatus.CANCELLED
+    assert db.query(Notification).filter(Notification.user_id == absent_doctor).count() == 1
+    # Traded rows of other doctors are fixed in the repair window
+    assert db.get(Schedule, neighbour.id).doctor_id == neighbour_doctor
+
+def test_repair_hospital_wide_roster(client, db, admin_token_headers):
+    departments = [Department(name=f"rep_dept{i}") for i in range(2)]
+    db.add_all(departments)
+    db.flush()
+    for i in range(6):
+        db.add(User(username=f"wide_doc{i}", role=RoleEnum.DOCTOR, department_id=departments[i % 2].id))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+    resp = client.post("/schedules/generate?start_date=2026-06-01&days=14&time_limit=5", headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+
+    absent = db.query(Schedule).filter(Schedule.date == date(2026, 6, 7)).first()
+    payload = {"doctor_id": absent.doctor_id, "start_date": "2026-06-07", "end_date": "2026-06-07", "time_limit": 5}
+    # Both departments are rostered around the absence: the scope has to be chosen
+    resp = client.post("/schedules/repair", json=payload, headers=admin_token_headers)
+    assert resp.status_code == 400
+    assert "department_id or hospital_wide" in resp.json()["detail"]
+
+    resp = client.post("/schedules/repair", json={**payload, "hospital_wide": True}, headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert [(r["date"], r["doctor_id"]) for r in data["removed"]] == [("2026-06-07", absent.doctor_id)]
+    assert [(r["date"], r["shift_type_id"]) for r in data["added"]] == [("2026-06-07", absent.shift_type_id)]
+
+def test_repair_does_not_rebalance_kept_cells(client, db, admin_token_headers):
+    docs = [User(username=f"lopsided_doc{i}", role=RoleEnum.DOCTOR) for i in range(4)]
+    st = ShiftType(name="Day", start_time="08:00", end_time="17:00", weight=3)
+    db.add_all(docs + [st])
+    db.commit()
+    # Two doctors carry the whole fortnight; a balanced roster exists but only Sunday needs filling
+    for d in range(1, 14):
+        if d != 7:
+            heavy = docs[0] if d < 7 else docs[2]
+            db.add(Schedule(date=date(2026, 6, d), doctor_id=heavy.id, shift_type_id=st.id, status="draft"))
+    db.add(Schedule(date=date(2026, 6, 7), doctor_id=docs[1].id, shift_type_id=st.id, status="draft"))
+    db.commit()
+
+    payload = {
+        "doctor_id": docs[1].id,
+        "start_date": "2026-06-07",
+        "end_date": "2026-06-07",
+        "neighbourhood_days": 6,
+        "time_limit": 5,
+        "apply": False,
+    }
+    resp = client.post("/schedules/repair", json=payload, headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert [(r["date"], r["doctor_id"]) for r in data["removed"]] == [("2026-06-07", docs[1].id)]
+    assert [r["date"] for r in data["added"]] == ["2026-06-07"]
+
+def test_bulk_save_skips_existing_rows(db):
+    from app.core.generation import save_generated_schedules
+    doc = User(username="bulk_doc", role=RoleEnum.DOCTOR)
+    st = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add_all([doc, st])
+    db.commit()
+    db.add(Schedule(date=date(2026, 7, 1), doctor_id=doc.id, shift_type_id=st.id, status="published"))
+    db.commit()
+
+    results = [{"date": date(2026, 7, d), "doctor_id": doc.id, "shift_type_id": st.id} for d in (1, 2, 3)]
+    saved = save_generated_schedules(db, results)
+    assert sorted(r.date.day for r in saved) == [2, 3]
+    assert all(r.status == "draft" for r in saved)
+    assert save_generated_schedules(db, results) == []
+    assert db.query(Schedule).filter(Schedule.doctor_id == doc.id).count() == 3
+
+def test_regeneration_keeps_traded_drafts(db):
+    from app.core.generation import save_generated_schedules, attach_warm_start, load_generation_inputs
+    a, b = (User(username=f"traded_draft_doc{i}", role=RoleEnum.DOCTOR) for i in range(2))
+    st = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add_all([a, b, st])
+    db.commit()
+    traded, stale = (Schedule(date=date(2026, 7, d), doctor_id=a.id, shift_type_id=st.id, status="draft") for d in (6, 7))
+    db.add_all([traded, stale])
+    db.commit()
+    trade = ShiftTrade(requester_id=a.id, request_shift_id=traded.id, target_doctor_id=b.id)
+    db.add(trade)
+    db.commit()
+
+    payload = attach_warm_start(db, load_generation_inputs(db, date(2026, 7, 6), 2))
+    assert payload["warm_start"]["fixed"] == [(a.id, 0, st.id)]
+
+    # A result without either draft: only the untraded one is replaced
+    results = [{"date": date(2026, 7, d), "doctor_id": b.id, "shift_type_id": st.id} for d in (6, 7)]
+    save_generated_schedules(db, results, replace_drafts_for=payload)
+    remaining = {row.id for row in db.query(Schedule).filter(Schedule.doctor_id == a.id)}
+    assert remaining == {traded.id}
+    assert db.get(ShiftTrade, trade.id).request_shift_id == traded.id
+
+def test_load_balances_carries_previous_weeks(db):
+    from app.core.generation import load_balances, load_shift_types
+    docs = [User(username=f"carry_doc{i}", role=RoleEnum.DOCTOR) for i in range(2)]
+    day = ShiftType(name="Day", start_time="08:00", end_time="17:00", weight=1)
+    night = ShiftType(name="Night", start_time="17:00", end_time="08:00", weight=2, shift_category="night")
+    db.add_all(docs + [day, night])
+    db.commit()
+    # Saturday night + Monday day for doc0, one Tuesday day for doc1
+    db.add_all([
+        Schedule(date=date(2026, 8, 1), doctor_id=docs[0].id, shift_type_id=night.id),
+        Schedule(date=date(2026, 8, 3), doctor_id=docs[0].id, shift_type_id=day.id),
+        Schedule(date=date(2026, 8, 4), doctor_id=docs[1].id, shift_type_id=day.id),
+        Schedule(date=date(2026, 8, 10), doctor_id=docs[1].id, shift_type_id=night.id),  # inside the horizon
+    ])
+    db.commit()
+
+    balances = load_balances(db, [d.id for d in docs], load_shift_types(db), date(2026, 8, 10))
+    assert balances == {docs[0].id: (2, 1, 1)}
+
+def test_warm_start_loads_the_history_rules_look_back_at(db):
+    from app.core.generation import load_generation_inputs, attach_warm_start
+    doc = User(username="history_doc", role=RoleEnum.DOCTOR)
+    st = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add_all([doc, st])
+    db.commit()
+    for day in (1, 5, 7, 9, 10):
+        db.add(Schedule(date=date(2026, 9, day), doctor_id=doc.id, shift_type_id=st.id, status="published"))
+    db.commit()
+
+    payload = attach_warm_start(db, load_generation_inputs(db, date(2026, 9, 10), 3))
+    assert payload["warm_start"]["history"] == []
+    db.add(DepartmentRule(rule="consecutive_duty_limit", params={"max_days": 5}))
+    db.commit()
+    payload = attach_warm_start(db, load_generation_inputs(db, date(2026, 9, 10), 3))
+    history = payload["warm_start"]["history"]
+    assert sorted(d for doctor_id, d, _ in history if doctor_id == doc.id) == [-5, -3, -1]
+    assert payload["warm_start"]["previous_day"] == [(doc.id, st.id)]
+
+def test_identical_generate_is_served_from_cache(client, db, admin_token_headers):
+    for i in range(4):
+        db.add(User(username=f"cache_doc{i}", role=RoleEnum.DOCTOR))
+    db.add(ShiftType(name="Day", start_time="08:00", end_time="17:00"))
+    db.add(ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+
+    url = "/schedules/generate?start_date=2026-09-07&days=7&time_limit=5&random_seed=3"
+    first = client.post(url, headers=admin_token_headers).json()
+    second = client.post(url, headers=admin_token_headers).json()
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert db.query(Schedule).filter(Schedule.date >= date(2026, 9, 7)).count() == 14
+
+    # Editing a draft changes the warm-start state, so the cached roster is not reused
+    sched = db.query(Schedule).filter(Schedule.date == date(2026, 9, 7)).first()
+    db.delete(sched)
+    db.commit()
+    third = client.post(url, headers=admin_token_headers).json()
+    assert third["cache_hit"] is False
+
+    stats = client.get("/schedules/generate/cache", headers=admin_token_headers).json()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+def test_generate_reports_over_constrained_day(client, db, admin_token_headers):
+    from app.models import CoverageRequirement
+    db.add(User(username="feas_doc", role=RoleEnum.DOCTOR))
+    day = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add(day)
+    db.commit()
+    db.add(CoverageRequirement(shift_type_id=day.id, date=date(2026, 10, 2), min_count=3))
+    db.commit()
+
+    resp = client.post("/schedules/generate?start_date=2026-10-01&days=3&time_limit=5", headers=admin_token_headers)
+    assert resp.status_code == 400
+    issues = resp.json()["detail"]["issues"]
+    assert ("shift_understaffed", "2026-10-02", 3, 1) in [(i["kind"], i["date"], i["required"], i["available"]) for i in issues]
+
+    report = client.get("/schedules/feasibility?start_date=2026-10-01&days=3", headers=admin_token_headers).json()
+    assert report["feasible"] is False
+    assert report["issues"][0]["shift"] == "Day"
+
+def test_list_schedules_with_cursor_pages_projection_and_ndjson(client, db, admin_token_headers):
+    import json
+    doc = User(username="page_doc", role=RoleEnum.DOCTOR)
+    st = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    db.add_all([doc, st])
+    db.commit()
+    for d in (5, 1, 3, 2, 4):
+        db.add(Schedule(date=date(2027, 1, d), doctor_id=doc.id, shift_type_id=st.id, status="published"))
+    db.commit()
+
+    url = f"/schedules/?doctor_id={doc.id}&limit=2"
+    seen, cursor = [], None
+    while True:
+        resp = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=admin_token_headers)
+        assert resp.status_code == 200, resp.text
+        seen.extend(row["date"] for row in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [f"2027-01-0{d}" for d in range(1, 6)]
+
+    resp = client.get(f"/schedules/?doctor_id={doc.id}&fields=date,shift_type_id&format=ndjson", headers=admin_token_headers)
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert lines[0] == {"date": "2027-01-01", "shift_type_id": st.id}
+    assert len(lines) == 5
+
+    assert client.get("/schedules/?fields=date,password", headers=admin_token_headers).status_code == 400
+    assert client.get("/schedules/?cursor=not-a-cursor", headers=admin_token_headers).status_code == 400
+
+def test_calendar_grid_with_etag(client, db, admin_token_headers):
+    from app.models import Room
+    doc = User(username="cal_doc", full_name="Dr. Cal", role=RoleEnum.DOCTOR)
+    day = ShiftType(name="Day", start_time="08:00", end_time="17:00")
+    night = ShiftType(name="Night", start_time="17:00", end_time="08:00", shift_category="night")
+    room = Room(name="Ward A", room_number="CAL-1")
+    db.add_all([doc, day, night, room])
+    db.commit()
+    db.add_all([
+        Schedule(date=date(2027, 2, 1), doctor_id=doc.id, shift_type_id=night.id, status="published"),
+        Schedule(date=date(2027, 2, 3), doctor_id=doc.id, shift_type_id=day.id, room_id=room.id, status="published"),
+    ])
+    db.commit()
+
+    url = "/schedules/calendar?start_date=2027-02-01&end_date=2027-02-03"
+    resp = client.get(url, headers=admin_token_headers)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert [s["name"] for s in data["shift_types"]] == ["Day", "Night"]
+    assert len(data["days"]) == 3
+    assert data["days"][0]["cells"] == [[], [{"schedule_id": data["days"][0]["cells"][1][0]["schedule_id"], "doctor_id": doc.id, "doctor_name": "Dr. Cal", "room_id": None, "room_name": None, "status": "published"}]]
+    assert data["days"][2]["cells"][0][0]["room_name"] == "Ward A"
+
+    etag = resp.headers["ETag"]
+    cached = client.get(url, headers={**admin_token_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    db.query(Schedule).filter(Schedule.date == date(2027, 2, 3)).delete()
+    db.commit()
+    changed = client.get(url, headers={**admin_token_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+    # Updates bump updated_at even when the row count is unchanged
+    etag = changed.headers["ETag"]
+    row = db.query(Schedule).filter(Schedule.date == date(2027, 2, 1)).one()
+    row.room_id = room.id
+    db.commit()
+    moved = client.get(url, headers={**admin_token_headers, "If-None-Match": etag})
+    assert moved.status_code == 200
+    assert moved.json()["days"][0]["cells"][1][0]["room_name"] == "Ward A"
+
+    # Renaming a doctor or a room changes the rendered grid, so it changes the ETag too
+    etag = moved.headers["ETag"]
+    doc.full_name = "Dr. Calloway"
+    db.commit()
+    renamed = client.get(url, headers={**admin_token_headers, "If-None-Match": etag})
+    assert renamed.status_code == 200
+    assert renamed.json()["days"][0]["cells"][1][0]["doctor_name"] == "Dr. Calloway"
+
+    etag = renamed.headers["ETag"]
+    room.name = "Ward B"
+    db.commit()
+    renamed = client.get(url, headers={**admin_token_headers, "If-None-Match": etag})
+    assert renamed.status_code == 200
+    assert renamed.json()["days"][0]["cells"][1][0]["room_name"] == "Ward B"
+    assert client.get(url, headers={**admin_token_headers, "If-None-Match": renamed.headers["ETag"]}).status_code == 304
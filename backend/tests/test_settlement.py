@@ -0,0 +1,62 @@
+import csv
+import io
+import zipfile
+from datetime import date
+from types import SimpleNamespace
+from app.models import User, RoleEnum, ShiftType, Schedule, Holiday, DutyRate
+from app.core.settlement import ShiftCost
+
+def test_shift_cost_parses_cross_midnight_durations():
+    night = ShiftCost(SimpleNamespace(name="夜班", start_time="17:00", end_time="08:00", weight=2, shift_category="day"))
+    assert (night.category, night.weight, night.hours) == ("night", 2, 15.0)
+    full_day = ShiftCost(SimpleNamespace(name="24h", start_time="08:00", end_time="08:00", weight=None, shift_category="oncall"))
+    assert (full_day.category, full_day.weight, full_day.hours) == ("oncall", 1, 24.0)
+
+def test_settlement_json_csv_and_xlsx(client, db, admin_token_headers):
+    doctor = User(username="settle_doc", full_name="结算医生", role=RoleEnum.DOCTOR)
+    day = ShiftType(name="Settle Day", start_time="08:00", end_time="16:00", weight=2, shift_category="day")
+    night = ShiftType(name="Settle Night", start_time="20:00", end_time="08:00", shift_category="night")
+    db.add_all([doctor, day, night, Holiday(date=date(2026, 10, 1), name="国庆节")])
+    db.add_all([
+        DutyRate(shift_category="day", base_fee=50, hourly_rate=10, weekend_multiplier=2, holiday_multiplier=3),
+        DutyRate(shift_category="night", base_fee=100, hourly_rate=0),
+    ])
+    db.flush()
+    db.add_all([
+        Schedule(date=date(2026, 9, 30), doctor_id=doctor.id, shift_type_id=day.id, status="published"),    # Wed: 50*2 + 10*8 = 180
+        Schedule(date=date(2026, 10, 1), doctor_id=doctor.id, shift_type_id=day.id, status="published"),    # holiday: 540
+        Schedule(date=date(2026, 10, 4), doctor_id=doctor.id, shift_type_id=night.id, status="published"),  # Sun: 100 * 2.0
+        Schedule(date=date(2026, 10, 5), doctor_id=doctor.id, shift_type_id=night.id, status="draft"),
+    ])
+    db.commit()
+
+    url = "/stats/settlement?start_date=2026-09-01&end_date=2026-10-31"
+    rows = client.get(url, headers=admin_token_headers).json()
+    assert rows == [{
+        "doctor_id": doctor.id, "doctor_name": "结算医生", "department_id": None, "total_shifts": 3, "night_shifts": 1,
+        "weekend_shifts": 1, "holiday_shifts": 1, "hours": 28.0, "weighted_score": 5, "amount": 920.0,
+    }]
+    assert client.get(url + "&include_drafts=true", headers=admin_token_headers).json()[0]["total_shifts"] == 4
+
+    response = client.get(url + "&format=csv", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    parsed = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert parsed[0]["doctor_name"] == "结算医生" and parsed[0]["amount"] == "920.0"
+
+    response = client.get(url + "&format=xlsx", headers=admin_token_headers)
+    assert response.status_code == 200
+    package = zipfile.ZipFile(io.BytesIO(response.content))
+    assert package.testzip() is None
+    sheet = package.read("xl/worksheets/sheet1.xml").decode()
+    assert "结算医生" in sheet and "<v>920.0</v>" in sheet
+
+def test_duty_rates_listing_and_update(client, db, admin_token_headers):
+    db.add(ShiftType(name="Rates Night", start_time="17:00", end_time="08:00", shift_category="night"))
+    db.commit()
+    listed = {r["shift_category"]: r for r in client.get("/stats/duty-rates", headers=admin_token_headers).json()}
+    assert listed["night"]["id"] is None and listed["night"]["holiday_multiplier"] == 3.0
+
+    response = client.put("/stats/duty-rates/night", json={"base_fee": 120, "hourly_rate": 5}, headers=admin_token_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] is not None and response.json()["base_fee"] == 120
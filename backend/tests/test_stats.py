@@ -0,0 +1,96 @@
+from datetime import date
+from app.models import User, RoleEnum, ShiftType, Schedule, Department, WorkloadDaily, Holiday
+from app.api.stats import workload_stats
+from app.api.trades import _reassign
+from app.core.generation import save_generated_schedules
+from app.core.workload import rebuild_workload, backfill_workload
+
+def test_workload_stats_counts_in_sql(db):
+    dept = Department(name="Stats Dept")
+    db.add(dept)
+    db.flush()
+    busy = User(username="stats_busy", full_name="Busy", role=RoleEnum.DOCTOR, department_id=dept.id)
+    idle = User(username="stats_idle", full_name="Idle", role=RoleEnum.DOCTOR, department_id=dept.id)
+    day = ShiftType(name="Stats Day", start_time="08:00", end_time="17:00", shift_category="day")
+    night = ShiftType(name="Stats Night", start_time="17:00", end_time="08:00", shift_category="night")
+    legacy_night = ShiftType(name="夜班", start_time="20:00", end_time="08:00")
+    db.add_all([busy, idle, day, night, legacy_night])
+    db.add_all([
+        Holiday(date=date(2026, 5, 1), name="Labor Day"),
+        Holiday(date=date(2026, 5, 2), name="Labor Day"),
+        Holiday(date=date(2026, 5, 9), name="Make-up workday", kind="workday"),  # Saturday
+    ])
+    db.flush()
+    db.add_all([
+        Schedule(date=date(2026, 5, 1), doctor_id=busy.id, shift_type_id=day.id),           # Friday, Labor Day
+        Schedule(date=date(2026, 5, 2), doctor_id=busy.id, shift_type_id=night.id),         # Saturday, Labor Day
+        Schedule(date=date(2026, 5, 4), doctor_id=busy.id, shift_type_id=legacy_night.id),  # Monday
+        Schedule(date=date(2026, 5, 9), doctor_id=busy.id, shift_type_id=day.id),           # Saturday, workday
+        Schedule(date=date(2026, 6, 1), doctor_id=busy.id, shift_type_id=day.id),           # out of range
+    ])
+    db.commit()
+    rebuild_workload(db)  # rows were inserted behind the rollup's back
+
+    rows = workload_stats(db, date(2026, 5, 1), date(2026, 5, 31), dept.id)
+    assert rows == [
+        {"doctor_id": busy.id, "doctor_name": "Busy", "department_id": dept.id,
+         "total_shifts": 4, "night_shifts": 2, "weekend_shifts": 1, "holiday_shifts": 2, "weighted_score": 4, "hours": 45.0},
+        {"doctor_id": idle.id, "doctor_name": "Idle", "department_id": dept.id,
+         "total_shifts": 0, "night_shifts": 0, "weekend_shifts": 0, "holiday_shifts": 0, "weighted_score": 0, "hours": 0.0},
+    ]
+
+def test_workload_endpoint(client, admin_token_headers):
+    response = client.get("/stats/workload?start_date=2026-05-01&end_date=2026-05-31", headers=admin_token_headers)
+    assert response.status_code == 200
+    assert any(r["doctor_name"] is None and r["total_shifts"] == 0 for r in response.json())
+
+def rollup(db, doctor_id):
+    return {r.date: r for r in db.query(WorkloadDaily).filter(WorkloadDaily.doctor_id == doctor_id)}
+
+def test_rollup_follows_schedule_writes(client, db, admin_token_headers):
+    a = User(username="rollup_a", full_name="A", role=RoleEnum.DOCTOR)
+    b = User(username="rollup_b", full_name="B", role=RoleEnum.DOCTOR)
+    day = ShiftType(name="Rollup Day", start_time="08:00", end_time="17:00", weight=2, shift_category="day")
+    night = ShiftType(name="Rollup Night", start_time="17:00", end_time="08:00", shift_category="night")
+    db.add_all([a, b, day, night])
+    db.commit()
+
+    save_generated_schedules(db, [
+        {"date": date(2026, 7, 1), "doctor_id": a.id, "shift_type_id": day.id},
+        {"date": date(2026, 7, 1), "doctor_id": a.id, "shift_type_id": night.id},
+        {"date": date(2026, 7, 2), "doctor_id": a.id, "shift_type_id": day.id},
+    ])
+    cells = rollup(db, a.id)
+    first = cells[date(2026, 7, 1)]
+    assert (first.total_shifts, first.day_shifts, first.night_shifts, first.weighted_score, first.hours) == (2, 1, 1, 3, 24.0)
+    assert first.published_shifts == 0
+
+    response = client.post("/schedules/publish?start_date=2026-07-01&end_date=2026-07-01&force=true", headers=admin_token_headers)
+    assert response.status_code == 200
+    db.expire_all()
+    assert rollup(db, a.id)[date(2026, 7, 1)].published_shifts == 2
+
+    moved = db.query(Schedule).filter(Schedule.doctor_id == a.id, Schedule.date == date(2026, 7, 2)).one()
+    _reassign(db, moved, b.id)
+    db.commit()
+    assert date(2026, 7, 2) not in rollup(db, a.id)
+    assert rollup(db, b.id)[date(2026, 7, 2)].total_shifts == 1
+
+    response = client.delete(f"/schedules/{moved.id}", headers=admin_token_headers)
+    assert response.status_code == 200
+    db.expire_all()
+    assert rollup(db, b.id) == {}
+
+def test_backfill_fills_an_empty_rollup_once(db):
+    doctor = User(username="backfill_doc", role=RoleEnum.DOCTOR)
+    day = ShiftType(name="Backfill Day", start_time="08:00", end_time="17:00")
+    db.add_all([doctor, day])
+    db.flush()
+    db.add(Schedule(date=date(2026, 8, 3), doctor_id=doctor.id, shift_type_id=day.id))
+    db.commit()
+    db.query(WorkloadDaily).delete()
+    db.commit()
+
+    assert backfill_workload(db)
+    assert rollup(db, doctor.id)[date(2026, 8, 3)].total_shifts == 1
+    assert not backfill_workload(db)  # already filled